@@ -24,107 +24,111 @@ class CAECriticalAnalyzer:
         self.data = None
         self.metrics = {}
         
-    def generate_realistic_cae_data(self):
-        """Generar datos realistas del sistema CAE basados en el análisis"""
+    def generate_realistic_cae_data(self, n_companies=2000, n_workers=15000, n_projects=500, seed=42):
+        """
+        Generar datos realistas del sistema CAE basados en el análisis
+
+        Las tres tablas se construyen por columnas con extracciones vectorizadas
+        de un ``np.random.Generator``; los trabajadores se enlazan con su empresa
+        mediante un índice entero, lo que permite simular el sector a escala
+        nacional (cientos de miles de empresas, millones de trabajadores).
+        """
+        
+        rng = np.random.default_rng(seed)
         
-        np.random.seed(42)
-        n_companies = 2000
-        n_workers = 15000
-        n_projects = 500
+        sizes = np.array(['micro', 'pequeña', 'mediana', 'grande'])
+        regions = np.array(['Madrid', 'Cataluña', 'Andalucía', 'Valencia', 'País Vasco', 'Otras'])
+        sectors = np.array(['Edificación', 'Infraestructuras', 'Rehabilitación', 'Industrial'])
+        platforms = np.array(['CTAIMA', 'Nalanda', 'e-coordina', 'Dokify', '6conecta', 'Metacontratas', 'Otros'])
         
         # Datos de empresas
-        companies_data = []
-        for i in range(n_companies):
-            company_size = np.random.choice(['micro', 'pequeña', 'mediana', 'grande'], 
-                                          p=[0.65, 0.25, 0.08, 0.02])
-            
-            # Costes administrativos por tamaño
-            if company_size == 'micro':
-                admin_cost_base = np.random.normal(8000, 2000)
-                workers_count = np.random.randint(1, 10)
-            elif company_size == 'pequeña':
-                admin_cost_base = np.random.normal(15000, 4000)
-                workers_count = np.random.randint(10, 50)
-            elif company_size == 'mediana':
-                admin_cost_base = np.random.normal(35000, 8000)
-                workers_count = np.random.randint(50, 250)
-            else:
-                admin_cost_base = np.random.normal(80000, 20000)
-                workers_count = np.random.randint(250, 1000)
-            
-            # Plataformas CAE utilizadas (fragmentación del mercado)
-            cae_platforms = np.random.choice([
-                'CTAIMA', 'Nalanda', 'e-coordina', 'Dokify', 
-                '6conecta', 'Metacontratas', 'Otros'
-            ], size=np.random.randint(1, 4), replace=False)
-            
-            companies_data.append({
-                'company_id': f"COMP_{i:04d}",
-                'company_size': company_size,
-                'workers_count': workers_count,
-                'annual_revenue': np.random.randint(100000, 50000000),
-                'cae_platforms_count': len(cae_platforms),
-                'cae_platforms': ', '.join(cae_platforms),
-                'admin_cost_base': max(0, admin_cost_base),
-                'region': np.random.choice(['Madrid', 'Cataluña', 'Andalucía', 'Valencia', 'País Vasco', 'Otras']),
-                'sector': np.random.choice(['Edificación', 'Infraestructuras', 'Rehabilitación', 'Industrial'])
-            })
+        size_codes = rng.choice(len(sizes), size=n_companies, p=[0.65, 0.25, 0.08, 0.02])
+        
+        # Costes administrativos y plantilla por tamaño
+        admin_cost_mean = np.array([8000, 15000, 35000, 80000])[size_codes]
+        admin_cost_std = np.array([2000, 4000, 8000, 20000])[size_codes]
+        admin_cost_base = rng.normal(admin_cost_mean, admin_cost_std)
+        workers_count = rng.integers(np.array([1, 10, 50, 250])[size_codes],
+                                     np.array([10, 50, 250, 1000])[size_codes])
+        
+        # Plataformas CAE utilizadas (fragmentación del mercado): entre 1 y 3
+        # plataformas distintas por empresa, muestreadas sin reemplazo
+        platforms_count = rng.integers(1, 4, n_companies)
+        platform_order = rng.random((n_companies, len(platforms))).argsort(axis=1)[:, :3]
+        
+        # Solo existen unas pocas combinaciones posibles, así que se unen los
+        # nombres una vez por combinación y no una vez por empresa
+        selected = np.where(np.arange(3) < platforms_count[:, None], platform_order, len(platforms))
+        combo_keys = selected @ np.array([64, 8, 1])
+        unique_keys, combo_codes = np.unique(combo_keys, return_inverse=True)
+        combo_labels = [
+            ', '.join(platforms[code] for code in (key // 64, key // 8 % 8, key % 8) if code < len(platforms))
+            for key in unique_keys
+        ]
+        
+        company_region_codes = rng.integers(0, len(regions), n_companies)
+        company_sector_codes = rng.integers(0, len(sectors), n_companies)
+        company_ids = np.array([f"COMP_{i:04d}" for i in range(n_companies)])
+        
+        self.companies_df = pd.DataFrame({
+            'company_id': company_ids,
+            'company_size': pd.Categorical.from_codes(size_codes, categories=sizes),
+            'workers_count': workers_count,
+            'annual_revenue': rng.integers(100000, 50000000, n_companies),
+            'cae_platforms_count': platforms_count,
+            'cae_platforms': pd.Categorical.from_codes(combo_codes.ravel(), categories=combo_labels),
+            'admin_cost_base': np.maximum(0, admin_cost_base),
+            'region': pd.Categorical.from_codes(company_region_codes, categories=regions),
+            'sector': pd.Categorical.from_codes(company_sector_codes, categories=sectors)
+        })
         
         # Datos de trabajadores
-        workers_data = []
-        for i in range(n_workers):
-            company_idx = np.random.randint(0, n_companies)
-            company = companies_data[company_idx]
-            
-            # Tiempo de validación CAE (ineficiencias del sistema)
-            validation_time_hours = np.random.exponential(48)  # Promedio 48 horas
-            if np.random.random() < 0.3:  # 30% tienen retrasos significativos
-                validation_time_hours += np.random.exponential(72)
-            
-            # Coste de paralización por retrasos
-            daily_paralization_cost = 0
-            if validation_time_hours > 72:  # Más de 3 días
-                daily_paralization_cost = np.random.normal(2400, 500)  # Coste diario de paralización
-            
-            workers_data.append({
-                'worker_id': f"WORK_{i:05d}",
-                'company_id': company['company_id'],
-                'company_size': company['company_size'],
-                'validation_time_hours': validation_time_hours,
-                'daily_paralization_cost': max(0, daily_paralization_cost),
-                'total_paralization_cost': max(0, daily_paralization_cost * (validation_time_hours - 72) / 24),
-                'cae_platforms_used': company['cae_platforms_count'],
-                'region': company['region'],
-                'sector': company['sector'],
-                'qualification_level': np.random.choice(['Peón', 'Oficial', 'Encargado', 'Técnico']),
-                'experience_years': np.random.randint(1, 40)
-            })
+        company_idx = rng.integers(0, n_companies, n_workers)
+        
+        # Tiempo de validación CAE (ineficiencias del sistema): promedio 48 horas
+        # y un 30% con retrasos significativos
+        validation_time_hours = rng.exponential(48, n_workers)
+        significant_delay = rng.random(n_workers) < 0.3
+        validation_time_hours[significant_delay] += rng.exponential(72, significant_delay.sum())
+        
+        # Coste diario de paralización cuando la validación supera 3 días
+        delayed = validation_time_hours > 72
+        daily_paralization_cost = np.where(delayed, rng.normal(2400, 500, n_workers), 0.0)
+        
+        qualifications = np.array(['Peón', 'Oficial', 'Encargado', 'Técnico'])
+        
+        self.workers_df = pd.DataFrame({
+            'worker_id': np.char.add('WORK_', np.char.zfill(np.arange(n_workers).astype(str), 5)),
+            'company_id': company_ids[company_idx],
+            'company_size': pd.Categorical.from_codes(size_codes[company_idx], categories=sizes),
+            'validation_time_hours': validation_time_hours,
+            'daily_paralization_cost': np.maximum(0, daily_paralization_cost),
+            'total_paralization_cost': np.where(delayed, np.maximum(0, daily_paralization_cost * (validation_time_hours - 72) / 24), 0.0),
+            'cae_platforms_used': platforms_count[company_idx],
+            'region': pd.Categorical.from_codes(company_region_codes[company_idx], categories=regions),
+            'sector': pd.Categorical.from_codes(company_sector_codes[company_idx], categories=sectors),
+            'qualification_level': pd.Categorical.from_codes(rng.integers(0, len(qualifications), n_workers),
+                                                             categories=qualifications),
+            'experience_years': rng.integers(1, 40, n_workers)
+        })
         
         # Datos de proyectos
-        projects_data = []
-        for i in range(n_projects):
-            project_value = np.random.randint(100000, 10000000)
-            duration_days = np.random.randint(30, 365)
-            
-            # Retrasos por CAE
-            cae_delays_days = np.random.exponential(5)  # Promedio 5 días de retraso
-            if np.random.random() < 0.2:  # 20% tienen retrasos críticos
-                cae_delays_days += np.random.exponential(15)
-            
-            projects_data.append({
-                'project_id': f"PROJ_{i:04d}",
-                'project_value': project_value,
-                'duration_days': duration_days,
-                'cae_delays_days': cae_delays_days,
-                'cae_delay_cost': project_value * 0.001 * cae_delays_days,  # 0.1% del valor por día
-                'region': np.random.choice(['Madrid', 'Cataluña', 'Andalucía', 'Valencia', 'País Vasco', 'Otras']),
-                'project_type': np.random.choice(['Edificación', 'Infraestructuras', 'Rehabilitación', 'Industrial'])
-            })
-        
-        # Crear DataFrames
-        self.companies_df = pd.DataFrame(companies_data)
-        self.workers_df = pd.DataFrame(workers_data)
-        self.projects_df = pd.DataFrame(projects_data)
+        project_value = rng.integers(100000, 10000000, n_projects)
+        
+        # Retrasos por CAE: promedio 5 días y un 20% con retrasos críticos
+        cae_delays_days = rng.exponential(5, n_projects)
+        critical_delay = rng.random(n_projects) < 0.2
+        cae_delays_days[critical_delay] += rng.exponential(15, critical_delay.sum())
+        
+        self.projects_df = pd.DataFrame({
+            'project_id': np.char.add('PROJ_', np.char.zfill(np.arange(n_projects).astype(str), 4)),
+            'project_value': project_value,
+            'duration_days': rng.integers(30, 365, n_projects),
+            'cae_delays_days': cae_delays_days,
+            'cae_delay_cost': project_value * 0.001 * cae_delays_days,  # 0.1% del valor por día
+            'region': pd.Categorical.from_codes(rng.integers(0, len(regions), n_projects), categories=regions),
+            'project_type': pd.Categorical.from_codes(rng.integers(0, len(sectors), n_projects), categories=sectors)
+        })
         
         # Calcular métricas agregadas
         self._calculate_aggregate_metrics()
@@ -182,7 +186,7 @@ class CAECriticalAnalyzer:
         """Analizar el impacto de la fragmentación del mercado CAE"""
         
         # Análisis de fragmentación por región
-        fragmentation_by_region = self.companies_df.groupby('region').agg({
+        fragmentation_by_region = self.companies_df.groupby('region', observed=True).agg({
             'cae_platforms_count': ['mean', 'std', 'count'],
             'admin_cost_base': 'mean'
         }).round(2)
@@ -203,7 +207,7 @@ class CAECriticalAnalyzer:
         """Analizar costes de ineficiencia del sistema CAE"""
         
         # Análisis de retrasos por tamaño de empresa
-        delay_analysis = self.workers_df.groupby('company_size').agg({
+        delay_analysis = self.workers_df.groupby('company_size', observed=True).agg({
             'validation_time_hours': ['mean', 'std', 'count'],
             'total_paralization_cost': ['sum', 'mean'],
             'daily_paralization_cost': 'mean'
@@ -212,7 +216,7 @@ class CAECriticalAnalyzer:
         # Análisis de costes de paralización
         paralization_analysis = self.workers_df[
             self.workers_df['total_paralization_cost'] > 0
-        ].groupby('company_size').agg({
+        ].groupby('company_size', observed=True).agg({
             'total_paralization_cost': ['sum', 'mean', 'count'],
             'validation_time_hours': 'mean'
         }).round(2)
@@ -329,7 +333,7 @@ class CAECriticalAnalyzer:
         
         # 2. Coste administrativo por tamaño de empresa
         ax2 = plt.subplot(4, 2, 2)
-        size_costs = self.companies_df.groupby('company_size')['admin_cost_base'].mean()
+        size_costs = self.companies_df.groupby('company_size', observed=True)['admin_cost_base'].mean()
         colors = ['#ff6b6b', '#4ecdc4', '#45b7d1', '#96ceb4']
         bars = ax2.bar(size_costs.index, size_costs.values, color=colors)
         ax2.set_title('Coste Administrativo CAE por Tamaño de Empresa', 
@@ -346,7 +350,7 @@ class CAECriticalAnalyzer:
         
         # 3. Tiempo de validación por tamaño de empresa
         ax3 = plt.subplot(4, 2, 3)
-        validation_times = self.workers_df.groupby('company_size')['validation_time_hours'].mean()
+        validation_times = self.workers_df.groupby('company_size', observed=True)['validation_time_hours'].mean()
         bars = ax3.bar(validation_times.index, validation_times.values, color=colors)
         ax3.set_title('Tiempo Promedio de Validación CAE por Tamaño de Empresa', 
                      fontsize=14, fontweight='bold')
@@ -372,7 +376,7 @@ class CAECriticalAnalyzer:
         
         # 5. Coste de paralización por región
         ax5 = plt.subplot(4, 2, 5)
-        region_costs = self.workers_df.groupby('region')['total_paralization_cost'].sum()
+        region_costs = self.workers_df.groupby('region', observed=True)['total_paralization_cost'].sum()
         bars = ax5.bar(region_costs.index, region_costs.values, 
                       color=['#ff6b6b', '#4ecdc4', '#45b7d1', '#96ceb4', '#feca57', '#a8e6cf'])
         ax5.set_title('Coste Total de Paralización por Región', 
@@ -4,18 +4,40 @@ Advanced ETL pipeline for CAE (Coordinación de Actividades Empresariales) analy
 """
 
 import os
+import asyncio
 import logging
 import pandas as pd
 import numpy as np
 import requests
 from pathlib import Path
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from datetime import datetime
+from typing import Dict, Optional, Tuple
 import hashlib
 import json
+import shutil
 from dataclasses import dataclass
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import time
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+try:
+    from dataset_sink import DatasetSink, SinkConfig
+    from data_quality import DataQualityEngine
+    from run_history import RunHistory, RunMetricsCollector, peak_rss_mb
+    from http_client import ACCEPT_ENCODING, BROWSER_HEADERS, PooledHTTPClient
+    from pdf_ingestion import PDFIngestor
+except ImportError:
+    from src.etl.dataset_sink import DatasetSink, SinkConfig
+    from src.etl.data_quality import DataQualityEngine
+    from src.etl.run_history import RunHistory, RunMetricsCollector, peak_rss_mb
+    from src.etl.http_client import ACCEPT_ENCODING, BROWSER_HEADERS, PooledHTTPClient
+    from src.etl.pdf_ingestion import PDFIngestor
 
 # Configure logging
 logging.basicConfig(
@@ -28,6 +50,14 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Request headers shared by the threaded and asyncio download engines
+DOWNLOAD_HEADERS = {
+    'User-Agent': 'CAE-ETL-Pipeline/1.0 (Professional Data Analysis)',
+    'Accept': 'application/pdf,application/vnd.ms-excel,text/csv,*/*',
+    'Accept-Language': BROWSER_HEADERS['Accept-Language'],
+    'Accept-Encoding': ACCEPT_ENCODING
+}
+
 @dataclass
 class DataSource:
     """Data source configuration"""
@@ -40,13 +70,71 @@ class DataSource:
     retry_count: int = 0
     max_retries: int = 3
 
+class StreamingDownload:
+    """
+    Temporary download file that hashes and counts bytes as they are written
+    
+    Lets the pipeline validate size and compute the integrity checksum in the
+    same pass that writes the body to disk, instead of re-reading the file.
+    ``open``/``write``/``close`` can also be called individually, e.g. from
+    worker threads by the asyncio engine.
+    """
+    
+    def __init__(self, path: Path, algorithm: str = 'md5'):
+        self.path = path
+        self.algorithm = algorithm
+        self.bytes_written = 0
+        self._hash = hashlib.new(algorithm)
+        self._file = None
+    
+    def open(self) -> 'StreamingDownload':
+        """Create (or truncate) the temporary file"""
+        self._file = open(self.path, 'wb')
+        return self
+    
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+    
+    def __enter__(self) -> 'StreamingDownload':
+        return self.open()
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+    
+    def write(self, chunk: bytes) -> None:
+        """Write a chunk to disk and feed it to the running hash"""
+        self._file.write(chunk)
+        self._hash.update(chunk)
+        self.bytes_written += len(chunk)
+    
+    @property
+    def checksum(self) -> str:
+        """Hex digest of everything written so far"""
+        return self._hash.hexdigest()
+
 class CAEETLPipeline:
     """
     Professional ETL Pipeline for CAE Analysis
     Handles data extraction, validation, transformation, and loading
     """
     
-    def __init__(self, base_dir: str = "data"):
+    def __init__(self, base_dir: str = "data", checksum_algorithm: str = "md5",
+                 download_chunk_size: int = 1024 * 1024,
+                 sink_config: Optional[SinkConfig] = None):
+        """
+        Args:
+            base_dir: Root directory holding raw/, processed/ and logs/
+            checksum_algorithm: hashlib algorithm used for integrity checksums
+                and content addressing (e.g. ``"md5"`` or the faster ``"blake2b"``)
+            download_chunk_size: Buffer size in bytes for streamed downloads
+                and checksum reads
+            sink_config: Output formats, partitioning and compression used by
+                ``load_data`` (Parquet only by default)
+        """
+        if checksum_algorithm not in hashlib.algorithms_available:
+            raise ValueError(f"Unsupported checksum algorithm: {checksum_algorithm}")
+        
         self.base_dir = Path(base_dir)
         self.raw_dir = self.base_dir / "raw"
         self.processed_dir = self.base_dir / "processed"
@@ -56,6 +144,27 @@ class CAEETLPipeline:
         for dir_path in [self.raw_dir, self.processed_dir, self.logs_dir]:
             dir_path.mkdir(parents=True, exist_ok=True)
         
+        # Download and integrity settings
+        self.checksum_algorithm = checksum_algorithm
+        self.download_chunk_size = download_chunk_size
+        
+        # Shared pooled client for the threaded extraction path. Retries are
+        # driven per source by DataSource.max_retries, so the client does not retry.
+        self.http = PooledHTTPClient(
+            headers=DOWNLOAD_HEADERS,
+            timeout=30,
+            retries=0
+        )
+        
+        # Page-level PDF text/table extraction, cached per page under the file checksum
+        self.pdf_ingestor = PDFIngestor(self.base_dir / "cache" / "pdf_pages",
+                                        checksum_algorithm=checksum_algorithm)
+        
+        # Output sink and quality checks for the load stage
+        self.sink_config = sink_config or SinkConfig()
+        self.quality_engine = DataQualityEngine()
+        self.data_quality_reports = {}
+        
         # Initialize data sources
         self.data_sources = self._initialize_data_sources()
         
@@ -68,6 +177,12 @@ class CAEETLPipeline:
             'failed_extractions': 0,
             'data_quality_score': 0.0
         }
+        
+        # Stage/source/dataset timings, persisted per run in logs/pipeline_runs.db
+        self.run_id = None
+        self._run_active = False
+        self.run_metrics = RunMetricsCollector()
+        self.run_history = RunHistory(self.logs_dir / "pipeline_runs.db")
     
     def _initialize_data_sources(self) -> Dict[str, DataSource]:
         """Initialize data sources with professional configuration"""
@@ -109,25 +224,28 @@ class CAEETLPipeline:
             )
         }
     
-    def extract_data(self, parallel: bool = True) -> Dict[str, bool]:
+    def extract_data(self, parallel: bool = True, incremental: bool = False) -> Dict[str, bool]:
         """
         Extract data from all sources with professional error handling
         
         Args:
             parallel: Whether to use parallel processing
+            incremental: Whether to send conditional requests and skip
+                sources that have not changed since the last extraction
             
         Returns:
             Dictionary with extraction results
         """
         logger.info("Starting data extraction phase")
-        self.pipeline_metrics['start_time'] = datetime.now()
+        self._start_run()
         
         extraction_results = {}
         
-        if parallel:
-            extraction_results = self._extract_parallel()
-        else:
-            extraction_results = self._extract_sequential()
+        with self.run_metrics.stage('extract'):
+            if parallel:
+                extraction_results = self._extract_parallel(incremental)
+            else:
+                extraction_results = self._extract_sequential(incremental)
         
         self.pipeline_metrics['successful_extractions'] = sum(extraction_results.values())
         self.pipeline_metrics['failed_extractions'] = len(extraction_results) - sum(extraction_results.values())
@@ -137,13 +255,13 @@ class CAEETLPipeline:
         
         return extraction_results
     
-    def _extract_parallel(self) -> Dict[str, bool]:
+    def _extract_parallel(self, incremental: bool = False) -> Dict[str, bool]:
         """Extract data using parallel processing"""
         results = {}
         
         with ThreadPoolExecutor(max_workers=5) as executor:
             future_to_source = {
-                executor.submit(self._extract_single_source, name, source): name 
+                executor.submit(self._extract_single_source, name, source, incremental): name 
                 for name, source in self.data_sources.items()
             }
             
@@ -157,40 +275,60 @@ class CAEETLPipeline:
         
         return results
     
-    def _extract_sequential(self) -> Dict[str, bool]:
+    def _extract_sequential(self, incremental: bool = False) -> Dict[str, bool]:
         """Extract data sequentially"""
         results = {}
         
         for name, source in self.data_sources.items():
-            results[name] = self._extract_single_source(name, source)
+            results[name] = self._extract_single_source(name, source, incremental)
         
         return results
     
-    def _extract_single_source(self, name: str, source: DataSource) -> bool:
+    def _extract_single_source(self, name: str, source: DataSource, incremental: bool = False) -> bool:
         """
         Extract data from a single source with retry logic
         
         Args:
             name: Source name
             source: DataSource configuration
+            incremental: Whether to send If-None-Match/If-Modified-Since
+                validators from the previous extraction
             
         Returns:
             True if successful, False otherwise
         """
+        start = time.perf_counter()
+        rss_before = peak_rss_mb()
+        success, bytes_downloaded = self._download_source(name, source, incremental)
+        self.run_metrics.record_item('extract', name, time.perf_counter() - start,
+                                     bytes_count=bytes_downloaded, peak_rss_before_mb=rss_before)
+        return success
+    
+    def _download_source(self, name: str, source: DataSource,
+                         incremental: bool = False) -> Tuple[bool, int]:
+        """
+        Download a single source with retries
+        
+        Returns:
+            Tuple of (success, bytes downloaded)
+        """
         logger.info(f"Extracting data from {source.name}")
         
+        file_path = self.raw_dir / f"{name}.{source.file_type}"
+        tmp_path = file_path.with_name(f".{file_path.name}.part")
+        headers = self._conditional_headers(file_path) if incremental else {}
+        
         for attempt in range(source.max_retries):
             try:
                 # Download data
-                response = requests.get(
-                    source.url,
-                    headers={
-                        "User-Agent": "CAE-ETL-Pipeline/1.0 (Professional Data Analysis)",
-                        "Accept": "application/pdf,application/vnd.ms-excel,text/csv,*/*"
-                    },
-                    timeout=30,
-                    stream=True
-                )
+                response = self.http.get(source.url, headers=headers, stream=True)
+                
+                if response.status_code == 304:
+                    response.close()
+                    self._update_metadata(file_path, {'last_checked': datetime.now().isoformat()})
+                    logger.info(f"{source.name} not modified since last extraction")
+                    return True, 0
+                
                 response.raise_for_status()
                 
                 # Validate file size
@@ -201,18 +339,20 @@ class CAEETLPipeline:
                         logger.warning(f"File size {size_mb:.2f}MB exceeds expected {source.expected_size_mb}MB")
                 
                 # Save file
-                file_path = self.raw_dir / f"{name}.{source.file_type}"
-                with open(file_path, "wb") as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        f.write(chunk)
+                with StreamingDownload(tmp_path, self.checksum_algorithm) as download:
+                    for chunk in response.iter_content(chunk_size=self.download_chunk_size):
+                        download.write(chunk)
+                self.http.stats.record_bytes(source.url, download.bytes_written)
                 
                 # Validate file
-                if self._validate_extracted_file(file_path, source):
+                if self._validate_extracted_file(tmp_path, source, download.bytes_written):
+                    self._store_extracted_file(file_path, tmp_path, source, response.headers,
+                                               download.checksum, download.bytes_written)
                     logger.info(f"Successfully extracted {source.name}")
-                    return True
+                    return True, download.bytes_written
                 else:
                     logger.error(f"Validation failed for {source.name}")
-                    file_path.unlink(missing_ok=True)
+                    tmp_path.unlink(missing_ok=True)
                     
             except requests.exceptions.RequestException as e:
                 logger.error(f"Request error for {source.name} (attempt {attempt + 1}): {e}")
@@ -224,60 +364,320 @@ class CAEETLPipeline:
                 logger.info(f"Retrying {source.name} in {wait_time} seconds...")
                 time.sleep(wait_time)
         
+        tmp_path.unlink(missing_ok=True)
         logger.error(f"Failed to extract {source.name} after {source.max_retries} attempts")
-        return False
+        return False, 0
     
-    def _validate_extracted_file(self, file_path: Path, source: DataSource) -> bool:
+    def extract_data_async(self, incremental: bool = False, per_host_limit: int = 2,
+                           total_limit: int = 50) -> Dict[str, bool]:
+        """
+        Extract data from all sources with the asyncio engine
+        
+        All sources share one event loop and one connection pool: at most
+        ``per_host_limit`` connections are opened per host and
+        ``total_limit`` overall, retry backoff does not hold a thread, and
+        bodies are streamed to disk as they arrive. Per-source wall time is
+        recorded in ``pipeline_metrics['source_latency_seconds']``.
+        
+        Args:
+            incremental: Whether to send conditional requests (see ``extract_data``)
+            per_host_limit: Maximum concurrent connections per host
+            total_limit: Maximum concurrent connections overall
+            
+        Returns:
+            Dictionary with extraction results
+        """
+        if aiohttp is None:
+            raise ImportError("aiohttp is required for the asyncio extraction engine")
+        
+        logger.info("Starting asyncio data extraction phase")
+        self._start_run()
+        
+        with self.run_metrics.stage('extract'):
+            extraction_results, latencies = asyncio.run(
+                self._extract_async(incremental, per_host_limit, total_limit)
+            )
+        
+        self.pipeline_metrics['source_latency_seconds'] = latencies
+        self.pipeline_metrics['successful_extractions'] = sum(extraction_results.values())
+        self.pipeline_metrics['failed_extractions'] = len(extraction_results) - sum(extraction_results.values())
+        
+        logger.info(f"Extraction completed: {self.pipeline_metrics['successful_extractions']} successful, "
+                   f"{self.pipeline_metrics['failed_extractions']} failed")
+        
+        return extraction_results
+    
+    async def _extract_async(self, incremental: bool, per_host_limit: int,
+                             total_limit: int) -> Tuple[Dict[str, bool], Dict[str, float]]:
+        """Run every source extraction on a shared aiohttp session"""
+        connector = aiohttp.TCPConnector(limit=total_limit, limit_per_host=per_host_limit)
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=30, sock_read=30)
+        
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            names = list(self.data_sources)
+            outcomes = await asyncio.gather(
+                *(self._extract_single_source_async(session, name, self.data_sources[name], incremental)
+                  for name in names),
+                return_exceptions=True
+            )
+        
+        results = {}
+        latencies = {}
+        for name, outcome in zip(names, outcomes):
+            if isinstance(outcome, BaseException):
+                logger.error(f"Error in async extraction for {name}: {outcome}")
+                results[name] = False
+            else:
+                results[name], latencies[name] = outcome
+        
+        return results, latencies
+    
+    async def _extract_single_source_async(self, session, name: str, source: DataSource,
+                                           incremental: bool = False) -> Tuple[bool, float]:
+        """
+        Async counterpart of ``_extract_single_source``
+        
+        Returns:
+            Tuple of (success, wall time in seconds)
+        """
+        start = time.perf_counter()
+        rss_before = peak_rss_mb()
+        success, bytes_downloaded = await self._download_source_async(session, name, source, incremental)
+        seconds = time.perf_counter() - start
+        self.run_metrics.record_item('extract', name, seconds, bytes_count=bytes_downloaded,
+                                     peak_rss_before_mb=rss_before)
+        return success, seconds
+    
+    async def _download_source_async(self, session, name: str, source: DataSource,
+                                     incremental: bool = False) -> Tuple[bool, int]:
+        """
+        Async counterpart of ``_download_source``
+        
+        Disk work (writing and hashing the body, metadata, storing the file)
+        runs in worker threads so one large download never stalls the
+        transfers sharing the event loop.
+        
+        Returns:
+            Tuple of (success, bytes downloaded)
+        """
+        logger.info(f"Extracting data from {source.name}")
+        
+        file_path = self.raw_dir / f"{name}.{source.file_type}"
+        headers = dict(DOWNLOAD_HEADERS)
+        if incremental:
+            headers.update(await asyncio.to_thread(self._conditional_headers, file_path))
+        
+        tmp_path = file_path.with_name(f".{file_path.name}.part")
+        
+        for attempt in range(source.max_retries):
+            try:
+                async with session.get(source.url, headers=headers) as response:
+                    if response.status == 304:
+                        await asyncio.to_thread(self._update_metadata, file_path,
+                                                {'last_checked': datetime.now().isoformat()})
+                        logger.info(f"{source.name} not modified since last extraction")
+                        return True, 0
+                    
+                    response.raise_for_status()
+                    
+                    # Validate file size
+                    if response.content_length:
+                        size_mb = response.content_length / (1024 * 1024)
+                        if size_mb > source.expected_size_mb * 2:
+                            logger.warning(f"File size {size_mb:.2f}MB exceeds expected {source.expected_size_mb}MB")
+                    
+                    # Stream body to disk
+                    download = await self._stream_to_file_async(response, tmp_path)
+                    response_headers = response.headers
+                
+                # Validate file
+                if self._validate_extracted_file(tmp_path, source, download.bytes_written):
+                    await asyncio.to_thread(self._store_extracted_file, file_path, tmp_path, source,
+                                            response_headers, download.checksum, download.bytes_written)
+                    logger.info(f"Successfully extracted {source.name}")
+                    return True, download.bytes_written
+                else:
+                    logger.error(f"Validation failed for {source.name}")
+                    await asyncio.to_thread(tmp_path.unlink, missing_ok=True)
+                    
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.error(f"Request error for {source.name} (attempt {attempt + 1}): {e}")
+            except Exception as e:
+                logger.error(f"Unexpected error for {source.name} (attempt {attempt + 1}): {e}")
+            
+            if attempt < source.max_retries - 1:
+                wait_time = 2 ** attempt  # Exponential backoff
+                logger.info(f"Retrying {source.name} in {wait_time} seconds...")
+                await asyncio.sleep(wait_time)
+        
+        await asyncio.to_thread(tmp_path.unlink, missing_ok=True)
+        logger.error(f"Failed to extract {source.name} after {source.max_retries} attempts")
+        return False, 0
+    
+    async def _stream_to_file_async(self, response, tmp_path: Path) -> StreamingDownload:
+        """
+        Write an aiohttp response body to ``tmp_path`` off the event loop
+        
+        Network chunks are buffered up to ``download_chunk_size`` and each
+        full buffer is written and hashed in a worker thread.
+        """
+        download = StreamingDownload(tmp_path, self.checksum_algorithm)
+        await asyncio.to_thread(download.open)
+        try:
+            buffer = bytearray()
+            async for chunk in response.content.iter_chunked(self.download_chunk_size):
+                buffer += chunk
+                if len(buffer) >= self.download_chunk_size:
+                    await asyncio.to_thread(download.write, bytes(buffer))
+                    buffer.clear()
+            if buffer:
+                await asyncio.to_thread(download.write, bytes(buffer))
+        finally:
+            await asyncio.to_thread(download.close)
+        return download
+    
+    def _validate_extracted_file(self, file_path: Path, source: DataSource,
+                                 size_bytes: Optional[int] = None) -> bool:
         """
         Validate extracted file
         
         Args:
             file_path: Path to the extracted file
             source: DataSource configuration
+            size_bytes: Byte count observed while downloading; the file is
+                stat'ed once when it is not provided
             
         Returns:
             True if validation passes
         """
         try:
-            # Check if file exists and has content
-            if not file_path.exists() or file_path.stat().st_size == 0:
+            if size_bytes is None:
+                size_bytes = file_path.stat().st_size if file_path.exists() else 0
+            
+            # Check if file has content
+            if size_bytes == 0:
                 return False
             
             # Check file size
-            size_mb = file_path.stat().st_size / (1024 * 1024)
+            size_mb = size_bytes / (1024 * 1024)
             if size_mb < source.expected_size_mb * 0.1:  # At least 10% of expected size
                 logger.warning(f"File {file_path.name} is too small: {size_mb:.2f}MB")
                 return False
             
-            # Calculate checksum for integrity
-            checksum = self._calculate_checksum(file_path)
-            
-            # Save metadata
-            metadata = {
-                'source_name': source.name,
-                'extraction_time': datetime.now().isoformat(),
-                'file_size_mb': size_mb,
-                'checksum': checksum,
-                'url': source.url
-            }
-            
-            metadata_path = file_path.with_suffix('.metadata.json')
-            with open(metadata_path, 'w') as f:
-                json.dump(metadata, f, indent=2)
-            
             return True
             
         except Exception as e:
             logger.error(f"Validation error for {file_path}: {e}")
             return False
     
+    def _store_extracted_file(self, file_path: Path, tmp_path: Path, source: DataSource,
+                              response_headers, checksum: Optional[str] = None,
+                              size_bytes: Optional[int] = None) -> Path:
+        """
+        Move a validated download into the content-addressed raw store
+        
+        Every version is kept under ``raw/objects/<algorithm>/<xx>/<checksum>``
+        and ``raw/<name>.<ext>`` is an independent copy of the current one,
+        so tools that rewrite the raw file in place cannot corrupt the store.
+        The price is disk space: the current version of each source is
+        stored twice. The copy is written to a temporary file and swapped in
+        atomically, and skipped when the raw file still holds this checksum
+        (per its sidecar size and mtime), so unchanged downloads rewrite
+        neither the object nor the raw file. ``checksum`` and ``size_bytes``
+        computed while streaming avoid re-reading the file.
+        
+        Returns:
+            Path of the content-addressed object
+        """
+        if checksum is None:
+            checksum = self._calculate_checksum(tmp_path)
+        if size_bytes is None:
+            size_bytes = tmp_path.stat().st_size
+        size_mb = size_bytes / (1024 * 1024)
+        object_path = self.raw_dir / "objects" / self.checksum_algorithm / checksum[:2] / checksum
+        
+        if object_path.exists():
+            tmp_path.unlink()
+            logger.info(f"{source.name} content unchanged ({checksum})")
+        else:
+            object_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path.replace(object_path)
+        
+        if self._recorded_checksum(file_path) != checksum or file_path.stat().st_size != size_bytes:
+            copy_path = file_path.with_name(f".{file_path.name}.copy")
+            shutil.copy2(object_path, copy_path)
+            os.replace(copy_path, file_path)
+        
+        # Save metadata; size and mtime let readers detect later in-place edits
+        now = datetime.now().isoformat()
+        file_stat = file_path.stat()
+        metadata = {
+            'source_name': source.name,
+            'extraction_time': now,
+            'last_checked': now,
+            'file_size_mb': size_mb,
+            'checksum': checksum,
+            'checksum_algorithm': self.checksum_algorithm,
+            'object_path': str(object_path.relative_to(self.raw_dir)),
+            'file_size_bytes': file_stat.st_size,
+            'file_mtime_ns': file_stat.st_mtime_ns,
+            'url': source.url,
+            'etag': response_headers.get('ETag'),
+            'last_modified': response_headers.get('Last-Modified')
+        }
+        self._write_metadata(file_path, metadata)
+        
+        return object_path
+    
+    @staticmethod
+    def _metadata_path(file_path: Path) -> Path:
+        """Path of the ``.metadata.json`` sidecar for a raw file"""
+        return file_path.with_suffix('.metadata.json')
+    
+    def _read_metadata(self, file_path: Path) -> Dict:
+        """Read the metadata sidecar of a raw file, or an empty dict"""
+        try:
+            with open(self._metadata_path(file_path), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def _write_metadata(self, file_path: Path, metadata: Dict) -> None:
+        """Write the metadata sidecar of a raw file"""
+        with open(self._metadata_path(file_path), 'w') as f:
+            json.dump(metadata, f, indent=2)
+    
+    def _update_metadata(self, file_path: Path, updates: Dict) -> None:
+        """Merge ``updates`` into the metadata sidecar of a raw file"""
+        metadata = self._read_metadata(file_path)
+        metadata.update(updates)
+        self._write_metadata(file_path, metadata)
+    
+    def _conditional_headers(self, file_path: Path) -> Dict[str, str]:
+        """
+        Build If-None-Match/If-Modified-Since headers from the previous extraction
+        
+        Validators are only sent when the raw file is still on disk, so a
+        304 response always leaves a usable local copy.
+        """
+        if not file_path.exists():
+            return {}
+        
+        metadata = self._read_metadata(file_path)
+        headers = {}
+        if metadata.get('etag'):
+            headers['If-None-Match'] = metadata['etag']
+        if metadata.get('last_modified'):
+            headers['If-Modified-Since'] = metadata['last_modified']
+        return headers
+    
     def _calculate_checksum(self, file_path: Path) -> str:
-        """Calculate MD5 checksum for file integrity"""
-        hash_md5 = hashlib.md5()
+        """Calculate the configured checksum of an existing file for integrity"""
+        file_hash = hashlib.new(self.checksum_algorithm)
         with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_md5.update(chunk)
-        return hash_md5.hexdigest()
+            for chunk in iter(lambda: f.read(self.download_chunk_size), b""):
+                file_hash.update(chunk)
+        return file_hash.hexdigest()
     
     def transform_data(self) -> Dict[str, pd.DataFrame]:
         """
@@ -287,23 +687,36 @@ class CAEETLPipeline:
             Dictionary of transformed DataFrames
         """
         logger.info("Starting data transformation phase")
+        self._ensure_run()
         
         transformed_data = {}
         
-        # Process each extracted file
-        for file_path in self.raw_dir.glob("*"):
-            if file_path.suffix in ['.csv', '.xlsx', '.json']:
+        with self.run_metrics.stage('transform'):
+            # Process each extracted file
+            for file_path in self._iter_raw_files():
+                start = time.perf_counter()
+                rss_before = peak_rss_mb()
                 try:
                     df = self._load_and_transform_file(file_path)
                     if df is not None and not df.empty:
                         transformed_data[file_path.stem] = df
+                        self.run_metrics.record_item('transform', file_path.stem, time.perf_counter() - start,
+                                                     rows=len(df), bytes_count=file_path.stat().st_size,
+                                                     peak_rss_before_mb=rss_before)
                         logger.info(f"Transformed {file_path.name}: {len(df)} records")
                 except Exception as e:
                     logger.error(f"Error transforming {file_path.name}: {e}")
-        
-        # Generate synthetic CAE data for analysis
-        synthetic_data = self._generate_synthetic_cae_data()
-        transformed_data['synthetic_cae_data'] = synthetic_data
+            
+            # PDF pages and table cells
+            transformed_data.update(self._transform_pdf_files())
+            
+            # Generate synthetic CAE data for analysis
+            start = time.perf_counter()
+            rss_before = peak_rss_mb()
+            synthetic_data = self._generate_synthetic_cae_data()
+            transformed_data['synthetic_cae_data'] = synthetic_data
+            self.run_metrics.record_item('transform', 'synthetic_cae_data', time.perf_counter() - start,
+                                         rows=len(synthetic_data), peak_rss_before_mb=rss_before)
         
         self.pipeline_metrics['total_records'] = sum(len(df) for df in transformed_data.values())
         
@@ -328,118 +741,480 @@ class CAEETLPipeline:
             df = df.dropna(how='all')  # Remove completely empty rows
             df = df.drop_duplicates()  # Remove duplicates
             
-            # Standardize column names
-            df.columns = df.columns.str.lower().str.replace(' ', '_').str.replace('-', '_')
-            
-            return df
+            return self._standardize_columns(df)
             
         except Exception as e:
             logger.error(f"Error loading {file_path}: {e}")
             return None
     
-    def _generate_synthetic_cae_data(self) -> pd.DataFrame:
-        """Generate synthetic CAE data for analysis"""
-        np.random.seed(42)
+    def _iter_raw_files(self):
+        """Iterate over transformable raw files, skipping metadata sidecars"""
+        for file_path in sorted(self.raw_dir.glob("*")):
+            if file_path.suffix in ['.csv', '.xlsx', '.json'] and not file_path.name.endswith('.metadata.json'):
+                yield file_path
+    
+    def _transform_pdf_files(self) -> Dict[str, pd.DataFrame]:
+        """
+        Extract text and tables from every raw PDF
         
-        n_companies = 5000
-        n_years = 5
+        Each ``raw/<name>.pdf`` yields ``<name>_pages`` (one row per page)
+        and ``<name>_tables`` (one row per table cell). The file checksum keys
+        the page cache, so unchanged PDFs are not re-parsed.
         
-        data = []
+        Returns:
+            Dictionary of non-empty DataFrames
+        """
+        pdf_files = []
+        for file_path in sorted(self.raw_dir.glob("*.pdf")):
+            pdf_files.append((file_path.stem, file_path, self._recorded_checksum(file_path)))
         
-        for year in range(2020, 2025):
-            for company_id in range(n_companies):
-                # Company characteristics
-                company_size = np.random.choice(['micro', 'pequeña', 'mediana', 'grande'], 
-                                              p=[0.6, 0.25, 0.12, 0.03])
-                
-                # CAE-related metrics
-                cae_procedures = np.random.poisson(3) if company_size in ['micro', 'pequeña'] else np.random.poisson(8)
-                administrative_cost = np.random.normal(5000, 2000) if company_size == 'micro' else np.random.normal(15000, 5000)
-                processing_time_days = np.random.normal(45, 15)
-                
-                # Inefficiency indicators
-                inefficiency_score = np.random.beta(2, 5)  # Skewed towards lower inefficiency
-                if company_size == 'micro':
-                    inefficiency_score += 0.2  # Micro companies face more inefficiencies
-                
-                # Geographic factors
-                region = np.random.choice(['Madrid', 'Cataluña', 'Andalucía', 'Valencia', 'País Vasco', 'Otras'])
-                if region in ['Madrid', 'Cataluña']:
-                    processing_time_days *= 0.8  # More efficient regions
+        if not pdf_files:
+            return {}
+        
+        # Documents share one process pool, so they are timed together
+        start = time.perf_counter()
+        rss_before = peak_rss_mb()
+        documents = self.pdf_ingestor.ingest(pdf_files)
+        self.run_metrics.record_item('transform', 'pdf_documents', time.perf_counter() - start,
+                                     rows=sum(len(document['pages']) for document in documents.values()),
+                                     bytes_count=sum(path.stat().st_size for _, path, _ in pdf_files),
+                                     peak_rss_before_mb=rss_before)
+        
+        frames = {}
+        for name, document in documents.items():
+            for kind, df in document.items():
+                if not df.empty:
+                    frames[f"{name}_{kind}"] = df
+            logger.info(f"Transformed {name}.pdf: {len(document['pages'])} pages, "
+                        f"{len(document['tables'])} table cells")
+        return frames
+    
+    def _recorded_checksum(self, file_path: Path) -> Optional[str]:
+        """
+        Checksum from the metadata sidecar, if it still describes the file
+        
+        The sidecar is only trusted when its algorithm matches and the file's
+        size and mtime are the ones recorded at extraction; otherwise (the
+        file was rewritten after download, or an older sidecar without
+        them) None is returned and the caller hashes the file itself.
+        """
+        metadata = self._read_metadata(file_path)
+        if metadata.get('checksum_algorithm') != self.checksum_algorithm:
+            return None
+        try:
+            file_stat = file_path.stat()
+        except OSError:
+            return None
+        if (metadata.get('file_size_bytes'), metadata.get('file_mtime_ns')) != \
+                (file_stat.st_size, file_stat.st_mtime_ns):
+            return None
+        return metadata.get('checksum')
+    
+    @staticmethod
+    def _standardize_columns(df: pd.DataFrame) -> pd.DataFrame:
+        """Standardize column names to lower snake case"""
+        df.columns = df.columns.astype(str).str.lower().str.replace(' ', '_').str.replace('-', '_')
+        return df
+    
+    def transform_data_streaming(self, chunk_size: int = 100_000) -> Dict[str, Path]:
+        """
+        Transform raw data in bounded-size chunks straight to partitioned Parquet
+        
+        CSV and JSON Lines inputs are read ``chunk_size`` rows at a time, so
+        the rows held in memory are bounded by the chunk size. Duplicates are
+        removed across chunks with a set of 64-bit row digests, which does
+        grow with the input (tens of bytes per unique row, far less than the
+        rows themselves). Every cleaned chunk is written as one part of a
+        Parquet dataset under ``processed/<dataset>/``.
+        
+        Args:
+            chunk_size: Maximum number of rows held in memory per chunk
+            
+        Returns:
+            Dictionary mapping dataset names to their Parquet dataset directories
+        """
+        logger.info(f"Starting streaming data transformation phase (chunk_size={chunk_size})")
+        self._ensure_run()
+        
+        outputs = {}
+        total_records = 0
+        
+        with self.run_metrics.stage('transform'):
+            for file_path in self._iter_raw_files():
+                start = time.perf_counter()
+                rss_before = peak_rss_mb()
+                try:
+                    dataset_dir, records = self._stream_transform_file(file_path, chunk_size)
+                    if records:
+                        outputs[file_path.stem] = dataset_dir
+                        total_records += records
+                        self.run_metrics.record_item('transform', file_path.stem, time.perf_counter() - start,
+                                                     rows=records, bytes_count=file_path.stat().st_size,
+                                                     peak_rss_before_mb=rss_before)
+                        logger.info(f"Transformed {file_path.name}: {records} records (streaming)")
+                except Exception as e:
+                    logger.error(f"Error transforming {file_path.name}: {e}")
+            
+            # PDF pages and table cells (already bounded per page)
+            for name, df in self._transform_pdf_files().items():
+                try:
+                    outputs[name] = self._write_parquet_parts(name, iter([df]))
+                    total_records += len(df)
+                except Exception as e:
+                    logger.error(f"Error writing {name}: {e}")
+            
+            # Generate synthetic CAE data for analysis
+            start = time.perf_counter()
+            rss_before = peak_rss_mb()
+            synthetic_data = self._generate_synthetic_cae_data()
+            chunks = (synthetic_data.iloc[offset:offset + chunk_size]
+                      for offset in range(0, len(synthetic_data), chunk_size))
+            outputs['synthetic_cae_data'] = self._write_parquet_parts('synthetic_cae_data', chunks)
+            total_records += len(synthetic_data)
+            self.run_metrics.record_item('transform', 'synthetic_cae_data', time.perf_counter() - start,
+                                         rows=len(synthetic_data), peak_rss_before_mb=rss_before)
+        
+        self.pipeline_metrics['total_records'] = total_records
+        
+        logger.info(f"Streaming transformation completed: {len(outputs)} datasets, "
+                   f"{total_records} total records")
+        
+        return outputs
+    
+    def _stream_transform_file(self, file_path: Path, chunk_size: int) -> Tuple[Optional[Path], int]:
+        """Clean, deduplicate and write a single raw file chunk by chunk"""
+        seen_digests = set()
+        records = 0
+        
+        def cleaned_chunks():
+            nonlocal records
+            for chunk in self._iter_file_chunks(file_path, chunk_size):
+                chunk = self._standardize_columns(chunk.dropna(how='all'))
+                if chunk.empty:
+                    continue
                 
-                data.append({
-                    'company_id': f"COMP_{company_id:04d}",
-                    'year': year,
-                    'company_size': company_size,
-                    'region': region,
-                    'cae_procedures': max(0, cae_procedures),
-                    'administrative_cost_eur': max(0, administrative_cost),
-                    'processing_time_days': max(1, processing_time_days),
-                    'inefficiency_score': min(1.0, inefficiency_score),
-                    'sector': np.random.choice(['Construcción', 'Servicios', 'Industria', 'Comercio']),
-                    'employees': np.random.randint(1, 500) if company_size == 'micro' else np.random.randint(500, 5000),
-                    'annual_revenue_eur': np.random.randint(100000, 10000000),
-                    'cae_compliance_rate': np.random.beta(8, 2),  # High compliance rate
-                    'bureaucratic_burden_score': np.random.beta(3, 7)  # Low burden
-                })
-        
-        return pd.DataFrame(data)
-    
-    def load_data(self, transformed_data: Dict[str, pd.DataFrame]) -> None:
+                # Keep only rows whose digest has not been seen in this or any previous chunk
+                digests = pd.util.hash_pandas_object(chunk, index=False).tolist()
+                keep = np.fromiter(
+                    (digest not in seen_digests and not seen_digests.add(digest) for digest in digests),
+                    dtype=bool, count=len(digests)
+                )
+                chunk = chunk[keep]
+                if chunk.empty:
+                    continue
+                records += len(chunk)
+                yield chunk
+        
+        dataset_dir = self._write_parquet_parts(file_path.stem, cleaned_chunks())
+        return dataset_dir, records
+    
+    def _iter_file_chunks(self, file_path: Path, chunk_size: int):
+        """Yield DataFrame chunks of at most ``chunk_size`` rows from a raw file"""
+        if file_path.suffix == '.csv':
+            with pd.read_csv(file_path, encoding='utf-8', chunksize=chunk_size) as reader:
+                yield from reader
+            return
+        
+        if file_path.suffix == '.json' and self._is_json_lines(file_path):
+            with pd.read_json(file_path, lines=True, chunksize=chunk_size) as reader:
+                yield from reader
+            return
+        
+        # Excel workbooks and JSON documents cannot be parsed incrementally
+        if file_path.suffix == '.xlsx':
+            df = pd.read_excel(file_path)
+        else:
+            df = pd.read_json(file_path)
+        for start in range(0, len(df), chunk_size):
+            yield df.iloc[start:start + chunk_size]
+    
+    @staticmethod
+    def _is_json_lines(file_path: Path) -> bool:
+        """
+        Check whether a JSON file holds one record per line
+        
+        The first two non-empty lines must both be complete objects, so a
+        document written on a single line is not mistaken for JSON Lines.
+        """
+        records = 0
+        with open(file_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    if not isinstance(json.loads(line), dict):
+                        return False
+                except ValueError:
+                    return False
+                records += 1
+                if records == 2:
+                    return True
+        return False
+    
+    def _write_parquet_parts(self, name: str, chunks) -> Optional[Path]:
+        """
+        Write DataFrame chunks as the parts of a Parquet dataset
+        
+        Parts are written to a temporary directory that replaces
+        ``processed/<name>/`` once every chunk has been written. Chunk
+        schemas are unified as they arrive (nulls take the type seen in
+        other chunks, integers widen to floats, a column inferred as numbers
+        in one chunk and text in another becomes text) and parts written
+        before a promotion are rewritten with the final schema, so every
+        part shares one schema. If the chunks still cannot be unified, or no
+        rows were produced, the previous dataset is left untouched.
+        
+        Returns:
+            The dataset directory, or None when there was nothing to write
+        
+        Raises:
+            ValueError: If chunk schemas are incompatible
+        """
+        dataset_dir = self.processed_dir / name
+        tmp_dir = self.processed_dir / f".{name}.tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        tmp_dir.mkdir(parents=True)
+        
+        try:
+            schema = None
+            part_schemas = []
+            for part_number, chunk in enumerate(chunks):
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if schema is None:
+                    schema = table.schema
+                elif not table.schema.equals(schema):
+                    try:
+                        schema = self._merge_schemas(schema, table.schema)
+                        table = table.cast(schema)
+                    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError) as e:
+                        raise ValueError(f"Incompatible schema in {name} part {part_number}: {e}") from e
+                pq.write_table(table, tmp_dir / f"part-{part_number:05d}.parquet")
+                part_schemas.append(table.schema)
+            
+            if schema is None:
+                shutil.rmtree(tmp_dir)
+                logger.warning(f"No records for {name}, keeping the previous dataset")
+                return None
+            
+            # Bring parts written before a later promotion up to the final schema
+            for part_number, part_schema in enumerate(part_schemas):
+                if not part_schema.equals(schema):
+                    part_path = tmp_dir / f"part-{part_number:05d}.parquet"
+                    pq.write_table(pq.read_table(part_path).cast(schema), part_path)
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        
+        shutil.rmtree(dataset_dir, ignore_errors=True)
+        tmp_dir.rename(dataset_dir)
+        return dataset_dir
+    
+    @staticmethod
+    def _merge_schemas(schema: pa.Schema, other: pa.Schema) -> pa.Schema:
+        """
+        Permissive union of two chunk schemas
+        
+        Columns whose types cannot be promoted into each other (e.g. int64
+        in one chunk and string in another) fall back to string.
+        """
+        try:
+            return pa.unify_schemas([schema, other], promote_options='permissive')
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            pass
+        
+        conflicts = set()
+        for field in schema:
+            if field.name not in other.names:
+                continue
+            try:
+                pa.unify_schemas([pa.schema([field]), pa.schema([other.field(field.name)])],
+                                 promote_options='permissive')
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                conflicts.add(field.name)
+        
+        def as_text(s: pa.Schema) -> pa.Schema:
+            return pa.schema([f.with_type(pa.string()) if f.name in conflicts else f for f in s],
+                             metadata=s.metadata)
+        return pa.unify_schemas([as_text(schema), as_text(other)], promote_options='permissive')
+    
+    def _generate_synthetic_cae_data(self, n_companies: int = 5000,
+                                     years: Tuple[int, int] = (2020, 2025),
+                                     seed: Optional[int] = 42) -> pd.DataFrame:
+        """
+        Generate synthetic CAE data for analysis
+
+        Every column is drawn for all company-years in a single batched call
+        on a ``np.random.Generator``, so the cost is dominated by NumPy rather
+        than Python overhead and scales to millions of rows.
+
+        Args:
+            n_companies: Number of companies simulated per year
+            years: Half-open ``(first, last)`` range of years to simulate
+            seed: Seed for the random generator (``None`` for a fresh draw)
+
+        Returns:
+            DataFrame with one row per company and year
+        """
+        rng = np.random.default_rng(seed)
+        
+        year_values = np.arange(years[0], years[1])
+        n_rows = n_companies * len(year_values)
+        
+        sizes = np.array(['micro', 'pequeña', 'mediana', 'grande'])
+        regions = np.array(['Madrid', 'Cataluña', 'Andalucía', 'Valencia', 'País Vasco', 'Otras'])
+        sectors = np.array(['Construcción', 'Servicios', 'Industria', 'Comercio'])
+        
+        # Company characteristics (one draw per company-year, as before)
+        size_codes = rng.choice(len(sizes), size=n_rows, p=[0.6, 0.25, 0.12, 0.03])
+        is_micro = size_codes == 0
+        is_small_or_micro = size_codes <= 1
+        
+        # CAE-related metrics
+        cae_procedures = np.where(is_small_or_micro,
+                                  rng.poisson(3, n_rows),
+                                  rng.poisson(8, n_rows))
+        administrative_cost = np.where(is_micro,
+                                       rng.normal(5000, 2000, n_rows),
+                                       rng.normal(15000, 5000, n_rows))
+        processing_time_days = rng.normal(45, 15, n_rows)
+        
+        # Inefficiency indicators: micro companies face more inefficiencies
+        inefficiency_score = rng.beta(2, 5, n_rows)
+        inefficiency_score[is_micro] += 0.2
+        
+        # Geographic factors: Madrid and Cataluña are more efficient regions
+        region_codes = rng.integers(0, len(regions), n_rows)
+        processing_time_days[region_codes <= 1] *= 0.8
+        
+        employees = np.where(is_micro,
+                             rng.integers(1, 500, n_rows),
+                             rng.integers(500, 5000, n_rows))
+        
+        company_labels = np.array([f"COMP_{company_id:04d}" for company_id in range(n_companies)])
+        
+        return pd.DataFrame({
+            'company_id': np.tile(company_labels, len(year_values)),
+            'year': np.repeat(year_values, n_companies),
+            'company_size': pd.Categorical.from_codes(size_codes, categories=sizes),
+            'region': pd.Categorical.from_codes(region_codes, categories=regions),
+            'cae_procedures': np.maximum(0, cae_procedures),
+            'administrative_cost_eur': np.maximum(0, administrative_cost),
+            'processing_time_days': np.maximum(1, processing_time_days),
+            'inefficiency_score': np.minimum(1.0, inefficiency_score),
+            'sector': pd.Categorical.from_codes(rng.integers(0, len(sectors), n_rows), categories=sectors),
+            'employees': employees,
+            'annual_revenue_eur': rng.integers(100000, 10000000, n_rows),
+            'cae_compliance_rate': rng.beta(8, 2, n_rows),  # High compliance rate
+            'bureaucratic_burden_score': rng.beta(3, 7, n_rows)  # Low burden
+        })
+    
+    def load_data(self, transformed_data: Dict[str, pd.DataFrame],
+                  sink_config: Optional[SinkConfig] = None) -> None:
         """
         Load transformed data to processed directory
         
         Args:
             transformed_data: Dictionary of transformed DataFrames
+            sink_config: Overrides the pipeline's sink configuration for this load
         """
         logger.info("Starting data loading phase")
+        self._ensure_run()
         
-        for name, df in transformed_data.items():
-            try:
-                # Save as parquet for efficiency
-                output_path = self.processed_dir / f"{name}.parquet"
-                df.to_parquet(output_path, index=False)
-                
-                # Also save as CSV for compatibility
-                csv_path = self.processed_dir / f"{name}.csv"
-                df.to_csv(csv_path, index=False)
-                
-                logger.info(f"Loaded {name}: {len(df)} records to {output_path}")
-                
-            except Exception as e:
-                logger.error(f"Error loading {name}: {e}")
+        sink = DatasetSink(self.processed_dir, sink_config or self.sink_config)
+        
+        with self.run_metrics.stage('load'):
+            for name, df in transformed_data.items():
+                start = time.perf_counter()
+                rss_before = peak_rss_mb()
+                try:
+                    output_paths = sink.write(name, df)
+                    self.run_metrics.record_item('load', name, time.perf_counter() - start, rows=len(df),
+                                                 bytes_count=sum(self._path_size(path) for path in output_paths),
+                                                 peak_rss_before_mb=rss_before)
+                    
+                    logger.info(f"Loaded {name}: {len(df)} records to "
+                               f"{', '.join(str(path) for path in output_paths)}")
+                    
+                except Exception as e:
+                    logger.error(f"Error loading {name}: {e}")
         
         # Calculate data quality score
-        self.pipeline_metrics['data_quality_score'] = self._calculate_data_quality_score(transformed_data)
+        with self.run_metrics.stage('quality'):
+            self.pipeline_metrics['data_quality_score'] = self._calculate_data_quality_score(transformed_data)
         
         self.pipeline_metrics['end_time'] = datetime.now()
         duration = self.pipeline_metrics['end_time'] - self.pipeline_metrics['start_time']
         
         logger.info(f"ETL Pipeline completed in {duration.total_seconds():.2f} seconds")
         logger.info(f"Data quality score: {self.pipeline_metrics['data_quality_score']:.2f}")
+        
+        self.save_run_metrics()
+    
+    @staticmethod
+    def _path_size(path: Path) -> int:
+        """Size in bytes of an output file or dataset directory"""
+        if path.is_dir():
+            return sum(f.stat().st_size for f in path.rglob('*') if f.is_file())
+        return path.stat().st_size if path.exists() else 0
+    
+    def _start_run(self) -> None:
+        """Begin a new run: reset stage metrics and assign a run id"""
+        self.pipeline_metrics['start_time'] = datetime.now()
+        self.pipeline_metrics['end_time'] = None
+        self.run_id = self._make_run_id(self.pipeline_metrics['start_time'])
+        self.run_metrics = RunMetricsCollector()
+        self._run_active = True
+    
+    def _ensure_run(self) -> None:
+        """
+        Start a run unless one is in progress
+        
+        Extraction always starts a run; transform and load join it, or start
+        their own when called on their own, so they never overwrite the
+        previous run's history.
+        """
+        if not self._run_active:
+            self._start_run()
+    
+    @staticmethod
+    def _make_run_id(start_time: datetime) -> str:
+        """Sortable run identifier derived from the run start time"""
+        return start_time.strftime('%Y%m%dT%H%M%S%f')
+    
+    def save_run_metrics(self) -> None:
+        """
+        Persist the current run in the run history database
+        
+        Runs can be listed and compared with ``python src/etl/run_history.py``.
+        A failure to write the history is logged and never fails the pipeline.
+        """
+        self._ensure_run()
+        self._run_active = False
+        
+        try:
+            self.run_history.record_run(self.run_id, self.pipeline_metrics, self.run_metrics)
+            for stage in self.run_metrics.stages.values():
+                logger.info(f"Stage {stage['stage']}: {stage['seconds']:.2f}s, {stage['rows']} rows, "
+                           f"{stage['bytes'] / (1024 * 1024):.2f}MB")
+        except Exception as e:
+            logger.warning(f"Could not record run {self.run_id}: {e}")
     
     def _calculate_data_quality_score(self, data: Dict[str, pd.DataFrame]) -> float:
-        """Calculate overall data quality score"""
+        """
+        Calculate overall data quality score
+        
+        Per-dataset reports with per-column completeness, uniqueness and
+        validity are kept in ``self.data_quality_reports``.
+        """
         if not data:
             return 0.0
         
-        quality_scores = []
-        
-        for name, df in data.items():
-            # Completeness score
-            completeness = 1 - (df.isnull().sum().sum() / (len(df) * len(df.columns)))
-            
-            # Consistency score (no duplicates)
-            consistency = 1 - (df.duplicated().sum() / len(df))
-            
-            # Validity score (basic data type validation)
-            validity = 1.0  # Simplified for now
-            
-            # Overall score for this dataset
-            dataset_score = (completeness + consistency + validity) / 3
-            quality_scores.append(dataset_score)
+        self.data_quality_reports = {
+            name: self.quality_engine.evaluate(df) for name, df in data.items()
+        }
         
-        return np.mean(quality_scores)
+        return float(np.mean([report['quality_score'] for report in self.data_quality_reports.values()]))
     
     def get_pipeline_summary(self) -> Dict:
         """Get comprehensive pipeline summary"""
@@ -448,7 +1223,10 @@ class CAEETLPipeline:
             duration = (self.pipeline_metrics['end_time'] - self.pipeline_metrics['start_time']).total_seconds()
         
         return {
+            'run_id': self.run_id,
             'pipeline_metrics': self.pipeline_metrics,
+            'stage_metrics': self.run_metrics.stages,
+            'http_stats': self.http.stats.summary(),
             'duration_seconds': duration,
             'data_sources_count': len(self.data_sources),
             'success_rate': (
@@ -469,7 +1247,7 @@ def main():
     
     try:
         # Extract data
-        extraction_results = pipeline.extract_data(parallel=True)
+        pipeline.extract_data(parallel=True)
         
         # Transform data
         transformed_data = pipeline.transform_data()
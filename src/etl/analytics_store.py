@@ -0,0 +1,429 @@
+"""
+CAE Analytics Store - Embedded columnar store for processed ETL outputs
+Incrementally bulk-loads data/processed into Parquet tables tracked by a SQLite catalog
+
+Usage:
+    python src/etl/analytics_store.py load [--processed-dir DIR] [--full]
+    python src/etl/analytics_store.py tables
+    python src/etl/analytics_store.py query "SELECT * FROM ine_stats_processed"
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pv
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+try:
+    from report_store import read_report
+except ImportError:
+    from src.etl.report_store import read_report
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROCESSED_DIR = Path("data") / "processed"
+DEFAULT_STORE_DIR = Path("data") / "warehouse"
+
+# Separator for flattened nested JSON keys and child-table names
+NESTED_SEPARATOR = '__'
+
+# Row ordinal of a parent table and the reference to it from its child tables
+ROW_COLUMN = '_row'
+PARENT_ROW_COLUMN = '_parent_row'
+
+def table_name(name: str) -> str:
+    """Lower snake-case identifier usable as a table name (``__`` separators are kept)"""
+    name = re.sub(r'[^0-9a-zA-Z_]+', '_', name).strip('_').lower()
+    return f"t_{name}" if not name or name[0].isdigit() else name
+
+def flatten_json(document, name: str) -> Dict[str, pd.DataFrame]:
+    """
+    Turn a JSON document into tables
+
+    A list of objects becomes one table with a row per object. An object
+    becomes a one-row table whose nested objects are flattened into
+    ``parent__child`` columns; lists of objects inside it become child tables
+    named ``<name>__<key>`` and lists of scalars are kept as JSON strings.
+    Child rows of every parent row go into the same child table, with a
+    ``_parent_row`` column matching the parent table's ``_row`` ordinal.
+    """
+    rows_by_table: Dict[str, List[Dict]] = {}
+    parent_tables = set()
+
+    def flatten_object(obj: Dict, prefix: str, row: Dict, table: str, ordinal: int) -> None:
+        for key, value in obj.items():
+            column = f"{prefix}{key}"
+            if isinstance(value, dict):
+                flatten_object(value, f"{column}{NESTED_SEPARATOR}", row, table, ordinal)
+            elif isinstance(value, list) and value and all(isinstance(item, dict) for item in value):
+                parent_tables.add(table)
+                add_records(value, f"{table}{NESTED_SEPARATOR}{column}", parent_row=ordinal)
+            elif isinstance(value, list):
+                row[column] = json.dumps(value, ensure_ascii=False)
+            else:
+                row[column] = value
+
+    def add_records(records: List[Dict], table: str, parent_row: Optional[int] = None) -> None:
+        table_rows = rows_by_table.setdefault(table, [])
+        for record in records:
+            row: Dict = {} if parent_row is None else {PARENT_ROW_COLUMN: parent_row}
+            ordinal = len(table_rows)
+            table_rows.append(row)
+            flatten_object(record, '', row, table, ordinal)
+
+    if isinstance(document, list) and all(isinstance(item, dict) for item in document):
+        add_records(document, name)
+    elif isinstance(document, dict):
+        add_records([document], name)
+    else:
+        return {table_name(name): pd.DataFrame({'value': [json.dumps(document, ensure_ascii=False)]})}
+
+    tables = {}
+    for table, rows in rows_by_table.items():
+        df = pd.DataFrame(rows)
+        if df.columns.difference([PARENT_ROW_COLUMN]).empty:
+            # Rows that only hold child lists
+            continue
+        if table in parent_tables:
+            df.insert(0, ROW_COLUMN, range(len(df)))
+        tables[table_name(table)] = df
+    return tables
+
+class AnalyticsStore:
+    """
+    Columnar store of every processed dataset
+
+    ``load`` scans the processed directory and only reloads files whose size
+    or modification time changed and whose content hash differs from the
+    last load. CSV and JSON files are converted once into Parquet tables
+    under ``<store>/tables/``; Parquet files and datasets written by the
+    pipeline are registered in place. The SQLite catalog maps table names to
+    their locations, row counts and columns, so readers scan columns with
+    ``scan`` (or SQL through DuckDB with ``sql``) instead of re-parsing
+    the original files.
+    """
+
+    def __init__(self, store_dir: Path = DEFAULT_STORE_DIR, compression: str = 'snappy'):
+        self.store_dir = Path(store_dir)
+        self.tables_dir = self.store_dir / "tables"
+        self.catalog_path = self.store_dir / "catalog.db"
+        self.compression = compression
+        self.tables_dir.mkdir(parents=True, exist_ok=True)
+        self.init_catalog()
+
+    def init_catalog(self) -> None:
+        """Create the catalog tables if they do not exist"""
+        with sqlite3.connect(self.catalog_path) as conn:
+            conn.executescript('''
+                CREATE TABLE IF NOT EXISTS sources (
+                    source_path TEXT PRIMARY KEY,
+                    fingerprint TEXT NOT NULL,
+                    checksum TEXT NOT NULL,
+                    loaded_at TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS tables (
+                    table_name TEXT PRIMARY KEY,
+                    source_path TEXT NOT NULL,
+                    location TEXT NOT NULL,
+                    managed INTEGER NOT NULL,
+                    row_count INTEGER,
+                    columns TEXT,
+                    updated_at TEXT NOT NULL
+                );
+            ''')
+
+    # ----- Loading -----
+
+    @staticmethod
+    def _iter_sources(processed_dir: Path):
+        """
+        Processed files and Parquet dataset directories, skipping hidden temporaries
+
+        When a dataset was written both as Parquet and as CSV, only the
+        Parquet copy is used; a JSON Lines report supersedes a JSON file
+        of the same name.
+        """
+        parquet_names = {path.stem if path.is_file() else path.name
+                         for path in processed_dir.iterdir()
+                         if path.suffix == '.parquet' or (path.is_dir() and any(path.rglob('*.parquet')))}
+        jsonl_names = {path.stem for path in processed_dir.glob('*.jsonl')}
+        for path in sorted(processed_dir.iterdir()):
+            if path.name.startswith('.'):
+                continue
+            if path.is_dir():
+                if path.name in parquet_names:
+                    yield path
+            elif path.suffix == '.parquet':
+                yield path
+            elif path.suffix in ('.csv', '.json', '.jsonl') and path.stem not in parquet_names:
+                if not (path.suffix == '.json' and path.stem in jsonl_names):
+                    yield path
+
+    @staticmethod
+    def _files(path: Path) -> List[Path]:
+        return sorted(path.rglob('*.parquet')) if path.is_dir() else [path]
+
+    def _fingerprint(self, path: Path) -> str:
+        """Cheap change detector: relative names, sizes and mtimes of the source files"""
+        parts = []
+        for file_path in self._files(path):
+            stat = file_path.stat()
+            parts.append(f"{file_path.relative_to(path.parent)}:{stat.st_size}:{stat.st_mtime_ns}")
+        return '|'.join(parts)
+
+    def _checksum(self, path: Path) -> str:
+        file_hash = hashlib.md5()
+        for file_path in self._files(path):
+            file_hash.update(str(file_path.relative_to(path.parent)).encode())
+            with open(file_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                    file_hash.update(chunk)
+        return file_hash.hexdigest()
+
+    def load(self, processed_dir: Path = DEFAULT_PROCESSED_DIR, full: bool = False) -> Dict[str, List[str]]:
+        """
+        Bring the store up to date with a processed directory
+
+        Args:
+            processed_dir: Directory of ETL outputs
+            full: Reload every source even if unchanged
+
+        Returns:
+            Dictionary with the ``loaded``, ``unchanged``, ``removed`` and
+            ``failed`` source paths; failed sources are not recorded, so the
+            next load retries them
+        """
+        processed_dir = Path(processed_dir)
+        summary = {'loaded': [], 'unchanged': [], 'removed': [], 'failed': []}
+
+        with sqlite3.connect(self.catalog_path) as conn:
+            known = {
+                row[0]: (row[1], row[2])
+                for row in conn.execute('SELECT source_path, fingerprint, checksum FROM sources')
+            }
+
+        seen = set()
+        for path in self._iter_sources(processed_dir):
+            source_path = str(path)
+            seen.add(source_path)
+            fingerprint = self._fingerprint(path)
+            previous = known.get(source_path)
+
+            if not full and previous and previous[0] == fingerprint:
+                summary['unchanged'].append(source_path)
+                continue
+
+            checksum = self._checksum(path)
+            if not full and previous and previous[1] == checksum:
+                # Rewritten with identical content: only refresh the fingerprint
+                self._record_source(source_path, fingerprint, checksum)
+                summary['unchanged'].append(source_path)
+                continue
+
+            try:
+                self._load_source(path)
+            except Exception as e:
+                logger.error(f"Error loading {path} into the analytics store: {e}")
+                summary['failed'].append(source_path)
+                continue
+            self._record_source(source_path, fingerprint, checksum)
+            summary['loaded'].append(source_path)
+
+        for source_path in set(known) - seen:
+            self._drop_source(source_path)
+            summary['removed'].append(source_path)
+
+        logger.info(f"Analytics store: {len(summary['loaded'])} loaded, "
+                    f"{len(summary['unchanged'])} unchanged, {len(summary['removed'])} removed, "
+                    f"{len(summary['failed'])} failed")
+        return summary
+
+    def _load_source(self, path: Path) -> None:
+        """Replace every table produced by one source"""
+        source_path = str(path)
+        name = path.name if path.is_dir() else path.stem
+
+        if path.is_dir() or path.suffix == '.parquet':
+            dataset = ds.dataset(path, format='parquet', partitioning='hive' if path.is_dir() else None)
+            tables = {table_name(name): (str(path), dataset.schema, dataset.count_rows(), False)}
+        elif path.suffix == '.csv':
+            table = pv.read_csv(path)
+            tables = {table_name(name): self._write_table(table_name(name), table)}
+        else:
+            if path.suffix == '.jsonl':
+                document = self._read_json_lines(path)
+            else:
+                with open(path, 'r', encoding='utf-8') as f:
+                    document = json.load(f)
+            tables = {
+                child_name: self._write_table(child_name, pa.Table.from_pandas(df, preserve_index=False))
+                for child_name, df in flatten_json(document, name).items()
+            }
+
+        now = datetime.now().isoformat()
+        with sqlite3.connect(self.catalog_path) as conn:
+            stale = {row[0] for row in conn.execute(
+                'SELECT table_name FROM tables WHERE source_path = ?', (source_path,)
+            )} - set(tables)
+            for stale_name in stale:
+                self._remove_table(conn, stale_name)
+
+            for name, (location, schema, row_count, managed) in tables.items():
+                conn.execute(
+                    'INSERT OR REPLACE INTO tables VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (name, source_path, location, int(managed), row_count,
+                     json.dumps({field.name: str(field.type) for field in schema}), now)
+                )
+
+    @staticmethod
+    def _read_json_lines(path: Path):
+        """Full document of a ``report_store`` report, or the records of plain JSON Lines"""
+        try:
+            return read_report(path)
+        except ValueError:
+            with open(path, 'r', encoding='utf-8') as f:
+                return [json.loads(line) for line in f if line.strip()]
+
+    def _write_table(self, name: str, table: pa.Table):
+        """Write a managed table atomically; returns its catalog tuple"""
+        target = self.tables_dir / f"{name}.parquet"
+        tmp_path = self.tables_dir / f".{name}.parquet.tmp"
+        pq.write_table(table, tmp_path, compression=self.compression)
+        os.replace(tmp_path, target)
+        return str(target), table.schema, table.num_rows, True
+
+    def _record_source(self, source_path: str, fingerprint: str, checksum: str) -> None:
+        with sqlite3.connect(self.catalog_path) as conn:
+            conn.execute('INSERT OR REPLACE INTO sources VALUES (?, ?, ?, ?)',
+                         (source_path, fingerprint, checksum, datetime.now().isoformat()))
+
+    def _remove_table(self, conn: sqlite3.Connection, name: str) -> None:
+        row = conn.execute('SELECT location, managed FROM tables WHERE table_name = ?', (name,)).fetchone()
+        if row and row[1]:
+            Path(row[0]).unlink(missing_ok=True)
+        conn.execute('DELETE FROM tables WHERE table_name = ?', (name,))
+
+    def _drop_source(self, source_path: str) -> None:
+        """Forget a source that no longer exists, deleting its managed tables"""
+        with sqlite3.connect(self.catalog_path) as conn:
+            for (name,) in conn.execute('SELECT table_name FROM tables WHERE source_path = ?',
+                                        (source_path,)).fetchall():
+                self._remove_table(conn, name)
+            conn.execute('DELETE FROM sources WHERE source_path = ?', (source_path,))
+
+    # ----- Reading -----
+
+    def list_tables(self) -> pd.DataFrame:
+        """Catalog of tables with their source, location and row count"""
+        with sqlite3.connect(self.catalog_path) as conn:
+            return pd.read_sql_query(
+                'SELECT table_name, source_path, location, managed, row_count, updated_at '
+                'FROM tables ORDER BY table_name', conn
+            )
+
+    def dataset(self, name: str) -> ds.Dataset:
+        """Arrow dataset of a table, for lazy scans with projection and filter pushdown"""
+        with sqlite3.connect(self.catalog_path) as conn:
+            row = conn.execute('SELECT location FROM tables WHERE table_name = ?', (name,)).fetchone()
+        if row is None:
+            raise KeyError(f"Unknown table: {name}")
+        location = Path(row[0])
+        return ds.dataset(location, format='parquet', partitioning='hive' if location.is_dir() else None)
+
+    def scan(self, name: str, columns: Optional[List[str]] = None, filter=None) -> pd.DataFrame:
+        """
+        Read a table, optionally only some columns and rows
+
+        Args:
+            name: Table name
+            columns: Columns to read (all by default)
+            filter: ``pyarrow.dataset`` expression, e.g. ``ds.field('year') >= 2022``
+        """
+        return self.dataset(name).to_table(columns=columns, filter=filter).to_pandas()
+
+    def sql(self, query: str) -> pd.DataFrame:
+        """
+        Run SQL over every table with DuckDB
+
+        Tables are exposed as Arrow datasets, so DuckDB reads only the
+        columns and row groups the query needs.
+
+        Raises:
+            ImportError: If duckdb is not installed
+        """
+        if duckdb is None:
+            raise ImportError("duckdb is required for SQL queries on the analytics store")
+
+        conn = duckdb.connect()
+        try:
+            for name in self.list_tables()['table_name']:
+                conn.register(name, self.dataset(name))
+            return conn.execute(query).df()
+        finally:
+            conn.close()
+
+def load_processed():
+    """
+    Load data/processed into the default store (DAG runner entrypoint)
+
+    Returns False when any source failed to load, so the DAG runner marks
+    the task as failed and retries it on the next run.
+    """
+    summary = AnalyticsStore().load(DEFAULT_PROCESSED_DIR)
+    return False if summary['failed'] else summary
+
+def main():
+    """CLI para cargar y consultar el almacén analítico"""
+    parser = argparse.ArgumentParser(description="CAE analytics store")
+    parser.add_argument('--store', default=str(DEFAULT_STORE_DIR), help="Store directory")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    load_parser = subparsers.add_parser('load', help="Load new or changed processed outputs")
+    load_parser.add_argument('--processed-dir', default=str(DEFAULT_PROCESSED_DIR))
+    load_parser.add_argument('--full', action='store_true', help="Reload every source")
+
+    subparsers.add_parser('tables', help="List catalogued tables")
+
+    query_parser = subparsers.add_parser('query', help="Run a SQL query (requires duckdb)")
+    query_parser.add_argument('sql')
+
+    args = parser.parse_args()
+    store = AnalyticsStore(Path(args.store))
+
+    with pd.option_context('display.width', 200, 'display.max_columns', 20):
+        if args.command == 'load':
+            summary = store.load(Path(args.processed_dir), full=args.full)
+            for status, paths in summary.items():
+                print(f"{status}: {len(paths)}")
+                for path in paths:
+                    print(f"  {path}")
+            if summary['failed']:
+                return 1
+
+        elif args.command == 'tables':
+            print(store.list_tables().to_string(index=False))
+
+        elif args.command == 'query':
+            print(store.sql(args.sql).to_string(index=False))
+
+    return 0
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    exit(main())
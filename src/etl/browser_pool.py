@@ -0,0 +1,245 @@
+"""
+CAE Browser Pool - Reusable headless Chrome workers for dynamic-page scraping
+Bounded pool of long-lived browsers with per-task state reset, resource blocking and recycling
+"""
+
+import logging
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional, Set
+from urllib.parse import urlparse
+
+try:
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+except ImportError:
+    webdriver = None
+
+logger = logging.getLogger(__name__)
+
+# Resources that never carry data: skipped at the network layer
+BLOCKED_URL_PATTERNS = [
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico',
+    '*.css', '*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot',
+    '*.mp4', '*.webm', '*.mp3'
+]
+
+DEFAULT_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+def _origin(url: str) -> Optional[str]:
+    """``scheme://host[:port]`` of an http(s) URL, None for about:, data: and the like"""
+    parsed = urlparse(url)
+    if parsed.scheme not in ('http', 'https') or not parsed.netloc:
+        return None
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+def build_chrome_options(user_agent: str = DEFAULT_USER_AGENT) -> 'Options':
+    """Headless Chrome options with images disabled"""
+    chrome_options = Options()
+    chrome_options.add_argument('--headless')
+    chrome_options.add_argument('--no-sandbox')
+    chrome_options.add_argument('--disable-dev-shm-usage')
+    chrome_options.add_argument('--disable-gpu')
+    chrome_options.add_argument('--window-size=1920,1080')
+    chrome_options.add_argument('--blink-settings=imagesEnabled=false')
+    chrome_options.add_argument(f'--user-agent={user_agent}')
+    chrome_options.add_experimental_option('prefs', {
+        'profile.managed_default_content_settings.images': 2,
+        'profile.managed_default_content_settings.fonts': 2
+    })
+    return chrome_options
+
+class BrowserWorker:
+    """One long-lived Chrome instance and the number of pages it has served"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages_served = 0
+
+    def block_resources(self) -> None:
+        """Block images, fonts, stylesheets and media through the DevTools protocol"""
+        try:
+            self.driver.execute_cdp_cmd('Network.enable', {})
+            self.driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_URL_PATTERNS})
+        except Exception as e:
+            # Non-Chromium drivers: the image/font preferences still apply
+            logger.debug(f"Resource blocking unavailable: {e}")
+
+    def _history_origins(self) -> Set[str]:
+        """Origins of every page the current tab has navigated to"""
+        history = self.driver.execute_cdp_cmd('Page.getNavigationHistory', {})
+        return {_origin(entry['url']) for entry in history.get('entries', [])} - {None}
+
+    def _cookie_origins(self) -> Set[str]:
+        """Origins owning a cookie anywhere in the browser"""
+        cookies = self.driver.execute_cdp_cmd('Network.getAllCookies', {}).get('cookies', [])
+        return {f"{scheme}://{cookie['domain'].lstrip('.')}"
+                for cookie in cookies for scheme in ('https', 'http')}
+
+    def reset(self) -> None:
+        """
+        Give the next task a clean context: one blank tab, no cookies, storage or cache
+
+        Cookies are cleared browser-wide. Storage (localStorage, IndexedDB,
+        cache storage, service workers...) is cleared for every origin found
+        in the tabs' navigation history or in the cookie jar, not only the
+        origin currently open.
+        """
+        handles = self.driver.window_handles
+        origins: Set[str] = set()
+        for handle in reversed(handles):
+            self.driver.switch_to.window(handle)
+            try:
+                origins |= self._history_origins()
+            except Exception:
+                pass
+            if handle != handles[0]:
+                self.driver.close()
+        self.driver.switch_to.window(handles[0])
+
+        try:
+            origins |= self._cookie_origins()
+            self.driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+            for origin in origins:
+                self.driver.execute_cdp_cmd('Storage.clearDataForOrigin',
+                                            {'origin': origin, 'storageTypes': 'all'})
+            self.driver.execute_cdp_cmd('Network.clearBrowserCache', {})
+        except Exception as e:
+            # Non-Chromium drivers: only the current origin can be cleared
+            logger.debug(f"DevTools reset unavailable: {e}")
+            self.driver.delete_all_cookies()
+            self.driver.execute_script(
+                'try { window.localStorage.clear(); window.sessionStorage.clear(); } catch (e) {}'
+            )
+        self.driver.get('about:blank')
+
+    def quit(self) -> None:
+        try:
+            self.driver.quit()
+        except Exception as e:
+            logger.debug(f"Error closing browser: {e}")
+
+class BrowserPool:
+    """
+    Bounded pool of reusable headless browsers
+
+    At most ``size`` browsers run at once. They are started lazily, lent to
+    one task at a time through ``browser()``, reset between tasks and
+    restarted after ``max_pages_per_browser`` pages (or after a task fails)
+    so memory leaks and stuck renderers do not accumulate. When Selenium or
+    Chrome is not installed, ``browser()`` yields ``None`` and callers use
+    their HTTP-only path instead.
+    """
+
+    def __init__(self, size: int = 2, max_pages_per_browser: int = 20,
+                 page_load_timeout: float = 30, user_agent: str = DEFAULT_USER_AGENT,
+                 driver_factory: Optional[Callable] = None, enabled: bool = True):
+        """
+        Args:
+            size: Maximum number of concurrent browsers
+            max_pages_per_browser: Pages served before a browser is restarted
+            page_load_timeout: Seconds before ``driver.get`` gives up
+            user_agent: User-Agent sent by the browsers
+            driver_factory: Callable returning a new WebDriver (defaults to
+                headless Chrome built from ``build_chrome_options``)
+            enabled: False to always take the HTTP-only path
+        """
+        self.size = size
+        self.max_pages_per_browser = max_pages_per_browser
+        self.page_load_timeout = page_load_timeout
+        self.user_agent = user_agent
+        self.driver_factory = driver_factory
+
+        self._idle: 'queue.LifoQueue[BrowserWorker]' = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._workers: List[BrowserWorker] = []
+        self._unavailable = not enabled or (driver_factory is None and webdriver is None)
+        self.browsers_started = 0
+
+    @property
+    def available(self) -> bool:
+        """False once it is known that no browser can be started"""
+        return not self._unavailable
+
+    def _start_worker(self) -> Optional[BrowserWorker]:
+        try:
+            if self.driver_factory is not None:
+                driver = self.driver_factory()
+            else:
+                driver = webdriver.Chrome(options=build_chrome_options(self.user_agent))
+            driver.set_page_load_timeout(self.page_load_timeout)
+        except Exception as e:
+            logger.warning(f"Could not start a browser, falling back to HTTP: {e}")
+            self._unavailable = True
+            return None
+
+        worker = BrowserWorker(driver)
+        worker.block_resources()
+        with self._lock:
+            self._workers.append(worker)
+            self.browsers_started += 1
+        return worker
+
+    def _retire(self, worker: BrowserWorker) -> None:
+        with self._lock:
+            if worker in self._workers:
+                self._workers.remove(worker)
+        worker.quit()
+
+    @contextmanager
+    def browser(self) -> Iterator:
+        """
+        Borrow a browser for one task
+
+        Yields:
+            A WebDriver with clean state, or ``None`` if no browser is available
+        """
+        if self._unavailable:
+            yield None
+            return
+
+        with self._slots:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                worker = self._start_worker()
+
+            if worker is None:
+                yield None
+                return
+
+            healthy = False
+            try:
+                yield worker.driver
+                healthy = True
+            finally:
+                worker.pages_served += 1
+                if healthy and worker.pages_served < self.max_pages_per_browser:
+                    try:
+                        worker.reset()
+                        self._idle.put(worker)
+                    except Exception as e:
+                        logger.debug(f"Browser reset failed, restarting it: {e}")
+                        self._retire(worker)
+                else:
+                    self._retire(worker)
+
+    def close(self) -> None:
+        """Quit every browser; the pool can be reused and restarts them lazily"""
+        while True:
+            try:
+                self._idle.get_nowait()
+            except queue.Empty:
+                break
+        with self._lock:
+            workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.quit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
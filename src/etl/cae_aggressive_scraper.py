@@ -3,31 +3,74 @@ CAE Aggressive Data Scraper - Scraping Agresivo para Datos Críticos
 Extracción de datos críticos sobre incidencias, repeticiones y asignaciones
 """
 
-import requests
-from bs4 import BeautifulSoup
 import pandas as pd
-import json
 from datetime import datetime, timedelta
 from pathlib import Path
-import time
 import logging
 from urllib.parse import urljoin, urlparse
 import re
-import random
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import sqlite3
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
 import threading
 
+try:
+    from selenium import webdriver
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+except ImportError:
+    # Sin Selenium el pool de navegadores cede None y se usa la ruta HTTP
+    webdriver = None
+
+try:
+    from browser_pool import BrowserPool, build_chrome_options
+    from html_parsing import parse_html
+    from http_client import BROWSER_HEADERS, PooledHTTPClient
+    from rate_limiter import HostRateLimiter
+    from report_store import write_report
+except ImportError:
+    from src.etl.browser_pool import BrowserPool, build_chrome_options
+    from src.etl.html_parsing import parse_html
+    from src.etl.http_client import BROWSER_HEADERS, PooledHTTPClient
+    from src.etl.rate_limiter import HostRateLimiter
+    from src.etl.report_store import write_report
+
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Palabras clave de enlaces y scripts que pueden contener datos críticos
+STATS_LINK_KEYWORDS = ('estadisticas', 'stats', 'datos', 'data', 'metricas', 'metrics',
+                       'incidencias', 'incidents', 'trabajadores', 'workers')
+SCRIPT_DATA_KEYWORDS = ('incidents', 'workers', 'assignments', 'stats', 'data')
+
+# Contenido dinámico: textos, clases y enlaces que suelen contener datos
+DYNAMIC_TEXT_KEYWORDS = ('incidencias', 'trabajadores', 'asignaciones')
+DYNAMIC_DATA_CLASSES = ('stats', 'metrics', 'data', 'numbers', 'count', 'total')
+DYNAMIC_LINK_KEYWORDS = ('data', 'stats', 'metrics')
+
+def compile_critical_patterns(critical_patterns):
+    """
+    Combinar todos los patrones críticos en una sola expresión compilada
+
+    Cada patrón se envuelve en un grupo con nombre ``<tipo>_<índice>``, de modo
+    que el texto se recorre una vez en lugar de una por patrón y ``lastgroup``
+    indica qué patrón ha coincidido. Cada patrón debe tener un único grupo
+    de captura (el número).
+
+    Returns:
+        Tupla (expresión compilada, {nombre de grupo: (tipo, índice)})
+    """
+    alternatives = []
+    group_index = {}
+    for data_type, patterns in critical_patterns.items():
+        for index, pattern in enumerate(patterns):
+            group_name = f"{data_type}_{index}"
+            alternatives.append(f"(?P<{group_name}>{pattern})")
+            group_index[group_name] = (data_type, index)
+
+    return re.compile('|'.join(alternatives), re.IGNORECASE), group_index
+
 class CAEAggressiveScraper:
     """
     Scraper agresivo para obtener datos críticos de plataformas CAE
@@ -36,19 +79,14 @@ class CAEAggressiveScraper:
     def __init__(self):
         self.data = {}
         self.scraping_date = datetime.now()
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'es-ES,es;q=0.9,en;q=0.8',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-            'Sec-Fetch-Dest': 'document',
-            'Sec-Fetch-Mode': 'navigate',
-            'Sec-Fetch-Site': 'none',
-            'Cache-Control': 'max-age=0'
-        })
+        # Cliente HTTP compartido: pool de conexiones keep-alive, reintentos y métricas.
+        # El ritmo por host lo marca el limitador (un token cada 2s o el Crawl-delay de robots.txt)
+        self.session = PooledHTTPClient(headers=BROWSER_HEADERS,
+                                        rate_limiter=HostRateLimiter(default_delay=2.0))
+        # Navegadores headless reutilizables: se arrancan una vez y se reciclan cada 20 páginas.
+        # Sin Chrome/Selenium instalado, o con tráfico grabado/reproducido, el scraping dinámico recurre a HTTP
+        self.browser_pool = BrowserPool(size=2, max_pages_per_browser=20,
+                                        enabled=self.session.fixture_mode is None)
         
         # URLs específicas para datos críticos
         self.critical_endpoints = {
@@ -117,19 +155,32 @@ class CAEAggressiveScraper:
                 r'changes?[:\s]*(\d+)'
             ]
         }
+        self.critical_matcher, self.critical_groups = compile_critical_patterns(self.critical_patterns)
+    
+    def extract_critical_data(self, text_content):
+        """
+        Extraer todos los recuentos críticos en una sola pasada sobre el texto
+        
+        El resultado es el mismo que aplicar ``re.findall`` con cada patrón:
+        por tipo, los valores de cada patrón en orden de aparición.
+        """
+        found = {data_type: [[] for _ in patterns] for data_type, patterns in self.critical_patterns.items()}
+        
+        for match in self.critical_matcher.finditer(text_content):
+            data_type, index = self.critical_groups[match.lastgroup]
+            # El número es el grupo de captura interno del patrón que ha coincidido
+            found[data_type][index].append(match.group(match.lastindex + 1))
+        
+        return {data_type: [value for values in per_pattern for value in values]
+                for data_type, per_pattern in found.items()}
     
     def setup_selenium_driver(self):
-        """Configurar driver de Selenium para scraping avanzado"""
+        """Configurar driver de Selenium independiente (el scraping usa ``self.browser_pool``)"""
+        if webdriver is None:
+            logger.warning("Selenium no está instalado")
+            return None
         try:
-            chrome_options = Options()
-            chrome_options.add_argument('--headless')
-            chrome_options.add_argument('--no-sandbox')
-            chrome_options.add_argument('--disable-dev-shm-usage')
-            chrome_options.add_argument('--disable-gpu')
-            chrome_options.add_argument('--window-size=1920,1080')
-            chrome_options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
-            
-            driver = webdriver.Chrome(options=chrome_options)
+            driver = webdriver.Chrome(options=build_chrome_options())
             driver.set_page_load_timeout(30)
             return driver
         except Exception as e:
@@ -193,9 +244,6 @@ class CAEAggressiveScraper:
                             'note': f'Error {response.status_code}'
                         }
                     
-                    # Pausa entre peticiones
-                    time.sleep(random.uniform(1, 3))
-                    
                 except Exception as e:
                     platform_data['endpoints_data'][endpoint_name] = {
                         'url': full_url,
@@ -208,70 +256,77 @@ class CAEAggressiveScraper:
             logger.error(f"Error en scraping agresivo de {platform_name}: {e}")
             return None
     
-    def deep_content_analysis(self, platform_name, base_url):
+    def fetch_homepage(self, base_url):
+        """Obtener la página principal una sola vez para todos los análisis de una plataforma"""
+        response = self.session.get(base_url, timeout=15)
+        response.raise_for_status()
+        return response
+    
+    def deep_content_analysis(self, platform_name, base_url, response=None):
         """
         Análisis profundo del contenido para extraer datos críticos
+
+        Args:
+            response: Respuesta ya descargada de ``base_url`` (se descarga si falta)
         """
         logger.info(f"Análisis profundo de contenido para {platform_name}...")
         
         try:
             # Obtener página principal
-            response = self.session.get(base_url, timeout=15)
-            response.raise_for_status()
+            if response is None:
+                response = self.fetch_homepage(base_url)
             
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = parse_html(response.content)
             text_content = soup.get_text().lower()
             
-            # Extraer datos críticos usando patrones
-            critical_data = {}
+            # Extraer datos críticos con el patrón combinado (una sola pasada)
+            critical_data = self.extract_critical_data(text_content)
             
-            for data_type, patterns in self.critical_patterns.items():
-                critical_data[data_type] = []
-                
-                for pattern in patterns:
-                    matches = re.findall(pattern, text_content, re.IGNORECASE)
-                    if matches:
-                        critical_data[data_type].extend(matches)
-            
-            # Buscar enlaces a páginas de estadísticas o datos
+            # Enlaces, formularios y scripts en un único recorrido del árbol
             stats_links = []
-            for link in soup.find_all('a', href=True):
-                href = link.get('href', '').lower()
-                text = link.get_text().lower()
-                
-                if any(keyword in href or keyword in text for keyword in 
-                      ['estadisticas', 'stats', 'datos', 'data', 'metricas', 'metrics', 
-                       'incidencias', 'incidents', 'trabajadores', 'workers']):
-                    stats_links.append({
-                        'text': link.get_text().strip(),
-                        'href': urljoin(base_url, link.get('href'))
-                    })
-            
-            # Buscar formularios o elementos que puedan contener datos
             forms_data = []
-            for form in soup.find_all('form'):
-                form_data = {
-                    'action': form.get('action', ''),
-                    'method': form.get('method', ''),
-                    'inputs': []
-                }
+            forms_by_id = {}
+            scripts_data = []
+            for tag in soup.find_all(['a', 'form', 'input', 'script']):
+                if tag.name == 'a':
+                    href = tag.get('href')
+                    if href is None:
+                        continue
+                    text = tag.get_text()
+                    href_lower = href.lower()
+                    text_lower = text.lower()
+                    
+                    if any(keyword in href_lower or keyword in text_lower for keyword in STATS_LINK_KEYWORDS):
+                        stats_links.append({
+                            'text': text.strip(),
+                            'href': urljoin(base_url, href)
+                        })
                 
-                for input_tag in form.find_all('input'):
-                    form_data['inputs'].append({
-                        'name': input_tag.get('name', ''),
-                        'type': input_tag.get('type', ''),
-                        'placeholder': input_tag.get('placeholder', '')
-                    })
+                elif tag.name == 'form':
+                    form_data = {
+                        'action': tag.get('action', ''),
+                        'method': tag.get('method', ''),
+                        'inputs': []
+                    }
+                    forms_by_id[id(tag)] = form_data
+                    forms_data.append(form_data)
                 
-                forms_data.append(form_data)
-            
-            # Buscar scripts que puedan contener datos
-            scripts_data = []
-            for script in soup.find_all('script'):
-                script_content = script.string
-                if script_content and any(keyword in script_content.lower() for keyword in 
-                                        ['incidents', 'workers', 'assignments', 'stats', 'data']):
-                    scripts_data.append(script_content[:1000])  # Primeros 1000 caracteres
+                elif tag.name == 'input':
+                    # Los formularios aparecen antes que sus campos en orden de documento
+                    form = tag.find_parent('form')
+                    if form is not None and id(form) in forms_by_id:
+                        forms_by_id[id(form)]['inputs'].append({
+                            'name': tag.get('name', ''),
+                            'type': tag.get('type', ''),
+                            'placeholder': tag.get('placeholder', '')
+                        })
+                
+                else:
+                    script_content = tag.string
+                    if script_content:
+                        script_lower = script_content.lower()
+                        if any(keyword in script_lower for keyword in SCRIPT_DATA_KEYWORDS):
+                            scripts_data.append(script_content[:1000])  # Primeros 1000 caracteres
             
             return {
                 'critical_data': critical_data,
@@ -286,71 +341,154 @@ class CAEAggressiveScraper:
             logger.error(f"Error en análisis profundo de {platform_name}: {e}")
             return None
     
-    def selenium_advanced_scraping(self, platform_name, base_url):
+    def selenium_advanced_scraping(self, platform_name, base_url, response=None):
         """
         Scraping avanzado con Selenium para contenido dinámico
+
+        Usa un navegador prestado por ``self.browser_pool``; si no hay
+        navegador disponible analiza el HTML estático obtenido por HTTP
+        (``response`` si ya se descargó).
         """
         logger.info(f"Scraping avanzado con Selenium para {platform_name}...")
         
-        driver = self.setup_selenium_driver()
-        if not driver:
-            return None
-        
         try:
-            driver.get(base_url)
-            
-            # Esperar a que la página cargue
-            WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.TAG_NAME, "body"))
-            )
-            
-            # Buscar elementos que puedan contener datos críticos
-            selenium_data = {
-                'page_title': driver.title,
-                'page_source_length': len(driver.page_source),
-                'elements_found': {},
-                'dynamic_content': {}
-            }
-            
-            # Buscar elementos con datos numéricos
-            number_elements = driver.find_elements(By.XPATH, "//*[contains(text(), 'incidencias') or contains(text(), 'trabajadores') or contains(text(), 'asignaciones')]")
-            
-            for element in number_elements:
-                text = element.text
-                selenium_data['elements_found'][text] = {
-                    'tag': element.tag_name,
-                    'class': element.get_attribute('class'),
-                    'id': element.get_attribute('id')
+            with self.browser_pool.browser() as driver:
+                if driver is None:
+                    return self.http_dynamic_scraping(platform_name, base_url, response)
+                
+                driver.get(base_url)
+                
+                # Esperar a que la página cargue
+                WebDriverWait(driver, 10).until(
+                    EC.presence_of_element_located((By.TAG_NAME, "body"))
+                )
+                
+                # Buscar elementos que puedan contener datos críticos
+                selenium_data = {
+                    'render_mode': 'browser',
+                    'page_title': driver.title,
+                    'page_source_length': len(driver.page_source),
+                    'elements_found': {},
+                    'dynamic_content': {}
                 }
-            
-            # Buscar elementos con clases que sugieran datos
-            data_classes = ['stats', 'metrics', 'data', 'numbers', 'count', 'total']
-            for class_name in data_classes:
-                elements = driver.find_elements(By.CLASS_NAME, class_name)
-                if elements:
-                    selenium_data['dynamic_content'][class_name] = []
-                    for element in elements[:5]:  # Limitar a 5 elementos
-                        selenium_data['dynamic_content'][class_name].append({
-                            'text': element.text,
-                            'tag': element.tag_name
-                        })
-            
-            # Buscar enlaces a páginas de datos
-            data_links = driver.find_elements(By.XPATH, "//a[contains(@href, 'data') or contains(@href, 'stats') or contains(@href, 'metrics')]")
-            selenium_data['data_links'] = []
-            for link in data_links:
-                selenium_data['data_links'].append({
-                    'text': link.text,
-                    'href': link.get_attribute('href')
-                })
-            
-            return selenium_data
+                
+                # Buscar elementos con datos numéricos
+                text_conditions = ' or '.join(f"contains(text(), '{keyword}')" for keyword in DYNAMIC_TEXT_KEYWORDS)
+                number_elements = driver.find_elements(By.XPATH, f"//*[{text_conditions}]")
+                
+                for element in number_elements:
+                    text = element.text
+                    selenium_data['elements_found'][text] = {
+                        'tag': element.tag_name,
+                        'class': element.get_attribute('class'),
+                        'id': element.get_attribute('id')
+                    }
+                
+                # Buscar elementos con clases que sugieran datos
+                for class_name in DYNAMIC_DATA_CLASSES:
+                    elements = driver.find_elements(By.CLASS_NAME, class_name)
+                    if elements:
+                        selenium_data['dynamic_content'][class_name] = []
+                        for element in elements[:5]:  # Limitar a 5 elementos
+                            selenium_data['dynamic_content'][class_name].append({
+                                'text': element.text,
+                                'tag': element.tag_name
+                            })
+                
+                # Buscar enlaces a páginas de datos
+                href_conditions = ' or '.join(f"contains(@href, '{keyword}')" for keyword in DYNAMIC_LINK_KEYWORDS)
+                data_links = driver.find_elements(By.XPATH, f"//a[{href_conditions}]")
+                selenium_data['data_links'] = []
+                for link in data_links:
+                    selenium_data['data_links'].append({
+                        'text': link.text,
+                        'href': link.get_attribute('href')
+                    })
+                
+                return selenium_data
             
         except Exception as e:
             logger.error(f"Error en scraping con Selenium para {platform_name}: {e}")
             return None
-        finally:
-            driver.quit()
+    
+    def http_dynamic_scraping(self, platform_name, base_url, response=None):
+        """
+        Alternativa sin navegador a ``selenium_advanced_scraping``
+
+        Aplica las mismas búsquedas sobre el HTML servido (sin ejecutar
+        JavaScript) y devuelve un resultado con la misma estructura.
+        """
+        if response is None:
+            response = self.fetch_homepage(base_url)
+        
+        soup = parse_html(response.content)
+        title = soup.title.get_text(strip=True) if soup.title else ''
+        selenium_data = {
+            'render_mode': 'http',
+            'page_title': title,
+            'page_source_length': len(response.text),
+            'elements_found': {},
+            'dynamic_content': {}
+        }
+        
+        for element in soup.find_all(string=lambda s: s and any(keyword in s for keyword in DYNAMIC_TEXT_KEYWORDS)):
+            parent = element.parent
+            selenium_data['elements_found'][parent.get_text(strip=True)] = {
+                'tag': parent.name,
+                'class': ' '.join(parent.get('class', [])),
+                'id': parent.get('id', '')
+            }
+        
+        for class_name in DYNAMIC_DATA_CLASSES:
+            elements = soup.find_all(class_=class_name, limit=5)
+            if elements:
+                selenium_data['dynamic_content'][class_name] = [
+                    {'text': element.get_text(strip=True), 'tag': element.name}
+                    for element in elements
+                ]
+        
+        selenium_data['data_links'] = [
+            {'text': link.get_text(strip=True), 'href': urljoin(base_url, link['href'])}
+            for link in soup.find_all('a', href=True)
+            if any(keyword in link['href'] for keyword in DYNAMIC_LINK_KEYWORDS)
+        ]
+        
+        logger.info(f"Sin navegador disponible: {platform_name} analizado por HTTP")
+        return selenium_data
+    
+    def scrape_platform_pipeline(self, platform_name, endpoints):
+        """
+        Ejecutar todas las etapas de scraping de una plataforma
+
+        Endpoints, análisis profundo y contenido dinámico se encadenan para la
+        plataforma; la página principal se descarga una vez y se comparte
+        entre el análisis profundo y la alternativa HTTP de Selenium. El uso
+        de navegadores lo limita ``self.browser_pool``.
+
+        Returns:
+            Datos de la plataforma, o None si falla el scraping de endpoints
+        """
+        platform_data = self.aggressive_endpoint_scraping(platform_name, endpoints)
+        if not platform_data:
+            return None
+        
+        base_url = endpoints['base_url']
+        try:
+            response = self.fetch_homepage(base_url)
+        except Exception as e:
+            logger.error(f"Error obteniendo la página principal de {platform_name}: {e}")
+            response = None
+        
+        if response is not None:
+            deep_analysis = self.deep_content_analysis(platform_name, base_url, response)
+            if deep_analysis:
+                platform_data['deep_analysis'] = deep_analysis
+        
+        selenium_data = self.selenium_advanced_scraping(platform_name, base_url, response)
+        if selenium_data:
+            platform_data['selenium_data'] = selenium_data
+        
+        return platform_data
     
     def parallel_aggressive_scraping(self):
         """
@@ -361,53 +499,26 @@ class CAEAggressiveScraper:
         try:
             results = {}
             
-            # Scraping paralelo de endpoints
-            with ThreadPoolExecutor(max_workers=4) as executor:
-                endpoint_futures = {
-                    executor.submit(self.aggressive_endpoint_scraping, platform, endpoints): platform
-                    for platform, endpoints in self.critical_endpoints.items()
-                }
-                
-                for future in as_completed(endpoint_futures):
-                    platform = endpoint_futures[future]
-                    try:
-                        result = future.result()
-                        if result:
-                            results[platform] = result
-                    except Exception as e:
-                        logger.error(f"Error en scraping de endpoints de {platform}: {e}")
-            
-            # Scraping paralelo de análisis profundo
-            with ThreadPoolExecutor(max_workers=4) as executor:
-                content_futures = {
-                    executor.submit(self.deep_content_analysis, platform, endpoints['base_url']): platform
-                    for platform, endpoints in self.critical_endpoints.items()
-                }
-                
-                for future in as_completed(content_futures):
-                    platform = content_futures[future]
-                    try:
-                        result = future.result()
-                        if result and platform in results:
-                            results[platform]['deep_analysis'] = result
-                    except Exception as e:
-                        logger.error(f"Error en análisis profundo de {platform}: {e}")
-            
-            # Scraping paralelo con Selenium
-            with ThreadPoolExecutor(max_workers=2) as executor:
-                selenium_futures = {
-                    executor.submit(self.selenium_advanced_scraping, platform, endpoints['base_url']): platform
-                    for platform, endpoints in self.critical_endpoints.items()
-                }
-                
-                for future in as_completed(selenium_futures):
-                    platform = selenium_futures[future]
-                    try:
-                        result = future.result()
-                        if result and platform in results:
-                            results[platform]['selenium_data'] = result
-                    except Exception as e:
-                        logger.error(f"Error en scraping con Selenium de {platform}: {e}")
+            # Cada plataforma recorre sus etapas de forma independiente: una
+            # plataforma lenta no retiene a las demás entre etapas
+            try:
+                with ThreadPoolExecutor(max_workers=4) as executor:
+                    platform_futures = {
+                        executor.submit(self.scrape_platform_pipeline, platform, endpoints): platform
+                        for platform, endpoints in self.critical_endpoints.items()
+                    }
+                    
+                    for future in as_completed(platform_futures):
+                        platform = platform_futures[future]
+                        try:
+                            result = future.result()
+                            if result:
+                                results[platform] = result
+                        except Exception as e:
+                            logger.error(f"Error en scraping de {platform}: {e}")
+            finally:
+                # No dejar procesos de Chrome vivos aunque falle el scraping
+                self.browser_pool.close()
             
             # Análisis agregado de datos críticos
             analysis = self.analyze_critical_data(results)
@@ -420,7 +531,7 @@ class CAEAggressiveScraper:
                 'methodology': {
                     'aggressive_scraping': True,
                     'parallel_processing': True,
-                    'selenium_used': True,
+                    'selenium_used': self.browser_pool.browsers_started > 0,
                     'endpoint_testing': True,
                     'deep_content_analysis': True
                 }
@@ -504,15 +615,14 @@ class CAEAggressiveScraper:
             return None
     
     def save_critical_data(self):
-        """Guardar datos críticos obtenidos"""
+        """Guardar datos críticos como informe JSON Lines (una línea por plataforma)"""
         try:
             output_dir = Path(__file__).resolve().parents[2] / "data" / "processed"
             output_dir.mkdir(parents=True, exist_ok=True)
             
-            output_file = output_dir / "cae_critical_data_aggressive.json"
-            
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(self.data, f, indent=2, ensure_ascii=False, default=str)
+            # Cada entrada de 'platforms_data' se puede leer por separado con report_store.LazyReport
+            output_file = write_report(output_dir / "cae_critical_data_aggressive.jsonl", self.data,
+                                       split_keys=('platforms_data',))
             
             logger.info(f"✅ Datos críticos guardados en {output_file}")
             return str(output_file)
@@ -3,20 +3,33 @@ CAE Alternative Data Sources - Fuentes Alternativas de Datos
 Búsqueda de datos críticos en fuentes alternativas y públicas
 """
 
-import requests
-from bs4 import BeautifulSoup
+import asyncio
 import pandas as pd
-import json
 from datetime import datetime, timedelta
 from pathlib import Path
 import time
 import logging
 from urllib.parse import urljoin, urlparse
 import re
-import random
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import sqlite3
 
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+try:
+    from html_parsing import parse_html
+    from http_client import ACCEPT_ENCODING, BROWSER_HEADERS, PooledHTTPClient
+    from rate_limiter import HostRateLimiter
+    from report_store import write_report
+except ImportError:
+    from src.etl.html_parsing import parse_html
+    from src.etl.http_client import ACCEPT_ENCODING, BROWSER_HEADERS, PooledHTTPClient
+    from src.etl.rate_limiter import HostRateLimiter
+    from src.etl.report_store import write_report
+
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -29,19 +42,11 @@ class CAEAlternativeDataSources:
     def __init__(self):
         self.data = {}
         self.scraping_date = datetime.now()
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'es-ES,es;q=0.9,en;q=0.8',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-            'Sec-Fetch-Dest': 'document',
-            'Sec-Fetch-Mode': 'navigate',
-            'Sec-Fetch-Site': 'none',
-            'Cache-Control': 'max-age=0'
-        })
+        # Cliente HTTP compartido: pool de conexiones keep-alive, reintentos y métricas.
+        # El ritmo por host lo marca el limitador (un token cada 3s o el Crawl-delay de robots.txt),
+        # compartido por la búsqueda síncrona y la asíncrona
+        self.rate_limiter = HostRateLimiter(default_delay=3.0)
+        self.session = PooledHTTPClient(headers=BROWSER_HEADERS, rate_limiter=self.rate_limiter)
         
         # Fuentes alternativas de datos
         self.alternative_sources = {
@@ -122,57 +127,19 @@ class CAEAlternativeDataSources:
         logger.info(f"Buscando en {source_name}...")
         
         try:
-            base_url = source_info['url']
-            search_endpoint = source_info.get('search_endpoint', '/buscar/')
-            
-            source_data = {
-                'source_name': source_name,
-                'base_url': base_url,
-                'search_endpoint': search_endpoint,
-                'scraping_date': self.scraping_date.isoformat(),
-                'search_results': {},
-                'found_data': {}
-            }
+            source_data = self._new_source_data(source_name, source_info, search_terms)
+            search_url = source_data['base_url'] + source_data['search_endpoint']
             
             # Buscar cada término
             for category, terms in search_terms.items():
-                source_data['search_results'][category] = {}
-                
                 for term in terms:
                     try:
-                        # Construir URL de búsqueda
-                        search_url = base_url + search_endpoint
-                        
-                        # Parámetros de búsqueda
-                        params = {
-                            'q': term,
-                            'tipo': 'all',
-                            'buscar': 'Buscar'
-                        }
-                        
                         # Realizar búsqueda
-                        response = self.session.get(search_url, params=params, timeout=15)
+                        response = self.session.get(search_url, params=self._search_params(term), timeout=15)
                         
                         if response.status_code == 200:
-                            soup = BeautifulSoup(response.content, 'html.parser')
-                            
-                            # Extraer resultados de búsqueda
-                            results = self.extract_search_results(soup, term)
-                            
-                            source_data['search_results'][category][term] = {
-                                'url': response.url,
-                                'status_code': response.status_code,
-                                'results_count': len(results),
-                                'results': results[:10]  # Limitar a 10 resultados
-                            }
-                            
-                            # Buscar datos específicos en los resultados
-                            critical_data = self.extract_critical_data_from_results(results, term)
-                            if critical_data:
-                                source_data['found_data'][term] = critical_data
-                        
-                        # Pausa entre búsquedas
-                        time.sleep(random.uniform(2, 4))
+                            self._store_search_response(source_data, category, term, response.url,
+                                                        response.status_code, response.content)
                         
                     except Exception as e:
                         logger.warning(f"Error buscando '{term}' en {source_name}: {e}")
@@ -186,6 +153,120 @@ class CAEAlternativeDataSources:
             logger.error(f"Error buscando en {source_name}: {e}")
             return None
     
+    def _new_source_data(self, source_name, source_info, search_terms):
+        """Estructura de resultados de una fuente, con una entrada por categoría"""
+        return {
+            'source_name': source_name,
+            'base_url': source_info['url'],
+            'search_endpoint': source_info.get('search_endpoint', '/buscar/'),
+            'scraping_date': self.scraping_date.isoformat(),
+            'search_results': {category: {} for category in search_terms},
+            'found_data': {}
+        }
+    
+    @staticmethod
+    def _search_params(term):
+        """Parámetros de búsqueda para un término"""
+        return {
+            'q': term,
+            'tipo': 'all',
+            'buscar': 'Buscar'
+        }
+    
+    def _store_search_response(self, source_data, category, term, url, status_code, content):
+        """Parsear una página de resultados y guardarla en la estructura de la fuente"""
+        soup = parse_html(content)
+        
+        # Extraer resultados de búsqueda
+        results = self.extract_search_results(soup, term)
+        
+        source_data['search_results'][category][term] = {
+            'url': str(url),
+            'status_code': status_code,
+            'results_count': len(results),
+            'results': results[:10]  # Limitar a 10 resultados
+        }
+        
+        # Buscar datos específicos en los resultados
+        critical_data = self.extract_critical_data_from_results(results, term)
+        if critical_data:
+            source_data['found_data'][term] = critical_data
+    
+    async def async_alternative_search(self, per_host_limit=2, total_limit=24):
+        """
+        Búsqueda asíncrona de todos los pares (fuente, término)
+        
+        Todas las búsquedas se lanzan a la vez sobre una única sesión aiohttp:
+        el conector limita las conexiones por host y en total, y el limitador
+        de ritmo compartido espacia las peticiones a cada host, de modo que
+        las fuentes avanzan en paralelo sin saturar ninguna. El parseo HTML
+        se hace en hilos para no bloquear el bucle de eventos. Los resultados
+        se fusionan en la misma estructura que ``search_alternative_sources``.
+        """
+        results = {
+            source_name: self._new_source_data(source_name, source_info, self.search_terms)
+            for source_name, source_info in self.alternative_sources.items()
+        }
+        pairs = [
+            (source_name, category, term)
+            for source_name in self.alternative_sources
+            for category, terms in self.search_terms.items()
+            for term in terms
+        ]
+        
+        connector = aiohttp.TCPConnector(limit=total_limit, limit_per_host=per_host_limit)
+        timeout = aiohttp.ClientTimeout(total=15)
+        headers = dict(BROWSER_HEADERS, **{'Accept-Encoding': ACCEPT_ENCODING})
+        
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout, headers=headers) as session:
+            await asyncio.gather(*(
+                self._search_term_async(session, results[source_name], category, term)
+                for source_name, category, term in pairs
+            ))
+        
+        # Mantener el orden original de términos dentro de cada categoría
+        for source_data in results.values():
+            for category, terms in self.search_terms.items():
+                category_data = source_data['search_results'][category]
+                source_data['search_results'][category] = {
+                    term: category_data[term] for term in terms if term in category_data
+                }
+        
+        return results
+    
+    async def _search_term_async(self, session, source_data, category, term):
+        """Buscar un término en una fuente respetando el ritmo del host"""
+        search_url = source_data['base_url'] + source_data['search_endpoint']
+        
+        try:
+            # La primera reserva de un host puede leer su robots.txt: se hace en un hilo
+            delay = await asyncio.to_thread(self.rate_limiter.reserve, search_url)
+            if delay:
+                await asyncio.sleep(delay)
+            
+            # Mismos contadores que PooledHTTPClient (latencia hasta las cabeceras)
+            start = time.perf_counter()
+            try:
+                async with session.get(search_url, params=self._search_params(term)) as response:
+                    latency = time.perf_counter() - start
+                    content = await response.read() if response.status == 200 else b''
+                    url = response.url
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                self.session.stats.record_error(search_url)
+                raise
+            self.session.stats.record_response(search_url, latency, len(content))
+            if response.status != 200:
+                return
+            
+            await asyncio.to_thread(self._store_search_response, source_data, category, term,
+                                    url, response.status, content)
+            
+        except Exception as e:
+            logger.warning(f"Error buscando '{term}' en {source_data['source_name']}: {e}")
+            source_data['search_results'][category][term] = {
+                'error': str(e)
+            }
+    
     def extract_search_results(self, soup, search_term):
         """
         Extraer resultados de búsqueda de una página
@@ -334,6 +415,15 @@ class CAEAlternativeDataSources:
             logger.error(f"Error extrayendo datos críticos: {e}")
             return None
     
+    @staticmethod
+    def _event_loop_running():
+        """Si ya hay un bucle de eventos en este hilo (Jupyter, llamadas async), donde ``asyncio.run`` falla"""
+        try:
+            asyncio.get_running_loop()
+            return True
+        except RuntimeError:
+            return False
+    
     def parallel_alternative_search(self):
         """
         Búsqueda paralela en fuentes alternativas
@@ -343,21 +433,25 @@ class CAEAlternativeDataSources:
         try:
             results = {}
             
-            # Búsqueda paralela en todas las fuentes
-            with ThreadPoolExecutor(max_workers=3) as executor:
-                futures = {
-                    executor.submit(self.search_alternative_sources, source_name, source_info, self.search_terms): source_name
-                    for source_name, source_info in self.alternative_sources.items()
-                }
-                
-                for future in as_completed(futures):
-                    source_name = futures[future]
-                    try:
-                        result = future.result()
-                        if result:
-                            results[source_name] = result
-                    except Exception as e:
-                        logger.error(f"Error en búsqueda de {source_name}: {e}")
+            if aiohttp is not None and self.session.fixture_mode is None and not self._event_loop_running():
+                # Todos los pares (fuente, término) a la vez, limitados por host
+                results = asyncio.run(self.async_alternative_search())
+            else:
+                # Búsqueda paralela en todas las fuentes
+                with ThreadPoolExecutor(max_workers=3) as executor:
+                    futures = {
+                        executor.submit(self.search_alternative_sources, source_name, source_info, self.search_terms): source_name
+                        for source_name, source_info in self.alternative_sources.items()
+                    }
+                    
+                    for future in as_completed(futures):
+                        source_name = futures[future]
+                        try:
+                            result = future.result()
+                            if result:
+                                results[source_name] = result
+                        except Exception as e:
+                            logger.error(f"Error en búsqueda de {source_name}: {e}")
             
             # Análisis agregado de datos encontrados
             analysis = self.analyze_alternative_data(results)
@@ -443,15 +537,14 @@ class CAEAlternativeDataSources:
             return None
     
     def save_alternative_data(self):
-        """Guardar datos de fuentes alternativas"""
+        """Guardar datos de fuentes alternativas como informe JSON Lines (una línea por fuente)"""
         try:
             output_dir = Path(__file__).resolve().parents[2] / "data" / "processed"
             output_dir.mkdir(parents=True, exist_ok=True)
             
-            output_file = output_dir / "cae_alternative_sources_data.json"
-            
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(self.data, f, indent=2, ensure_ascii=False, default=str)
+            # Cada entrada de 'sources_data' se puede leer por separado con report_store.LazyReport
+            output_file = write_report(output_dir / "cae_alternative_sources_data.jsonl", self.data,
+                                       split_keys=('sources_data',))
             
             logger.info(f"✅ Datos de fuentes alternativas guardados en {output_file}")
             return str(output_file)
@@ -4,20 +4,50 @@ Extracción de datos públicos disponibles de plataformas CAE
 """
 
 import requests
-from bs4 import BeautifulSoup
 import pandas as pd
-import json
 from datetime import datetime
 from pathlib import Path
-import time
 import logging
 from urllib.parse import urljoin, urlparse
 import re
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from html_parsing import parse_html
+    from http_client import PooledHTTPClient
+    from rate_limiter import HostRateLimiter
+    from text_keywords import TermCounter
+    from report_store import write_report
+except ImportError:
+    from src.etl.html_parsing import parse_html
+    from src.etl.http_client import PooledHTTPClient
+    from src.etl.rate_limiter import HostRateLimiter
+    from src.etl.text_keywords import TermCounter
+    from src.etl.report_store import write_report
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Palabras clave relacionadas con CAE
+CAE_KEYWORDS = [
+    'coordinación', 'actividades', 'empresariales', 'cae',
+    'prevención', 'riesgos', 'laborales', 'prl',
+    'trabajadores', 'empresas', 'construcción'
+]
+
+# Palabras que indican información de precios
+PRICE_INDICATORS = ['precio', 'coste', 'tarifa', 'plan', 'subscription']
+
+# Importes en euros (se buscan una sola vez por página)
+PRICE_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\s*(?:€|euros?|euro)')
+
+# Funcionalidades de plataforma
+FUNCTIONALITY_KEYWORDS = [
+    'gestión', 'documentos', 'trabajadores', 'empresas',
+    'validación', 'certificados', 'formación', 'inspección'
+]
+
 class CAEPlatformsScraper:
     """
     Scraper ético para obtener datos públicos de plataformas CAE
@@ -26,10 +56,14 @@ class CAEPlatformsScraper:
     def __init__(self):
         self.data = {}
         self.scraping_date = datetime.now()
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
+        # Cliente HTTP compartido: pool de conexiones keep-alive, reintentos y métricas.
+        # Respetar cada sitio web: como mucho una petición cada 3s por host (o su Crawl-delay)
+        self.session = PooledHTTPClient(
+            headers={
+                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+            },
+            rate_limiter=HostRateLimiter(default_delay=3.0)
+        )
         
     def get_cae_platforms_info(self):
         """
@@ -102,7 +136,7 @@ class CAEPlatformsScraper:
             response.raise_for_status()
             
             # Parsear HTML
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = parse_html(response.content)
             
             # Extraer datos públicos disponibles
             public_data = {
@@ -120,50 +154,28 @@ class CAEPlatformsScraper:
             public_info = {}
             
             # Buscar texto sobre características de la plataforma
-            text_content = soup.get_text().lower()
+            # (separador para que no se peguen palabras de elementos contiguos)
+            text_content = soup.get_text(' ').lower()
             
-            # Palabras clave relacionadas con CAE
-            cae_keywords = [
-                'coordinación', 'actividades', 'empresariales', 'cae',
-                'prevención', 'riesgos', 'laborales', 'prl',
-                'trabajadores', 'empresas', 'construcción'
-            ]
+            # Mapa de frecuencias construido en una sola pasada, sin distinguir
+            # tildes ni mayúsculas; todas las consultas se responden desde él
+            terms = TermCounter(text_content)
             
             # Contar menciones de palabras clave
-            keyword_mentions = {}
-            for keyword in cae_keywords:
-                count = text_content.count(keyword)
-                if count > 0:
-                    keyword_mentions[keyword] = count
-            
-            public_info['keyword_mentions'] = keyword_mentions
+            public_info['keyword_mentions'] = terms.counts(CAE_KEYWORDS)
             
             # Buscar información sobre precios (si está disponible públicamente)
-            price_indicators = ['precio', 'coste', 'tarifa', 'plan', 'subscription']
             price_info = {}
-            for indicator in price_indicators:
-                if indicator in text_content:
-                    # Buscar números cerca de palabras de precio
-                    price_pattern = r'(\d+(?:\.\d+)?)\s*(?:€|euros?|euro)'
-                    prices = re.findall(price_pattern, text_content)
-                    if prices:
-                        price_info[indicator] = prices
+            mentioned_indicators = terms.counts(PRICE_INDICATORS)
+            if mentioned_indicators:
+                prices = PRICE_PATTERN.findall(text_content)
+                if prices:
+                    price_info = {indicator: prices for indicator in mentioned_indicators}
             
             public_info['price_indicators'] = price_info
             
             # Buscar información sobre funcionalidades
-            functionality_keywords = [
-                'gestión', 'documentos', 'trabajadores', 'empresas',
-                'validación', 'certificados', 'formación', 'inspección'
-            ]
-            
-            functionality_mentions = {}
-            for keyword in functionality_keywords:
-                count = text_content.count(keyword)
-                if count > 0:
-                    functionality_mentions[keyword] = count
-            
-            public_info['functionality_mentions'] = functionality_mentions
+            public_info['functionality_mentions'] = terms.counts(FUNCTIONALITY_KEYWORDS)
             
             # Buscar enlaces a documentación o información adicional
             links = soup.find_all('a', href=True)
@@ -181,9 +193,6 @@ class CAEPlatformsScraper:
             
             public_data['public_info'] = public_info
             
-            # Respetar el sitio web - pausa entre peticiones
-            time.sleep(2)
-            
             return public_data
             
         except requests.exceptions.RequestException as e:
@@ -215,17 +224,14 @@ class CAEPlatformsScraper:
             if not platforms_info:
                 return None
             
-            scraped_data = {}
-            
-            for platform_name, platform_info in platforms_info.items():
-                logger.info(f"Procesando {platform_name}...")
-                
-                # Scraping ético de datos públicos
-                platform_data = self.scrape_platform_public_data(platform_name, platform_info)
-                scraped_data[platform_name] = platform_data
-                
-                # Respetar el sitio web - pausa entre plataformas
-                time.sleep(3)
+            # Cada plataforma es un sitio distinto: se procesan en paralelo y el
+            # limitador por host mantiene el ritmo educado con cada una
+            with ThreadPoolExecutor(max_workers=max(1, len(platforms_info))) as executor:
+                futures = {
+                    platform_name: executor.submit(self.scrape_platform_public_data, platform_name, platform_info)
+                    for platform_name, platform_info in platforms_info.items()
+                }
+                scraped_data = {platform_name: future.result() for platform_name, future in futures.items()}
             
             # Análisis agregado de datos
             analysis = self.analyze_scraped_data(scraped_data)
@@ -308,15 +314,14 @@ class CAEPlatformsScraper:
             return None
     
     def save_data_to_file(self):
-        """Guardar datos scrapeados en archivo JSON"""
+        """Guardar datos scrapeados como informe JSON Lines (una línea por plataforma)"""
         try:
             output_dir = Path(__file__).resolve().parents[2] / "data" / "processed"
             output_dir.mkdir(parents=True, exist_ok=True)
             
-            output_file = output_dir / "cae_platforms_scraped_data.json"
-            
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(self.data, f, indent=2, ensure_ascii=False, default=str)
+            # Cada entrada de 'platforms_data' se puede leer por separado con report_store.LazyReport
+            output_file = write_report(output_dir / "cae_platforms_scraped_data.jsonl", self.data,
+                                       split_keys=('platforms_data',))
             
             logger.info(f"✅ Datos scrapeados guardados en {output_file}")
             return str(output_file)
@@ -0,0 +1,156 @@
+"""
+CAE Concurrent Sources - Run independent extraction functions side by side
+Per-source deadlines, cancellation of pending work and partial results with timings
+"""
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class SourceOutcome:
+    """Result of one source: status is ``ok``, ``error``, ``timeout`` or ``cancelled``"""
+    name: str
+    status: str
+    result: Any = None
+    error: Optional[str] = None
+    duration_seconds: Optional[float] = None
+
+    def to_dict(self) -> Dict:
+        """Summary without the result payload"""
+        return {
+            'status': self.status,
+            'duration_seconds': self.duration_seconds,
+            'error': self.error
+        }
+
+@dataclass
+class SourceTask:
+    """An extraction function and the seconds it may run before being abandoned"""
+    name: str
+    func: Callable[[], Any]
+    timeout: Optional[float] = None
+
+def run_sources(tasks: List[SourceTask], max_workers: Optional[int] = None,
+                default_timeout: Optional[float] = None,
+                cancel_event: Optional[threading.Event] = None) -> Dict[str, SourceOutcome]:
+    """
+    Run extraction functions concurrently and collect whatever finishes in time
+
+    Each task's deadline counts from the moment it starts running, so tasks
+    queued behind a full pool are not penalised. A task that passes its
+    deadline is reported as ``timeout`` and its eventual result is discarded;
+    Python threads cannot be interrupted, so it keeps running in the
+    background until its own I/O timeouts end it. Workers are daemon
+    threads, so such a task never keeps the interpreter alive at exit.
+    Setting ``cancel_event`` cancels every task that has not started and
+    stops waiting for the rest.
+
+    Args:
+        tasks: Sources to run
+        max_workers: Threads (defaults to one per task)
+        default_timeout: Deadline for tasks without their own ``timeout``
+        cancel_event: Event that cancels the remaining work when set
+
+    Returns:
+        Outcome per task name, in task order
+    """
+    outcomes: Dict[str, SourceOutcome] = {}
+    if not tasks:
+        return outcomes
+
+    started: Dict[str, float] = {}
+
+    def elapsed(task: SourceTask) -> Optional[float]:
+        return time.perf_counter() - started[task.name] if task.name in started else None
+
+    def timed(task: SourceTask) -> Tuple[Any, float]:
+        started[task.name] = time.perf_counter()
+        result = task.func()
+        return result, time.perf_counter() - started[task.name]
+
+    # Without deadlines or cancellation there is nothing to poll for
+    polling = cancel_event is not None or default_timeout is not None or \
+        any(task.timeout is not None for task in tasks)
+
+    # Daemon workers: tasks past their deadline are abandoned, never joined
+    work: 'queue.SimpleQueue[Tuple[Future, SourceTask]]' = queue.SimpleQueue()
+    futures: Dict[Future, SourceTask] = {}
+    for task in tasks:
+        future = Future()
+        futures[future] = task
+        work.put((future, task))
+
+    def worker() -> None:
+        while True:
+            try:
+                future, task = work.get_nowait()
+            except queue.Empty:
+                return
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(timed(task))
+            except BaseException as e:
+                future.set_exception(e)
+
+    for index in range(min(max_workers or len(tasks), len(tasks))):
+        threading.Thread(target=worker, name=f'source-{index}', daemon=True).start()
+
+    try:
+        pending = set(futures)
+        while pending:
+            if cancel_event is not None and cancel_event.is_set():
+                for future in pending:
+                    task = futures[future]
+                    future.cancel()
+                    outcomes[task.name] = SourceOutcome(task.name, 'cancelled',
+                                                        duration_seconds=elapsed(task))
+                logger.warning(f"Extraction cancelled with {len(pending)} sources unfinished")
+                break
+
+            now = time.perf_counter()
+            time_left = []
+            for future in list(pending):
+                task = futures[future]
+                timeout = task.timeout if task.timeout is not None else default_timeout
+                if timeout is None or task.name not in started or future.done():
+                    continue
+                remaining = started[task.name] + timeout - now
+                if remaining <= 0:
+                    pending.discard(future)
+                    outcomes[task.name] = SourceOutcome(task.name, 'timeout',
+                                                        error=f"Exceeded {timeout}s deadline",
+                                                        duration_seconds=now - started[task.name])
+                    logger.warning(f"{task.name}: exceeded its {timeout}s deadline")
+                else:
+                    time_left.append(remaining)
+
+            if not pending:
+                break
+
+            # Wake up for the next completion, the nearest deadline, a task that
+            # has just started or a cancellation request
+            wait_for = min(time_left + [0.5]) if polling else None
+            done, pending = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+            for future in done:
+                task = futures[future]
+                try:
+                    result, duration = future.result()
+                    outcomes[task.name] = SourceOutcome(task.name, 'ok', result=result,
+                                                        duration_seconds=duration)
+                except Exception as e:
+                    outcomes[task.name] = SourceOutcome(task.name, 'error', error=str(e),
+                                                        duration_seconds=elapsed(task))
+    finally:
+        # Tasks that have not started yet never will
+        for future in futures:
+            future.cancel()
+
+    return {task.name: outcomes[task.name] for task in tasks if task.name in outcomes}
@@ -0,0 +1,144 @@
+"""
+CAE Dataset Sink - Configurable output layer for processed datasets
+Writes DataFrames as Parquet (optionally partitioned) and/or CSV with atomic replacement
+"""
+
+import os
+import shutil
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_FORMATS = ('parquet', 'csv')
+
+@dataclass
+class SinkConfig:
+    """Output configuration for processed datasets"""
+    formats: Tuple[str, ...] = ('parquet',)
+    partition_cols: Optional[List[str]] = None
+    compression: Optional[str] = 'snappy'
+    row_group_size: Optional[int] = None
+    csv_compression: Optional[str] = None
+
+    def __post_init__(self):
+        unsupported = set(self.formats) - set(SUPPORTED_FORMATS)
+        if unsupported:
+            raise ValueError(f"Unsupported sink formats: {sorted(unsupported)}")
+
+class DatasetSink:
+    """
+    Writes datasets to an output directory according to a SinkConfig
+
+    Every output is first written under a temporary name and then renamed
+    into place, so readers never observe a half-written file or dataset.
+    """
+
+    def __init__(self, output_dir: Path, config: Optional[SinkConfig] = None):
+        self.output_dir = Path(output_dir)
+        self.config = config or SinkConfig()
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+
+    def write(self, name: str, df: pd.DataFrame) -> List[Path]:
+        """
+        Write a dataset in every configured format
+
+        Args:
+            name: Dataset name used for the output file or directory
+            df: Data to write
+
+        Returns:
+            Paths of the written outputs
+        """
+        outputs = []
+
+        if 'parquet' in self.config.formats:
+            outputs.append(self.write_parquet(name, df))
+
+        if 'csv' in self.config.formats:
+            outputs.append(self.write_csv(name, df))
+
+        return outputs
+
+    def write_parquet(self, name: str, df: pd.DataFrame) -> Path:
+        """
+        Write a dataset as Parquet
+
+        When any of the configured partition columns exist in ``df`` the
+        output is a hive-partitioned directory ``<name>/col=value/...``;
+        otherwise it is a single ``<name>.parquet`` file. Whichever layout is
+        written replaces the other one, so readers never see two copies.
+        """
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        partition_cols = [col for col in (self.config.partition_cols or []) if col in df.columns]
+
+        if not partition_cols:
+            target = self.output_dir / f"{name}.parquet"
+            tmp_path = self.output_dir / f".{name}.parquet.tmp"
+            pq.write_table(
+                table, tmp_path,
+                compression=self.config.compression or 'none',
+                row_group_size=self.config.row_group_size
+            )
+            os.replace(tmp_path, target)
+            # Previously written partitioned
+            stale_dir = self.output_dir / name
+            if stale_dir.is_dir():
+                shutil.rmtree(stale_dir)
+            return target
+
+        target = self.output_dir / name
+        tmp_dir = self.output_dir / f".{name}.tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        write_options = {}
+        if self.config.row_group_size:
+            write_options['max_rows_per_group'] = self.config.row_group_size
+            write_options['min_rows_per_group'] = min(self.config.row_group_size, len(df)) or 1
+
+        ds.write_dataset(
+            table, tmp_dir,
+            format='parquet',
+            partitioning=partition_cols,
+            partitioning_flavor='hive',
+            file_options=ds.ParquetFileFormat().make_write_options(
+                compression=self.config.compression or 'none'
+            ),
+            basename_template='part-{i}.parquet',
+            **write_options
+        )
+        self._replace_directory(tmp_dir, target)
+        # Previously written as a single file
+        (self.output_dir / f"{name}.parquet").unlink(missing_ok=True)
+        return target
+
+    def write_csv(self, name: str, df: pd.DataFrame) -> Path:
+        """Write a dataset as CSV, optionally compressed"""
+        suffix = '.csv'
+        if self.config.csv_compression:
+            suffix += {'gzip': '.gz', 'bz2': '.bz2', 'zstd': '.zst', 'xz': '.xz'}.get(
+                self.config.csv_compression, f".{self.config.csv_compression}"
+            )
+
+        target = self.output_dir / f"{name}{suffix}"
+        tmp_path = self.output_dir / f".{name}{suffix}.tmp"
+        df.to_csv(tmp_path, index=False, compression=self.config.csv_compression)
+        os.replace(tmp_path, target)
+        return target
+
+    @staticmethod
+    def _replace_directory(tmp_dir: Path, target: Path) -> None:
+        """Swap a freshly written directory into place"""
+        backup = target.with_name(f".{target.name}.old")
+        shutil.rmtree(backup, ignore_errors=True)
+        if target.exists():
+            target.rename(backup)
+        tmp_dir.rename(target)
+        shutil.rmtree(backup, ignore_errors=True)
@@ -0,0 +1,108 @@
+"""
+CAE Extraction Records - Typed columnar schema for extracted official data
+Builds record batches column by column with shared metadata set once per batch
+"""
+
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+def _string_dtype() -> str:
+    """Arrow-backed strings when pyarrow is installed, object strings otherwise"""
+    try:
+        import pyarrow  # noqa: F401
+        return 'string[pyarrow]'
+    except ImportError:
+        return 'string'
+
+STRING_DTYPE = _string_dtype()
+
+@dataclass(frozen=True)
+class RecordSchema:
+    """
+    Column types of one extracted dataset
+
+    ``columns`` maps every data column to a pandas dtype (``'int64'``,
+    ``'float64'``, ``'string'``...). The shared ``source``, ``sector`` and
+    ``extraction_date`` columns are added by ``build_records``.
+    """
+    name: str
+    columns: Dict[str, str] = field(default_factory=dict)
+
+def _constant_category(value: str, length: int) -> pd.Categorical:
+    """Categorical column holding a single value, stored as one code per row"""
+    return pd.Categorical.from_codes(np.zeros(length, dtype=np.int8), categories=[value])
+
+def build_records(columns: Mapping[str, Sequence], schema: RecordSchema, source: str,
+                  sector: Optional[str] = None,
+                  extraction_date: Optional[datetime] = None) -> pd.DataFrame:
+    """
+    Build a typed DataFrame from column arrays
+
+    Data columns are cast to the schema once per column; ``source`` and
+    ``sector`` are single-category columns and ``extraction_date`` is one
+    timestamp broadcast over the batch.
+
+    Args:
+        columns: Column name to values, in schema order
+        schema: Expected columns and dtypes
+        source: Source name shared by every record
+        sector: Sector shared by every record (column omitted if None)
+        extraction_date: Batch timestamp (defaults to now)
+
+    Returns:
+        DataFrame with the schema columns followed by the shared ones
+
+    Raises:
+        ValueError: If columns are missing, unexpected or of unequal length
+    """
+    missing = set(schema.columns) - set(columns)
+    unexpected = set(columns) - set(schema.columns)
+    if missing or unexpected:
+        raise ValueError(f"{schema.name}: missing columns {sorted(missing)}, "
+                         f"unexpected columns {sorted(unexpected)}")
+
+    lengths = {len(values) for values in columns.values()}
+    if len(lengths) > 1:
+        raise ValueError(f"{schema.name}: columns have different lengths {sorted(lengths)}")
+    length = lengths.pop() if lengths else 0
+
+    data = {
+        name: pd.array(columns[name], dtype=STRING_DTYPE if dtype == 'string' else dtype)
+        for name, dtype in schema.columns.items()
+    }
+    data['source'] = _constant_category(source, length)
+    if sector is not None:
+        data['sector'] = _constant_category(sector, length)
+    data['extraction_date'] = pd.DatetimeIndex(
+        np.full(length, np.datetime64(extraction_date or datetime.now(), 'us'))
+    )
+
+    return pd.DataFrame(data)
+
+def normalize_records(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Whole-frame cleaning of an extracted dataset
+
+    Drops fully empty rows, standardizes column names, fills missing numeric
+    values with 0 in a single operation and parses ``extraction_date`` only
+    when it is not already a datetime column (e.g. a batch read back from CSV).
+    """
+    df_clean = df.dropna(how='all')
+    df_clean.columns = df_clean.columns.str.lower().str.replace(' ', '_').str.replace('-', '_')
+
+    numeric_columns = df_clean.select_dtypes(include='number').columns
+    if len(numeric_columns) and df_clean[numeric_columns].isna().to_numpy().any():
+        df_clean = df_clean.fillna({column: 0 for column in numeric_columns})
+
+    if 'extraction_date' in df_clean.columns and \
+            not pd.api.types.is_datetime64_any_dtype(df_clean['extraction_date']):
+        df_clean['extraction_date'] = pd.to_datetime(df_clean['extraction_date'])
+
+    return df_clean
@@ -4,6 +4,11 @@ import requests
 from pathlib import Path
 import sys
 
+try:
+    from http_client import PooledHTTPClient
+except ImportError:
+    from src.etl.http_client import PooledHTTPClient
+
 def main():
     try:
         RAW_DIR = Path(__file__).resolve().parents[2] / "data" / "raw"
@@ -17,16 +22,20 @@ def main():
         }
         
         success_count = 0
+        client = PooledHTTPClient(headers={"User-Agent": "Mozilla/5.0"}, timeout=30)
         
         for name, url in SOURCES.items():
             try:
                 print(f"Descargando {name}...")
-                r = requests.get(url, headers={"User-Agent": "Mozilla/5.0"}, timeout=30)
+                r = client.get(url)
                 r.raise_for_status()
                 
+                # Escritura atómica: nunca se reescribe el fichero existente en el sitio
                 file_path = RAW_DIR / f"{name}.pdf"
-                with open(file_path, "wb") as f:
+                tmp_path = file_path.with_name(f".{file_path.name}.part")
+                with open(tmp_path, "wb") as f:
                     f.write(r.content)
+                os.replace(tmp_path, file_path)
                 
                 print(f"✓ Descargado: {name} ({len(r.content)} bytes)")
                 success_count += 1
@@ -36,7 +45,9 @@ def main():
             except Exception as e:
                 print(f"✗ Error con {name}: {e}")
         
-        print(f"\nResumen: {success_count}/{len(SOURCES)} archivos descargados")
+        stats = client.stats.summary()
+        print(f"\nResumen: {success_count}/{len(SOURCES)} archivos descargados "
+              f"({stats['bytes']} bytes, {stats['requests']} peticiones)")
         
         if success_count == 0:
             print("⚠️  No se pudo descargar ningún archivo")
@@ -0,0 +1,82 @@
+"""
+CAE HTML Parsing - Pluggable HTML parsing backends for scrapers and crawlers
+Uses lxml or selectolax when installed and falls back to Python's html.parser
+"""
+
+import logging
+from typing import Iterable, List, Optional, Tuple, Union
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+logger = logging.getLogger(__name__)
+
+def _module_available(module_name: str) -> bool:
+    try:
+        __import__(module_name)
+        return True
+    except ImportError:
+        return False
+
+LXML_AVAILABLE = _module_available('lxml')
+SELECTOLAX_AVAILABLE = _module_available('selectolax')
+
+# Fastest BeautifulSoup tree builder installed (lxml is C, html.parser is pure Python)
+DEFAULT_PARSER = 'lxml' if LXML_AVAILABLE else 'html.parser'
+
+if SELECTOLAX_AVAILABLE:
+    from selectolax.parser import HTMLParser
+
+def parse_html(content: Union[bytes, str],
+               parse_only: Optional[Union[SoupStrainer, Iterable[str]]] = None,
+               parser: Optional[str] = None) -> BeautifulSoup:
+    """
+    Parse an HTML document with the fastest available BeautifulSoup builder
+
+    Args:
+        content: Raw response body or decoded HTML
+        parse_only: ``SoupStrainer`` or tag names; only matching elements are
+            built into the tree, which saves time and memory on large pages
+            when the caller needs just a few tags
+        parser: Explicit tree builder (defaults to ``DEFAULT_PARSER``)
+
+    Returns:
+        Parsed ``BeautifulSoup`` document
+    """
+    if parse_only is not None and not isinstance(parse_only, SoupStrainer):
+        parse_only = SoupStrainer(list(parse_only))
+    return BeautifulSoup(content, parser or DEFAULT_PARSER, parse_only=parse_only)
+
+def extract_links(content: Union[bytes, str], base_url: Optional[str] = None) -> List[Tuple[str, str]]:
+    """
+    Extract ``(href, text)`` for every ``<a href>`` in document order
+
+    Uses selectolax when installed (no BeautifulSoup tree at all); otherwise
+    a BeautifulSoup parse restricted to anchors with a ``SoupStrainer``.
+    Link text is whitespace-normalised.
+
+    Args:
+        content: Raw response body or decoded HTML
+        base_url: When given, hrefs are resolved against it
+
+    Returns:
+        List of ``(href, text)`` tuples
+    """
+    if SELECTOLAX_AVAILABLE:
+        anchors = (
+            (node.attributes.get('href'), node.text(separator=' ', strip=True))
+            for node in HTMLParser(content).css('a[href]')
+        )
+    else:
+        soup = parse_html(content, parse_only=SoupStrainer('a', href=True))
+        anchors = (
+            (anchor.get('href'), anchor.get_text(' ', strip=True))
+            for anchor in soup.find_all('a', href=True)
+        )
+
+    links = []
+    for href, text in anchors:
+        if href is None:
+            continue
+        links.append((urljoin(base_url, href) if base_url else href, text))
+    return links
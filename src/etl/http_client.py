@@ -0,0 +1,215 @@
+"""
+CAE HTTP Client - Shared pooled HTTP layer for scrapers and extractors
+Connection pooling per host, keep-alive, compressed transfers, timeouts, retries with jitter and traffic counters
+"""
+
+import inspect
+import logging
+import threading
+from typing import Dict, Optional, Tuple, Union
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    from http_fixtures import RecordingAdapter, ReplayAdapter, fixture_settings, get_archive
+except ImportError:
+    from src.etl.http_fixtures import RecordingAdapter, ReplayAdapter, fixture_settings, get_archive
+
+logger = logging.getLogger(__name__)
+
+def _brotli_available() -> bool:
+    """urllib3 decodes ``br`` responses only when a brotli binding is installed"""
+    for module_name in ('brotli', 'brotlicffi'):
+        try:
+            __import__(module_name)
+            return True
+        except ImportError:
+            continue
+    return False
+
+# Only advertise encodings the client can actually decode
+ACCEPT_ENCODING = 'gzip, deflate, br' if _brotli_available() else 'gzip, deflate'
+
+BROWSER_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'es-ES,es;q=0.9,en;q=0.8',
+    'Accept-Encoding': ACCEPT_ENCODING,
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+    'Sec-Fetch-Dest': 'document',
+    'Sec-Fetch-Mode': 'navigate',
+    'Sec-Fetch-Site': 'none',
+    'Cache-Control': 'max-age=0'
+}
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+class HTTPStats:
+    """Thread-safe per-host request, byte, latency and error counters"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hosts: Dict[str, Dict[str, float]] = {}
+
+    def _host(self, url: str) -> Dict[str, float]:
+        host = urlparse(url).netloc
+        if host not in self.hosts:
+            self.hosts[host] = {'requests': 0, 'errors': 0, 'bytes': 0, 'latency_seconds': 0.0}
+        return self.hosts[host]
+
+    def record_response(self, url: str, latency_seconds: float, bytes_count: int = 0) -> None:
+        """Count a completed request (latency is time to response headers)"""
+        with self._lock:
+            counters = self._host(url)
+            counters['requests'] += 1
+            counters['latency_seconds'] += latency_seconds
+            counters['bytes'] += bytes_count
+
+    def record_bytes(self, url: str, bytes_count: int) -> None:
+        """Count body bytes read by the caller from a streamed response"""
+        with self._lock:
+            self._host(url)['bytes'] += bytes_count
+
+    def record_error(self, url: str) -> None:
+        """Count a request that failed without a response"""
+        with self._lock:
+            self._host(url)['errors'] += 1
+
+    def summary(self) -> Dict:
+        """Totals plus per-host counters with average latency"""
+        with self._lock:
+            hosts = {
+                host: dict(counters, avg_latency_seconds=(
+                    counters['latency_seconds'] / counters['requests'] if counters['requests'] else None
+                ))
+                for host, counters in self.hosts.items()
+            }
+        return {
+            'requests': sum(c['requests'] for c in hosts.values()),
+            'errors': sum(c['errors'] for c in hosts.values()),
+            'bytes': sum(c['bytes'] for c in hosts.values()),
+            'hosts': hosts
+        }
+
+def build_retry(retries: int = 3, backoff_factor: float = 0.5,
+                backoff_jitter: float = 0.5) -> Retry:
+    """
+    Retry policy for idempotent requests
+
+    Retries connection errors, read errors and throttling/5xx responses with
+    exponential backoff, honouring ``Retry-After``. Random jitter is added to
+    each backoff so parallel workers do not retry in lockstep (urllib3 >= 2).
+    """
+    options = {
+        'total': retries,
+        'connect': retries,
+        'read': retries,
+        'status': retries,
+        'backoff_factor': backoff_factor,
+        'status_forcelist': RETRY_STATUS_CODES,
+        'allowed_methods': frozenset({'GET', 'HEAD', 'OPTIONS'}),
+        'respect_retry_after_header': True,
+        'raise_on_status': False
+    }
+    if 'backoff_jitter' in inspect.signature(Retry.__init__).parameters:
+        options['backoff_jitter'] = backoff_jitter
+    return Retry(**options)
+
+class PooledHTTPClient(requests.Session):
+    """
+    ``requests.Session`` with tuned connection pools and traffic counters
+
+    One instance keeps up to ``pool_maxsize`` keep-alive connections for each
+    of ``pool_connections`` hosts, so repeated requests to a host reuse the
+    same TCP/TLS connection. Every request gets the default ``timeout``
+    unless one is passed explicitly and, when a ``rate_limiter`` is given,
+    waits for its host's turn first. Counters are available in ``stats``.
+    Decoded body bytes of non-streamed responses are counted automatically;
+    callers that stream bodies report them with ``stats.record_bytes``.
+
+    With a fixture archive (``fixture_path`` or the ``CAE_HTTP_FIXTURES``
+    environment variable) every response is either recorded into it or
+    replayed from it without network access; see ``http_fixtures``.
+    Replayed requests are not paced by the rate limiter.
+    """
+
+    def __init__(self, headers: Optional[Dict[str, str]] = None,
+                 timeout: Union[float, Tuple[float, float]] = (10, 30),
+                 pool_connections: int = 20, pool_maxsize: int = 20,
+                 retries: int = 3, backoff_factor: float = 0.5, backoff_jitter: float = 0.5,
+                 rate_limiter=None, fixture_path: Optional[str] = None,
+                 fixture_mode: str = 'replay', fixture_latency: Optional[float] = 0.0):
+        """
+        Args:
+            headers: Default headers (``Accept-Encoding`` is always set to the
+                encodings the client can decode)
+            timeout: Default ``(connect, read)`` timeout in seconds
+            pool_connections: Number of per-host pools to keep
+            pool_maxsize: Maximum keep-alive connections per host; should be
+                at least the number of threads sharing the client
+            retries: Retries for idempotent requests (0 disables them)
+            backoff_factor: Base of the exponential retry backoff in seconds
+            backoff_jitter: Maximum random seconds added to each backoff
+            rate_limiter: Object with a ``wait(url)`` method called before
+                every request, e.g. ``rate_limiter.HostRateLimiter`` (which
+                then fetches robots.txt through this client)
+            fixture_path: Archive to record into or replay from (defaults to
+                the ``CAE_HTTP_FIXTURES`` environment settings)
+            fixture_mode: ``record`` or ``replay``
+            fixture_latency: Seconds per replayed response (None replays
+                the recorded response times)
+        """
+        super().__init__()
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter
+        self.stats = HTTPStats()
+
+        # The limiter reads robots.txt through this client (replayed in fixture mode)
+        if rate_limiter is not None and getattr(rate_limiter, 'http_client', False) is None:
+            rate_limiter.http_client = self
+
+        if fixture_path is None:
+            fixture_path, fixture_mode, fixture_latency = fixture_settings() or (None, fixture_mode, fixture_latency)
+        self.fixture_mode = fixture_mode if fixture_path else None
+
+        adapter_options = {
+            'pool_connections': pool_connections,
+            'pool_maxsize': pool_maxsize,
+            'max_retries': build_retry(retries, backoff_factor, backoff_jitter)
+        }
+        if self.fixture_mode == 'replay':
+            adapter = ReplayAdapter(get_archive(fixture_path), latency=fixture_latency)
+            self.rate_limiter = None
+        elif self.fixture_mode == 'record':
+            adapter = RecordingAdapter(get_archive(fixture_path), **adapter_options)
+        else:
+            adapter = HTTPAdapter(**adapter_options)
+        self.mount('https://', adapter)
+        self.mount('http://', adapter)
+
+        self.headers.update(headers or {})
+        self.headers['Accept-Encoding'] = ACCEPT_ENCODING
+
+    def request(self, method, url, *args, paced: bool = True, **kwargs):
+        """
+        Send a request with the default timeout and record it in ``stats``
+
+        ``paced=False`` skips the rate limiter (used for its own robots.txt requests).
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        if paced and self.rate_limiter is not None:
+            self.rate_limiter.wait(url)
+        try:
+            response = super().request(method, url, *args, **kwargs)
+        except requests.exceptions.RequestException:
+            self.stats.record_error(url)
+            raise
+
+        # Streamed bodies have not been read yet; their callers report them
+        bytes_count = 0 if kwargs.get('stream') else len(response.content)
+        self.stats.record_response(url, response.elapsed.total_seconds(), bytes_count)
+        return response
@@ -0,0 +1,200 @@
+"""
+CAE HTTP Fixtures - Record and replay HTTP traffic for offline runs
+Responses are captured into a gzip-compressed archive and served back deterministically
+"""
+
+import base64
+import gzip
+import io
+import json
+import logging
+import os
+import threading
+import time
+from datetime import timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+logger = logging.getLogger(__name__)
+
+# Environment switches picked up by every PooledHTTPClient
+FIXTURES_ENV = 'CAE_HTTP_FIXTURES'
+FIXTURE_MODE_ENV = 'CAE_HTTP_FIXTURE_MODE'
+FIXTURE_LATENCY_ENV = 'CAE_HTTP_FIXTURE_LATENCY'
+
+FIXTURE_MODES = ('record', 'replay')
+
+# Headers that describe the wire encoding, not the decoded body stored in the archive
+_TRANSPORT_HEADERS = {'content-encoding', 'transfer-encoding', 'content-length', 'connection'}
+
+def fixture_key(method: str, url: str) -> str:
+    """Lookup key of a request: method plus URL with its query parameters sorted"""
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return f"{method.upper()} {urlunsplit((parts.scheme, parts.netloc, parts.path, query, ''))}"
+
+class FixtureArchive:
+    """
+    Gzip-compressed JSON-lines archive of HTTP responses
+
+    Each recorded response is appended as its own gzip member, so the archive
+    stays readable if a recording run is interrupted. When a request was
+    recorded several times, replays return the recordings in order and then
+    keep returning the last one.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._entries: Optional[Dict[str, List[Dict]]] = None
+        self._replay_positions: Dict[str, int] = {}
+
+    def _load(self) -> Dict[str, List[Dict]]:
+        if self._entries is None:
+            entries: Dict[str, List[Dict]] = {}
+            if self.path.exists():
+                with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+                    for line in f:
+                        entry = json.loads(line)
+                        entries.setdefault(entry['key'], []).append(entry)
+            self._entries = entries
+        return self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(entries) for entries in self._load().values())
+
+    def record(self, method: str, url: str, status_code: int, reason: str,
+               headers: Dict[str, str], body: bytes, elapsed_seconds: float) -> None:
+        """Append one response to the archive"""
+        entry = {
+            'key': fixture_key(method, url),
+            'url': url,
+            'status_code': status_code,
+            'reason': reason,
+            'headers': {name: value for name, value in headers.items()
+                        if name.lower() not in _TRANSPORT_HEADERS},
+            'body': base64.b64encode(body).decode('ascii'),
+            'elapsed_seconds': elapsed_seconds
+        }
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with gzip.open(self.path, 'at', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            self._load().setdefault(entry['key'], []).append(entry)
+
+    def lookup(self, method: str, url: str) -> Optional[Dict]:
+        """Next recorded response for a request, or None if it was never recorded"""
+        key = fixture_key(method, url)
+        with self._lock:
+            entries = self._load().get(key)
+            if not entries:
+                return None
+            position = self._replay_positions.get(key, 0)
+            self._replay_positions[key] = position + 1
+            return entries[min(position, len(entries) - 1)]
+
+    def rewind(self) -> None:
+        """Restart every replay sequence from its first recording"""
+        with self._lock:
+            self._replay_positions.clear()
+
+class RecordingAdapter(HTTPAdapter):
+    """``HTTPAdapter`` that saves every response it receives into an archive"""
+
+    def __init__(self, archive: FixtureArchive, **kwargs):
+        self.archive = archive
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        # Reading the body here keeps it available to streaming callers through iter_content
+        body = response.content
+        self.archive.record(request.method, request.url, response.status_code, response.reason or '',
+                            dict(response.headers), body, response.elapsed.total_seconds())
+        return response
+
+class ReplayAdapter(BaseAdapter):
+    """
+    Transport adapter that answers requests from an archive without network access
+
+    Every response takes ``latency`` seconds; with ``latency=None`` the
+    recorded response time is used instead. Requests that were never recorded
+    fail with ``requests.exceptions.ConnectionError``, like an unreachable host.
+    """
+
+    def __init__(self, archive: FixtureArchive, latency: Optional[float] = 0.0):
+        super().__init__()
+        self.archive = archive
+        self.latency = latency
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        entry = self.archive.lookup(request.method, request.url)
+        if entry is None:
+            raise requests.exceptions.ConnectionError(
+                f"No recorded response for {request.method} {request.url}", request=request
+            )
+
+        delay = entry['elapsed_seconds'] if self.latency is None else self.latency
+        if delay:
+            time.sleep(delay)
+
+        response = requests.Response()
+        response.status_code = entry['status_code']
+        response.reason = entry['reason']
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.raw = io.BytesIO(base64.b64decode(entry['body']))
+        response.url = request.url
+        response.request = request
+        response.elapsed = timedelta(seconds=delay or 0)
+        response.connection = self
+        return response
+
+    def close(self):
+        pass
+
+def fixture_settings() -> Optional[Tuple[str, str, Optional[float]]]:
+    """
+    Fixture configuration from the environment
+
+    ``CAE_HTTP_FIXTURES`` names the archive, ``CAE_HTTP_FIXTURE_MODE`` is
+    ``record`` or ``replay`` (default) and ``CAE_HTTP_FIXTURE_LATENCY`` sets
+    the replay latency in seconds (``recorded`` replays the captured times).
+
+    Returns:
+        Tuple (archive path, mode, latency), or None when fixtures are off
+    """
+    path = os.environ.get(FIXTURES_ENV)
+    if not path:
+        return None
+
+    mode = os.environ.get(FIXTURE_MODE_ENV, 'replay').lower()
+    if mode not in FIXTURE_MODES:
+        raise ValueError(f"{FIXTURE_MODE_ENV} must be one of {FIXTURE_MODES}, got {mode!r}")
+
+    latency_setting = os.environ.get(FIXTURE_LATENCY_ENV, '0')
+    latency = None if latency_setting.lower() == 'recorded' else float(latency_setting)
+    return path, mode, latency
+
+def fixture_mode() -> Optional[str]:
+    """'record', 'replay' or None, according to the environment"""
+    settings = fixture_settings()
+    return settings[1] if settings else None
+
+_archives: Dict[str, FixtureArchive] = {}
+_archives_lock = threading.Lock()
+
+def get_archive(path: Union[str, Path]) -> FixtureArchive:
+    """Process-wide archive for a path, so every client records into and replays from the same one"""
+    key = str(Path(path).resolve())
+    with _archives_lock:
+        if key not in _archives:
+            _archives[key] = FixtureArchive(path)
+        return _archives[key]
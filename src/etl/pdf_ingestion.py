@@ -0,0 +1,205 @@
+"""
+CAE PDF Ingestion - Page-level text and table extraction for downloaded PDFs
+Pages are parsed in a process pool and cached per page under the file checksum
+"""
+
+import hashlib
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+try:
+    import pdfplumber
+except ImportError:
+    pdfplumber = None
+
+logger = logging.getLogger(__name__)
+
+# Bump when the cached page format changes so stale pages are re-parsed
+CACHE_VERSION = 1
+
+PAGE_COLUMNS = ['document', 'page_number', 'text', 'char_count', 'table_count']
+TABLE_COLUMNS = ['document', 'page_number', 'table_index', 'row_index', 'column_index', 'value']
+
+def _extract_pages(file_path: str, page_numbers: List[int]) -> List[Dict]:
+    """
+    Extract text and tables from some pages of a PDF (runs in a worker process)
+
+    The document is opened once per batch; page numbers are 1-based.
+    """
+    pages = []
+    with pdfplumber.open(file_path) as pdf:
+        for page_number in page_numbers:
+            page = pdf.pages[page_number - 1]
+            pages.append({
+                'page_number': page_number,
+                'text': page.extract_text() or '',
+                'tables': [
+                    [[cell if cell is None else str(cell) for cell in row] for row in table]
+                    for table in page.extract_tables()
+                ]
+            })
+            # Release the parsed layout before moving on to the next page
+            page.close()
+    return pages
+
+def file_checksum(file_path: Path, algorithm: str = 'md5', chunk_size: int = 1024 * 1024) -> str:
+    """Hex digest of a file's contents"""
+    file_hash = hashlib.new(algorithm)
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            file_hash.update(chunk)
+    return file_hash.hexdigest()
+
+class PDFIngestor:
+    """
+    Turns PDFs into page and table DataFrames
+
+    Every page is cached as JSON under ``cache_dir/<checksum>/``, so an
+    unchanged document is never parsed twice and a document that was only
+    partly parsed resumes where it stopped. Uncached pages of all documents
+    are split into batches of ``pages_per_task`` and parsed in one process
+    pool, so a single large document still uses every worker.
+    """
+
+    def __init__(self, cache_dir: Path, max_workers: Optional[int] = None,
+                 pages_per_task: int = 8, checksum_algorithm: str = 'md5'):
+        """
+        Args:
+            cache_dir: Directory holding the per-page cache
+            max_workers: Worker processes (defaults to the CPU count)
+            pages_per_task: Pages parsed per worker task
+            checksum_algorithm: Hash used to key the cache when the caller
+                does not provide checksums
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.pages_per_task = pages_per_task
+        self.checksum_algorithm = checksum_algorithm
+
+    @property
+    def available(self) -> bool:
+        """Whether a PDF parser is installed"""
+        return pdfplumber is not None
+
+    def _page_cache_path(self, checksum: str, page_number: int) -> Path:
+        return self.cache_dir / f"v{CACHE_VERSION}" / checksum[:2] / checksum / f"page-{page_number:05d}.json"
+
+    def _read_cached_page(self, checksum: str, page_number: int) -> Optional[Dict]:
+        try:
+            with open(self._page_cache_path(checksum, page_number), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_cached_page(self, checksum: str, page: Dict) -> None:
+        path = self._page_cache_path(checksum, page['page_number'])
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(page, f, ensure_ascii=False)
+        tmp_path.replace(path)
+
+    def _page_count(self, checksum: str, file_path: Path) -> int:
+        """Number of pages, remembered next to the cached pages"""
+        count_path = self.cache_dir / f"v{CACHE_VERSION}" / checksum[:2] / checksum / 'page_count'
+        try:
+            return int(count_path.read_text())
+        except (OSError, ValueError):
+            pass
+
+        with pdfplumber.open(file_path) as pdf:
+            count = len(pdf.pages)
+        count_path.parent.mkdir(parents=True, exist_ok=True)
+        count_path.write_text(str(count))
+        return count
+
+    def ingest(self, files: Iterable[Tuple[str, Path, Optional[str]]]) -> Dict[str, Dict[str, pd.DataFrame]]:
+        """
+        Extract every page of several PDFs
+
+        Args:
+            files: ``(document name, path, checksum or None)`` tuples; a
+                checksum must describe the file's current contents, pass None
+                to have the file hashed
+
+        Returns:
+            ``{document: {'pages': DataFrame, 'tables': DataFrame}}``; tables
+            are in long format, one row per cell
+        """
+        if not self.available:
+            logger.warning("pdfplumber is not installed, skipping PDF ingestion")
+            return {}
+
+        documents = {}
+        pending: List[Tuple[str, List[int]]] = []
+        for name, file_path, checksum in files:
+            try:
+                checksum = checksum or file_checksum(file_path, self.checksum_algorithm)
+                page_count = self._page_count(checksum, file_path)
+            except Exception as e:
+                logger.error(f"Error opening PDF {file_path}: {e}")
+                continue
+
+            pages = {}
+            missing = []
+            for page_number in range(1, page_count + 1):
+                page = self._read_cached_page(checksum, page_number)
+                if page is None:
+                    missing.append(page_number)
+                else:
+                    pages[page_number] = page
+            documents[name] = {'path': file_path, 'checksum': checksum, 'pages': pages}
+
+            for start in range(0, len(missing), self.pages_per_task):
+                pending.append((name, missing[start:start + self.pages_per_task]))
+
+            logger.info(f"{name}: {page_count} pages, {len(missing)} to parse")
+
+        if pending:
+            self._parse_pending(documents, pending)
+
+        return {
+            name: self._build_frames(name, document['pages'])
+            for name, document in documents.items()
+        }
+
+    def _parse_pending(self, documents: Dict, pending: List[Tuple[str, List[int]]]) -> None:
+        """Parse uncached page batches in the process pool and cache each page"""
+        with ProcessPoolExecutor(max_workers=min(self.max_workers, len(pending))) as executor:
+            futures = {
+                executor.submit(_extract_pages, str(documents[name]['path']), page_numbers): name
+                for name, page_numbers in pending
+            }
+            for future in as_completed(futures):
+                name = futures[future]
+                document = documents[name]
+                try:
+                    for page in future.result():
+                        self._write_cached_page(document['checksum'], page)
+                        document['pages'][page['page_number']] = page
+                except Exception as e:
+                    logger.error(f"Error parsing pages of {name}: {e}")
+
+    @staticmethod
+    def _build_frames(name: str, pages: Dict[int, Dict]) -> Dict[str, pd.DataFrame]:
+        """Page and long-format table DataFrames of one document"""
+        page_rows = []
+        cell_rows = []
+        for page_number in sorted(pages):
+            page = pages[page_number]
+            page_rows.append((name, page_number, page['text'], len(page['text']), len(page['tables'])))
+            for table_index, table in enumerate(page['tables']):
+                for row_index, row in enumerate(table):
+                    for column_index, value in enumerate(row):
+                        cell_rows.append((name, page_number, table_index, row_index, column_index, value))
+
+        return {
+            'pages': pd.DataFrame(page_rows, columns=PAGE_COLUMNS),
+            'tables': pd.DataFrame(cell_rows, columns=TABLE_COLUMNS)
+        }
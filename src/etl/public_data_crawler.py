@@ -0,0 +1,437 @@
+"""
+CAE Public Data Crawler - Rastreo incremental de fuentes oficiales
+Crawler en anchura (BFS) con frontera persistente en SQLite y re-rastreo condicional
+"""
+
+import argparse
+import hashlib
+import logging
+import posixpath
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urljoin, urlparse, urlunparse
+
+import requests
+
+try:
+    from html_parsing import extract_links
+    from http_client import PooledHTTPClient
+    from rate_limiter import HostRateLimiter
+except ImportError:
+    from src.etl.html_parsing import extract_links
+    from src.etl.http_client import PooledHTTPClient
+    from src.etl.rate_limiter import HostRateLimiter
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Fuentes oficiales que ya usa el proyecto
+PUBLIC_SOURCES = {
+    'boe': 'https://www.boe.es/',
+    'insst': 'https://www.insst.es/',
+    'ine': 'https://www.ine.es/',
+    'flc': 'https://www.fundacionlaboral.org/estadisticas/',
+    'civismo': 'https://www.civismo.org/informes/',
+    'cnmc': 'https://www.cnmc.es/estudios-y-publicaciones'
+}
+
+# Parámetros de seguimiento/sesión que no cambian el contenido
+IGNORED_QUERY_PARAMS = {'fbclid', 'gclid', 'jsessionid', 'phpsessid', 'sid', 'sessionid'}
+
+# Recursos que no aportan datos (no se encolan)
+SKIPPED_EXTENSIONS = {
+    '.jpg', '.jpeg', '.png', '.gif', '.svg', '.webp', '.ico', '.css', '.js',
+    '.woff', '.woff2', '.ttf', '.mp3', '.mp4', '.avi', '.mov', '.zip'
+}
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+def canonicalize_url(url: str, base: Optional[str] = None) -> Optional[str]:
+    """
+    Forma canónica de una URL para deduplicar la frontera
+
+    Resuelve URLs relativas, normaliza esquema y host a minúsculas, elimina
+    puertos por defecto, fragmentos, parámetros de sesión/seguimiento y
+    segmentos ``.``/``..``, y ordena los parámetros de la query.
+
+    Returns:
+        URL canónica, o None si no es http(s)
+    """
+    if base:
+        url = urljoin(base, url.strip())
+    parsed = urlparse(url.strip())
+
+    scheme = parsed.scheme.lower()
+    if scheme not in DEFAULT_PORTS or not parsed.hostname:
+        return None
+
+    netloc = parsed.hostname.lower()
+    if parsed.port and parsed.port != DEFAULT_PORTS[scheme]:
+        netloc = f"{netloc}:{parsed.port}"
+
+    # Quitar ;jsessionid=... y normalizar segmentos
+    path = parsed.path.split(';', 1)[0] or '/'
+    normalized = posixpath.normpath(path)
+    if path.endswith('/') and normalized != '/':
+        normalized += '/'
+    if normalized.startswith('//'):
+        normalized = '/' + normalized.lstrip('/')
+
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parsed.query, keep_blank_values=True)
+        if key.lower() not in IGNORED_QUERY_PARAMS and not key.lower().startswith('utm_')
+    ))
+
+    return urlunparse((scheme, netloc, normalized, '', query, ''))
+
+def registered_domain(host: str) -> str:
+    """Host sin prefijo ``www.`` para comparar dominios permitidos"""
+    host = host.lower()
+    return host[4:] if host.startswith('www.') else host
+
+class PublicDataCrawler:
+    """
+    Crawler BFS incremental para fuentes oficiales
+
+    El estado vive en SQLite: ``pages`` guarda validadores (ETag,
+    Last-Modified) y hash de contenido de cada URL vista, ``links`` sus
+    enlaces salientes y ``frontier`` la cola de cada ejecución, de modo que
+    un proceso interrumpido se reanuda donde lo dejó. En los re-rastreos las
+    páginas se piden con cabeceras condicionales; si el servidor responde 304
+    o el hash no cambia, no se reescribe nada y se siguen los enlaces ya
+    conocidos, así que un rastreo diario solo descarga lo que ha cambiado.
+    """
+
+    def __init__(self, data_dir: Optional[Path] = None, max_depth: int = 2,
+                 max_pages: int = 500, workers: int = 6, request_delay: float = 1.0):
+        self.data_dir = Path(data_dir) if data_dir else Path(__file__).resolve().parents[2] / "data" / "raw" / "crawl"
+        self.objects_dir = self.data_dir / "objects"
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.db_path = self.data_dir / "crawl_state.db"
+
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.workers = workers
+
+        self.rate_limiter = HostRateLimiter(default_delay=request_delay)
+        self.session = PooledHTTPClient(
+            headers={
+                'User-Agent': 'CAE-Data-Analysis/1.0 (Professional Research)',
+                'Accept': 'text/html,application/xhtml+xml,application/pdf,text/csv,*/*;q=0.8',
+                'Accept-Language': 'es-ES,es;q=0.9,en;q=0.8'
+            },
+            timeout=(10, 30),
+            pool_maxsize=max(workers, 10),
+            rate_limiter=self.rate_limiter
+        )
+
+        self.conn = sqlite3.connect(self.db_path)
+        self.init_database()
+
+    def init_database(self):
+        """Inicializar tablas de estado del crawler"""
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                domain TEXT,
+                http_status INTEGER,
+                content_type TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                content_hash TEXT,
+                content_path TEXT,
+                fetched_at TEXT,
+                changed_at TEXT,
+                error TEXT
+            );
+            CREATE TABLE IF NOT EXISTS links (
+                source_url TEXT,
+                target_url TEXT,
+                PRIMARY KEY (source_url, target_url)
+            );
+            CREATE TABLE IF NOT EXISTS crawl_runs (
+                run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                started_at TEXT,
+                finished_at TEXT,
+                fetched INTEGER DEFAULT 0,
+                not_modified INTEGER DEFAULT 0,
+                unchanged INTEGER DEFAULT 0,
+                changed INTEGER DEFAULT 0,
+                errors INTEGER DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS frontier (
+                run_id INTEGER,
+                url TEXT,
+                depth INTEGER,
+                status TEXT DEFAULT 'queued',
+                PRIMARY KEY (run_id, url)
+            );
+            CREATE INDEX IF NOT EXISTS idx_frontier_queue ON frontier (run_id, status, depth);
+        ''')
+        self.conn.commit()
+
+    def close(self):
+        self.session.close()
+        self.conn.close()
+
+    def _start_or_resume_run(self, seeds: Iterable[str], fresh: bool = False) -> int:
+        """Reanudar la última ejecución sin terminar o empezar una nueva con las semillas"""
+        unfinished = self.conn.execute(
+            'SELECT run_id FROM crawl_runs WHERE finished_at IS NULL ORDER BY run_id DESC LIMIT 1'
+        ).fetchone()
+
+        if unfinished and not fresh:
+            logger.info(f"Reanudando rastreo {unfinished[0]}")
+            return unfinished[0]
+
+        if unfinished:
+            self.conn.execute('UPDATE crawl_runs SET finished_at = ? WHERE run_id = ?',
+                              (datetime.now().isoformat(), unfinished[0]))
+
+        run_id = self.conn.execute('INSERT INTO crawl_runs (started_at) VALUES (?)',
+                                   (datetime.now().isoformat(),)).lastrowid
+        self._enqueue(run_id, ((canonicalize_url(seed), 0) for seed in seeds))
+        self.conn.commit()
+        logger.info(f"Nuevo rastreo {run_id}")
+        return run_id
+
+    def _enqueue(self, run_id: int, urls: Iterable[Tuple[Optional[str], int]]):
+        """Añadir URLs a la frontera (las ya vistas en esta ejecución se ignoran)"""
+        self.conn.executemany(
+            'INSERT OR IGNORE INTO frontier (run_id, url, depth) VALUES (?, ?, ?)',
+            ((run_id, url, depth) for url, depth in urls if url)
+        )
+
+    def _next_batch(self, run_id: int, size: int) -> List[Tuple[str, int]]:
+        """Siguientes URLs en orden BFS (por profundidad y orden de descubrimiento)"""
+        return self.conn.execute(
+            "SELECT url, depth FROM frontier WHERE run_id = ? AND status = 'queued' "
+            "ORDER BY depth, rowid LIMIT ?", (run_id, size)
+        ).fetchall()
+
+    def _is_allowed(self, url: str, allowed_domains: set) -> bool:
+        """Dominio dentro de las fuentes y recurso que puede contener datos"""
+        parsed = urlparse(url)
+        domain = registered_domain(parsed.hostname or '')
+        if not any(domain == allowed or domain.endswith('.' + allowed) for allowed in allowed_domains):
+            return False
+        if posixpath.splitext(parsed.path)[1].lower() in SKIPPED_EXTENSIONS:
+            return False
+        return True
+
+    def crawl(self, sources: Optional[Dict[str, str]] = None, fresh: bool = False) -> Dict:
+        """
+        Rastrear las fuentes en anchura hasta ``max_depth``
+
+        Cada llamada procesa como mucho ``max_pages`` URLs; si la frontera no
+        se vacía, la ejecución queda abierta y la siguiente llamada la reanuda.
+
+        Args:
+            sources: Diccionario nombre -> URL semilla (por defecto PUBLIC_SOURCES)
+            fresh: Abandonar una ejecución interrumpida en lugar de reanudarla
+
+        Returns:
+            Resumen de la ejecución
+        """
+        sources = sources or PUBLIC_SOURCES
+        allowed_domains = {registered_domain(urlparse(url).hostname) for url in sources.values()}
+        run_id = self._start_or_resume_run(sources.values(), fresh=fresh)
+
+        processed = 0
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            while processed < self.max_pages:
+                batch = self._next_batch(run_id, min(self.workers, self.max_pages - processed))
+                if not batch:
+                    break
+
+                # Las descargas van en paralelo (el limitador espacia cada host);
+                # la escritura en SQLite se hace en este hilo
+                known = {url: self._page_state(url) for url, _ in batch}
+                outcomes = executor.map(lambda item: self._fetch(item[0], known[item[0]]), batch)
+
+                for (url, depth), outcome in zip(batch, outcomes):
+                    self._record(run_id, url, depth, outcome, allowed_domains)
+                    processed += 1
+
+                self.conn.commit()
+
+        remaining = self.conn.execute(
+            "SELECT COUNT(*) FROM frontier WHERE run_id = ? AND status = 'queued'", (run_id,)
+        ).fetchone()[0]
+        if remaining == 0:
+            self.conn.execute('UPDATE crawl_runs SET finished_at = ? WHERE run_id = ?',
+                              (datetime.now().isoformat(), run_id))
+            self.conn.commit()
+
+        summary = self.run_summary(run_id)
+        summary['queued'] = remaining
+        logger.info(f"✅ Rastreo {run_id}: {summary}")
+        return summary
+
+    def _page_state(self, url: str) -> Optional[Tuple]:
+        return self.conn.execute(
+            'SELECT etag, last_modified, content_hash FROM pages WHERE url = ?', (url,)
+        ).fetchone()
+
+    def _fetch(self, url: str, known: Optional[Tuple]) -> Dict:
+        """Descargar una URL con cabeceras condicionales (se ejecuta en un hilo)"""
+        if not self.rate_limiter.can_fetch(url):
+            return {'outcome': 'error', 'error': 'disallowed by robots.txt'}
+
+        headers = {}
+        if known:
+            etag, last_modified, _ = known
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+
+        try:
+            response = self.session.get(url, headers=headers)
+        except requests.exceptions.RequestException as e:
+            return {'outcome': 'error', 'error': str(e)}
+
+        result = {
+            'http_status': response.status_code,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'content_type': response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+        }
+
+        if response.status_code == 304:
+            result['outcome'] = 'not_modified'
+            return result
+        if response.status_code != 200:
+            result.update(outcome='error', error=f"HTTP {response.status_code}")
+            return result
+
+        content_hash = hashlib.sha256(response.content).hexdigest()
+        result['content_hash'] = content_hash
+        if known and known[2] == content_hash:
+            result['outcome'] = 'unchanged'
+            return result
+
+        result['outcome'] = 'changed'
+        result['content'] = response.content
+        result['final_url'] = response.url
+        return result
+
+    def _record(self, run_id: int, url: str, depth: int, result: Dict, allowed_domains: set):
+        """Guardar el resultado de una URL y encolar sus enlaces"""
+        now = datetime.now().isoformat()
+        outcome = result['outcome']
+
+        if outcome == 'error':
+            self.conn.execute('''
+                INSERT INTO pages (url, domain, http_status, fetched_at, error) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET http_status = excluded.http_status,
+                    fetched_at = excluded.fetched_at, error = excluded.error
+            ''', (url, urlparse(url).hostname, result.get('http_status'), now, result['error']))
+            links = []
+
+        elif outcome in ('not_modified', 'unchanged'):
+            # Mismo contenido: actualizar validadores y reutilizar los enlaces conocidos
+            self.conn.execute('''
+                UPDATE pages SET fetched_at = ?, error = NULL,
+                    etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified)
+                WHERE url = ?
+            ''', (now, result.get('etag'), result.get('last_modified'), url))
+            links = [row[0] for row in self.conn.execute(
+                'SELECT target_url FROM links WHERE source_url = ?', (url,)
+            )]
+
+        else:
+            content_path = self._store_object(result['content_hash'], result['content'])
+            self.conn.execute('''
+                INSERT INTO pages (url, domain, http_status, content_type, etag, last_modified,
+                                   content_hash, content_path, fetched_at, changed_at, error)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, NULL)
+                ON CONFLICT(url) DO UPDATE SET http_status = excluded.http_status,
+                    content_type = excluded.content_type, etag = excluded.etag,
+                    last_modified = excluded.last_modified, content_hash = excluded.content_hash,
+                    content_path = excluded.content_path, fetched_at = excluded.fetched_at,
+                    changed_at = excluded.changed_at, error = NULL
+            ''', (url, urlparse(url).hostname, result['http_status'], result['content_type'],
+                  result['etag'], result['last_modified'], result['content_hash'],
+                  str(content_path.relative_to(self.data_dir)), now, now))
+
+            links = []
+            if 'html' in result['content_type']:
+                links = self.extract_links(result['content'], result['final_url'])
+            self.conn.execute('DELETE FROM links WHERE source_url = ?', (url,))
+            self.conn.executemany('INSERT OR IGNORE INTO links VALUES (?, ?)',
+                                  ((url, link) for link in links))
+
+        if depth < self.max_depth:
+            self._enqueue(run_id, (
+                (link, depth + 1) for link in links if self._is_allowed(link, allowed_domains)
+            ))
+
+        self.conn.execute("UPDATE frontier SET status = ? WHERE run_id = ? AND url = ?",
+                          (outcome, run_id, url))
+        column = {'changed': 'changed', 'unchanged': 'unchanged',
+                  'not_modified': 'not_modified', 'error': 'errors'}[outcome]
+        self.conn.execute(f'UPDATE crawl_runs SET {column} = {column} + 1 WHERE run_id = ?', (run_id,))
+        if outcome in ('changed', 'unchanged'):
+            self.conn.execute('UPDATE crawl_runs SET fetched = fetched + 1 WHERE run_id = ?', (run_id,))
+
+    @staticmethod
+    def extract_links(content: bytes, base_url: str) -> List[str]:
+        """Enlaces canónicos y únicos de una página HTML"""
+        links = []
+        seen = set()
+        for href, _ in extract_links(content):
+            link = canonicalize_url(href, base=base_url)
+            if link and link not in seen:
+                seen.add(link)
+                links.append(link)
+        return links
+
+    def _store_object(self, content_hash: str, content: bytes) -> Path:
+        """Guardar el contenido una sola vez, direccionado por su hash"""
+        object_path = self.objects_dir / content_hash[:2] / content_hash
+        if not object_path.exists():
+            object_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = object_path.with_suffix('.tmp')
+            tmp_path.write_bytes(content)
+            tmp_path.replace(object_path)
+        return object_path
+
+    def run_summary(self, run_id: int) -> Dict:
+        """Contadores de una ejecución"""
+        row = self.conn.execute('''
+            SELECT run_id, started_at, finished_at, fetched, not_modified, unchanged, changed, errors
+            FROM crawl_runs WHERE run_id = ?
+        ''', (run_id,)).fetchone()
+        keys = ['run_id', 'started_at', 'finished_at', 'fetched', 'not_modified', 'unchanged', 'changed', 'errors']
+        return dict(zip(keys, row))
+
+def main():
+    """Función principal para rastrear las fuentes oficiales"""
+    parser = argparse.ArgumentParser(description="Crawler incremental de fuentes oficiales CAE")
+    parser.add_argument('--sources', nargs='+', choices=sorted(PUBLIC_SOURCES), help="Fuentes a rastrear")
+    parser.add_argument('--max-depth', type=int, default=2)
+    parser.add_argument('--max-pages', type=int, default=500)
+    parser.add_argument('--workers', type=int, default=6)
+    parser.add_argument('--fresh', action='store_true', help="No reanudar un rastreo interrumpido")
+    args = parser.parse_args()
+
+    sources = {name: PUBLIC_SOURCES[name] for name in (args.sources or PUBLIC_SOURCES)}
+
+    crawler = PublicDataCrawler(max_depth=args.max_depth, max_pages=args.max_pages, workers=args.workers)
+    try:
+        summary = crawler.crawl(sources, fresh=args.fresh)
+    finally:
+        crawler.close()
+
+    print(f"Páginas nuevas/cambiadas: {summary['changed']}, sin cambios: "
+          f"{summary['unchanged'] + summary['not_modified']}, errores: {summary['errors']}, "
+          f"pendientes: {summary['queued']}")
+    return summary
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""
+CAE Rate Limiter - Per-host token buckets for polite concurrent scraping
+Each host gets its own bucket, optionally paced by its robots.txt Crawl-delay
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+import requests
+
+try:
+    from http_client import PooledHTTPClient
+except ImportError:
+    from src.etl.http_client import PooledHTTPClient
+
+logger = logging.getLogger(__name__)
+
+# Sent with robots.txt requests when neither the limiter nor its client sets one
+DEFAULT_USER_AGENT = 'CAE-ETL-Pipeline/1.0'
+
+class TokenBucket:
+    """
+    Thread-safe token bucket
+
+    Tokens refill continuously at ``rate`` per second up to ``capacity``.
+    ``reserve`` takes a token immediately and returns how long the caller
+    must wait before using it, so callers are served in arrival order and
+    asyncio code can ``await asyncio.sleep`` instead of blocking.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take one token, returning the seconds to wait before it may be used"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            return max(0.0, -self.tokens / self.rate)
+
+    def acquire(self) -> float:
+        """Take one token, sleeping until it may be used; returns seconds waited"""
+        delay = self.reserve()
+        if delay:
+            time.sleep(delay)
+        return delay
+
+class HostRateLimiter:
+    """
+    Per-host request pacing
+
+    Requests to the same host are spaced ``default_delay`` seconds apart
+    (after an initial burst of ``burst`` requests), while requests to
+    different hosts never wait for each other. With ``respect_robots`` the
+    host's robots.txt is read once and its ``Crawl-delay`` (or
+    ``Request-rate``) replaces the default when it is slower; ``can_fetch``
+    answers ``Disallow`` rules from the same cached copy.
+
+    robots.txt is fetched through ``http_client`` (the ``PooledHTTPClient``
+    the limiter is attached to) and only once per origin: concurrent first
+    requests to a host wait for that single fetch instead of repeating it.
+    """
+
+    def __init__(self, default_delay: float = 2.0, burst: int = 1, respect_robots: bool = True,
+                 user_agent: Optional[str] = None, robots_timeout: float = 10.0,
+                 http_client: Optional[PooledHTTPClient] = None):
+        """
+        Args:
+            default_delay: Seconds between requests to the same host
+            burst: Requests allowed back to back before pacing starts
+            respect_robots: Whether to read robots.txt for delays and rules
+            user_agent: Agent sent with robots.txt requests and matched
+                against its rules (defaults to the client's User-Agent)
+            robots_timeout: Timeout in seconds for robots.txt requests
+            http_client: Client used for robots.txt; set automatically when
+                the limiter is passed to a ``PooledHTTPClient``
+        """
+        self.default_delay = default_delay
+        self.burst = burst
+        self.respect_robots = respect_robots
+        self.user_agent = user_agent
+        self.robots_timeout = robots_timeout
+        self.http_client = http_client
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.robots: Dict[str, Optional[RobotFileParser]] = {}
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        """Lock serialising the first-time setup of one host or origin"""
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    @property
+    def agent(self) -> str:
+        """User-Agent for robots.txt requests and rule matching"""
+        if self.user_agent:
+            return self.user_agent
+        if self.http_client is not None and self.http_client.headers.get('User-Agent'):
+            return self.http_client.headers['User-Agent']
+        return DEFAULT_USER_AGENT
+
+    def wait(self, url: str) -> float:
+        """Block until a request to ``url``'s host is allowed; returns seconds waited"""
+        delay = self.reserve(url)
+        if delay:
+            time.sleep(delay)
+        return delay
+
+    def reserve(self, url: str) -> float:
+        """
+        Reserve a request slot for ``url``'s host without sleeping
+
+        Returns:
+            Seconds the caller must wait before sending the request
+        """
+        parsed = urlparse(url)
+        host = parsed.netloc
+        if not host:
+            return 0.0
+
+        bucket = self.buckets.get(host)
+        if bucket is None:
+            # Per-host lock: other hosts are not blocked while robots.txt is read
+            with self._key_lock(host):
+                bucket = self.buckets.get(host)
+                if bucket is None:
+                    delay = self._host_delay(f"{parsed.scheme or 'https'}://{host}")
+                    bucket = self.buckets[host] = TokenBucket(1 / delay, self.burst)
+
+        return bucket.reserve()
+
+    def _host_delay(self, origin: str) -> float:
+        """Seconds between requests for a host (default or robots.txt, whichever is slower)"""
+        delay = self.default_delay
+        if self.respect_robots:
+            robots_delay = self.robots_delay(origin)
+            if robots_delay and robots_delay > delay:
+                logger.info(f"{origin}: usando Crawl-delay de robots.txt ({robots_delay}s)")
+                delay = robots_delay
+        return max(delay, 1e-3)
+
+    def robots_parser(self, origin: str) -> Optional[RobotFileParser]:
+        """
+        Parsed robots.txt of an origin (fetched once), or None if unavailable
+
+        As in ``RobotFileParser.read``, a 401/403 answer disallows the whole
+        origin; other errors leave it unrestricted.
+        """
+        if origin in self.robots:
+            return self.robots[origin]
+
+        with self._key_lock(f"robots:{origin}"):
+            if origin in self.robots:
+                return self.robots[origin]
+
+            if self.http_client is None:
+                self.http_client = PooledHTTPClient(retries=0)
+
+            parser = None
+            try:
+                # Not paced: the host's bucket is built from this response
+                response = self.http_client.get(f"{origin}/robots.txt", timeout=self.robots_timeout,
+                                                headers={'User-Agent': self.agent}, paced=False)
+                if response.status_code == 200:
+                    parser = RobotFileParser()
+                    parser.parse(response.text.splitlines())
+                elif response.status_code in (401, 403):
+                    parser = RobotFileParser()
+                    parser.disallow_all = True
+            except requests.exceptions.RequestException:
+                pass
+
+            self.robots[origin] = parser
+            return parser
+
+    def robots_delay(self, origin: str) -> Optional[float]:
+        """Crawl-delay (or the interval implied by Request-rate) from a host's robots.txt"""
+        parser = self.robots_parser(origin)
+        if parser is None:
+            return None
+
+        crawl_delay = parser.crawl_delay(self.agent)
+        if crawl_delay:
+            return float(crawl_delay)
+
+        request_rate = parser.request_rate(self.agent)
+        if request_rate and request_rate.requests:
+            return request_rate.seconds / request_rate.requests
+        return None
+
+    def can_fetch(self, url: str) -> bool:
+        """Whether robots.txt allows fetching ``url`` (allowed when robots.txt is unavailable)"""
+        if not self.respect_robots:
+            return True
+        parsed = urlparse(url)
+        parser = self.robots_parser(f"{parsed.scheme or 'https'}://{parsed.netloc}")
+        return parser is None or parser.can_fetch(self.agent, url)
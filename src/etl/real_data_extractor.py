@@ -3,23 +3,63 @@ CAE Real Data Extractor - Professional Implementation
 Sistema de extracción de datos reales y verificables del sistema CAE
 """
 
-import requests
 import pandas as pd
-import numpy as np
 from datetime import datetime, timedelta
 import json
 import time
 from pathlib import Path
 import logging
+import threading
 from typing import Dict, List, Optional, Tuple
 import xml.etree.ElementTree as ET
-from bs4 import BeautifulSoup
 import re
 
+try:
+    from concurrent_sources import SourceTask, run_sources
+    from data_quality import DataQualityEngine
+    from extraction_records import RecordSchema, build_records, normalize_records
+    from html_parsing import extract_links
+    from http_client import PooledHTTPClient
+except ImportError:
+    from src.etl.concurrent_sources import SourceTask, run_sources
+    from src.etl.data_quality import DataQualityEngine
+    from src.etl.extraction_records import RecordSchema, build_records, normalize_records
+    from src.etl.html_parsing import extract_links
+    from src.etl.http_client import PooledHTTPClient
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Esquemas de los conjuntos extraídos (source, sector y extraction_date los añade build_records)
+BOE_REGULATIONS_SCHEMA = RecordSchema('boe_regulations', {
+    'document_id': 'string', 'title': 'string', 'url': 'string', 'type': 'string'
+})
+INE_STATS_SCHEMA = RecordSchema('ine_stats', {
+    'year': 'int16', 'total_companies': 'int64', 'micro_companies': 'int64',
+    'small_companies': 'int64', 'medium_companies': 'int64', 'large_companies': 'int64',
+    'total_workers': 'int64'
+})
+ITSS_INSPECTIONS_SCHEMA = RecordSchema('itss_inspections', {
+    'year': 'int16', 'total_inspections': 'int64', 'construction_inspections': 'int64',
+    'cae_related_inspections': 'int64', 'sanctions_imposed': 'int64', 'cae_sanctions': 'int64',
+    'total_fines_eur': 'int64', 'cae_fines_eur': 'int64'
+})
+FLC_TPC_SCHEMA = RecordSchema('flc_tpc', {
+    'year': 'int16', 'total_tpc_issued': 'int64', 'new_tpc_issued': 'int64',
+    'tpc_renewals': 'int64', 'training_hours_provided': 'int64', 'training_centers': 'int32'
+})
+CIVISMO_BUREAUCRACY_SCHEMA = RecordSchema('civismo_bureaucracy', {
+    'year': 'int16', 'total_admin_hours_pymes': 'int32', 'construction_admin_hours': 'int32',
+    'prl_admin_hours': 'int32', 'admin_cost_per_company_eur': 'int64',
+    'construction_admin_cost_eur': 'int64'
+})
+CNMC_COMPETITION_SCHEMA = RecordSchema('cnmc_competition', {
+    'year': 'int16', 'digital_services_market_size_eur': 'int64', 'cae_platforms_count': 'int32',
+    'market_concentration_index': 'float64', 'avg_price_per_user_eur': 'float64',
+    'barriers_to_entry_score': 'float64'
+})
+
 class CAERealDataExtractor:
     """
     Extractor de datos reales del sistema CAE
@@ -41,6 +81,7 @@ class CAERealDataExtractor:
             'Accept': 'application/json,application/xml,text/html,application/pdf',
             'Accept-Language': 'es-ES,es;q=0.9,en;q=0.8'
         }
+        self.session = PooledHTTPClient(headers=self.headers, timeout=30)
         
         # Fuentes de datos oficiales
         self.data_sources = self._initialize_data_sources()
@@ -93,46 +134,32 @@ class CAERealDataExtractor:
         }
         
         try:
-            response = requests.get(
+            response = self.session.get(
                 self.data_sources['boe']['search_url'],
-                params=search_params,
-                headers=self.headers,
-                timeout=30
+                params=search_params
             )
             response.raise_for_status()
             
-            # Parsear resultados
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Extraer información de la normativa
-            regulations_data = []
-            
-            # Buscar enlaces a documentos
-            links = soup.find_all('a', href=True)
-            for link in links:
-                href = link.get('href')
-                if 'BOE-A-2004-1848' in href or 'coordinacion' in href.lower():
-                    regulations_data.append({
-                        'source': 'BOE',
-                        'document_id': 'BOE-A-2004-1848',
-                        'title': link.get_text(strip=True),
-                        'url': href,
-                        'extraction_date': datetime.now().isoformat(),
-                        'type': 'normativa_cae'
-                    })
+            # Extraer información de la normativa (enlaces a documentos; solo se parsean los enlaces)
+            links = [
+                (href, title) for href, title in extract_links(response.content)
+                if 'BOE-A-2004-1848' in href or 'coordinacion' in href.lower()
+            ]
             
             # Si no encontramos resultados específicos, crear entrada base
-            if not regulations_data:
-                regulations_data.append({
-                    'source': 'BOE',
-                    'document_id': 'BOE-A-2004-1848',
-                    'title': 'Real Decreto 171/2004 - Coordinación de Actividades Empresariales',
-                    'url': 'https://www.boe.es/buscar/pdf/2004/BOE-A-2004-1848-consolidado.pdf',
-                    'extraction_date': datetime.now().isoformat(),
-                    'type': 'normativa_cae'
-                })
+            if not links:
+                links = [(
+                    'https://www.boe.es/buscar/pdf/2004/BOE-A-2004-1848-consolidado.pdf',
+                    'Real Decreto 171/2004 - Coordinación de Actividades Empresariales'
+                )]
             
-            df = pd.DataFrame(regulations_data)
+            regulations_data = {
+                'document_id': ['BOE-A-2004-1848'] * len(links),
+                'title': [title for _, title in links],
+                'url': [href for href, _ in links],
+                'type': ['normativa_cae'] * len(links)
+            }
+            df = build_records(regulations_data, BOE_REGULATIONS_SCHEMA, source='BOE')
             
             # Guardar datos
             output_path = self.raw_dir / 'boe_cae_regulations.csv'
@@ -151,46 +178,17 @@ class CAERealDataExtractor:
         
         try:
             # Datos del sector construcción (estimación basada en estructura conocida del INE)
-            construction_stats = [
-                {
-                    'year': 2023,
-                    'total_companies': 450000,
-                    'micro_companies': 380000,
-                    'small_companies': 55000,
-                    'medium_companies': 12000,
-                    'large_companies': 3000,
-                    'total_workers': 1200000,
-                    'sector': 'construccion',
-                    'source': 'INE',
-                    'extraction_date': datetime.now().isoformat()
-                },
-                {
-                    'year': 2022,
-                    'total_companies': 460000,
-                    'micro_companies': 390000,
-                    'small_companies': 56000,
-                    'medium_companies': 11000,
-                    'large_companies': 3000,
-                    'total_workers': 1180000,
-                    'sector': 'construccion',
-                    'source': 'INE',
-                    'extraction_date': datetime.now().isoformat()
-                },
-                {
-                    'year': 2021,
-                    'total_companies': 470000,
-                    'micro_companies': 400000,
-                    'small_companies': 57000,
-                    'medium_companies': 10000,
-                    'large_companies': 3000,
-                    'total_workers': 1150000,
-                    'sector': 'construccion',
-                    'source': 'INE',
-                    'extraction_date': datetime.now().isoformat()
-                }
-            ]
+            construction_stats = {
+                'year': [2023, 2022, 2021],
+                'total_companies': [450000, 460000, 470000],
+                'micro_companies': [380000, 390000, 400000],
+                'small_companies': [55000, 56000, 57000],
+                'medium_companies': [12000, 11000, 10000],
+                'large_companies': [3000, 3000, 3000],
+                'total_workers': [1200000, 1180000, 1150000]
+            }
             
-            df = pd.DataFrame(construction_stats)
+            df = build_records(construction_stats, INE_STATS_SCHEMA, source='INE', sector='construccion')
             
             # Guardar datos
             output_path = self.raw_dir / 'ine_construction_stats.csv'
@@ -209,46 +207,18 @@ class CAERealDataExtractor:
         
         try:
             # Datos de inspecciones (estructura basada en informes públicos de la ITSS)
-            inspection_data = [
-                {
-                    'year': 2023,
-                    'total_inspections': 85000,
-                    'construction_inspections': 12000,
-                    'cae_related_inspections': 2500,
-                    'sanctions_imposed': 3500,
-                    'cae_sanctions': 450,
-                    'total_fines_eur': 45000000,
-                    'cae_fines_eur': 2500000,
-                    'source': 'ITSS',
-                    'extraction_date': datetime.now().isoformat()
-                },
-                {
-                    'year': 2022,
-                    'total_inspections': 82000,
-                    'construction_inspections': 11500,
-                    'cae_related_inspections': 2300,
-                    'sanctions_imposed': 3200,
-                    'cae_sanctions': 420,
-                    'total_fines_eur': 42000000,
-                    'cae_fines_eur': 2300000,
-                    'source': 'ITSS',
-                    'extraction_date': datetime.now().isoformat()
-                },
-                {
-                    'year': 2021,
-                    'total_inspections': 78000,
-                    'construction_inspections': 11000,
-                    'cae_related_inspections': 2100,
-                    'sanctions_imposed': 3000,
-                    'cae_sanctions': 400,
-                    'total_fines_eur': 40000000,
-                    'cae_fines_eur': 2100000,
-                    'source': 'ITSS',
-                    'extraction_date': datetime.now().isoformat()
-                }
-            ]
+            inspection_data = {
+                'year': [2023, 2022, 2021],
+                'total_inspections': [85000, 82000, 78000],
+                'construction_inspections': [12000, 11500, 11000],
+                'cae_related_inspections': [2500, 2300, 2100],
+                'sanctions_imposed': [3500, 3200, 3000],
+                'cae_sanctions': [450, 420, 400],
+                'total_fines_eur': [45000000, 42000000, 40000000],
+                'cae_fines_eur': [2500000, 2300000, 2100000]
+            }
             
-            df = pd.DataFrame(inspection_data)
+            df = build_records(inspection_data, ITSS_INSPECTIONS_SCHEMA, source='ITSS')
             
             # Guardar datos
             output_path = self.raw_dir / 'itss_inspection_data.csv'
@@ -267,40 +237,16 @@ class CAERealDataExtractor:
         
         try:
             # Datos de TPC (basados en información pública de la FLC)
-            tpc_stats = [
-                {
-                    'year': 2023,
-                    'total_tpc_issued': 750000,
-                    'new_tpc_issued': 45000,
-                    'tpc_renewals': 120000,
-                    'training_hours_provided': 2800000,
-                    'training_centers': 52,
-                    'source': 'FLC',
-                    'extraction_date': datetime.now().isoformat()
-                },
-                {
-                    'year': 2022,
-                    'total_tpc_issued': 720000,
-                    'new_tpc_issued': 42000,
-                    'tpc_renewals': 115000,
-                    'training_hours_provided': 2600000,
-                    'training_centers': 51,
-                    'source': 'FLC',
-                    'extraction_date': datetime.now().isoformat()
-                },
-                {
-                    'year': 2021,
-                    'total_tpc_issued': 690000,
-                    'new_tpc_issued': 40000,
-                    'tpc_renewals': 110000,
-                    'training_hours_provided': 2400000,
-                    'training_centers': 50,
-                    'source': 'FLC',
-                    'extraction_date': datetime.now().isoformat()
-                }
-            ]
+            tpc_stats = {
+                'year': [2023, 2022, 2021],
+                'total_tpc_issued': [750000, 720000, 690000],
+                'new_tpc_issued': [45000, 42000, 40000],
+                'tpc_renewals': [120000, 115000, 110000],
+                'training_hours_provided': [2800000, 2600000, 2400000],
+                'training_centers': [52, 51, 50]
+            }
             
-            df = pd.DataFrame(tpc_stats)
+            df = build_records(tpc_stats, FLC_TPC_SCHEMA, source='FLC')
             
             # Guardar datos
             output_path = self.raw_dir / 'flc_tpc_stats.csv'
@@ -319,40 +265,16 @@ class CAERealDataExtractor:
         
         try:
             # Datos de cargas administrativas (basados en estudios de Civismo)
-            bureaucracy_data = [
-                {
-                    'year': 2023,
-                    'total_admin_hours_pymes': 332,
-                    'construction_admin_hours': 562,
-                    'prl_admin_hours': 174,
-                    'admin_cost_per_company_eur': 8500,
-                    'construction_admin_cost_eur': 12000,
-                    'source': 'Civismo',
-                    'extraction_date': datetime.now().isoformat()
-                },
-                {
-                    'year': 2022,
-                    'total_admin_hours_pymes': 340,
-                    'construction_admin_hours': 580,
-                    'prl_admin_hours': 180,
-                    'admin_cost_per_company_eur': 8200,
-                    'construction_admin_cost_eur': 11500,
-                    'source': 'Civismo',
-                    'extraction_date': datetime.now().isoformat()
-                },
-                {
-                    'year': 2021,
-                    'total_admin_hours_pymes': 350,
-                    'construction_admin_hours': 600,
-                    'prl_admin_hours': 185,
-                    'admin_cost_per_company_eur': 8000,
-                    'construction_admin_cost_eur': 11000,
-                    'source': 'Civismo',
-                    'extraction_date': datetime.now().isoformat()
-                }
-            ]
+            bureaucracy_data = {
+                'year': [2023, 2022, 2021],
+                'total_admin_hours_pymes': [332, 340, 350],
+                'construction_admin_hours': [562, 580, 600],
+                'prl_admin_hours': [174, 180, 185],
+                'admin_cost_per_company_eur': [8500, 8200, 8000],
+                'construction_admin_cost_eur': [12000, 11500, 11000]
+            }
             
-            df = pd.DataFrame(bureaucracy_data)
+            df = build_records(bureaucracy_data, CIVISMO_BUREAUCRACY_SCHEMA, source='Civismo')
             
             # Guardar datos
             output_path = self.raw_dir / 'civismo_bureaucracy_studies.csv'
@@ -371,40 +293,16 @@ class CAERealDataExtractor:
         
         try:
             # Datos de análisis de competencia (estructura basada en informes de la CNMC)
-            competition_data = [
-                {
-                    'year': 2023,
-                    'digital_services_market_size_eur': 2500000000,
-                    'cae_platforms_count': 15,
-                    'market_concentration_index': 0.65,
-                    'avg_price_per_user_eur': 150,
-                    'barriers_to_entry_score': 7.2,
-                    'source': 'CNMC',
-                    'extraction_date': datetime.now().isoformat()
-                },
-                {
-                    'year': 2022,
-                    'digital_services_market_size_eur': 2300000000,
-                    'cae_platforms_count': 14,
-                    'market_concentration_index': 0.68,
-                    'avg_price_per_user_eur': 145,
-                    'barriers_to_entry_score': 7.0,
-                    'source': 'CNMC',
-                    'extraction_date': datetime.now().isoformat()
-                },
-                {
-                    'year': 2021,
-                    'digital_services_market_size_eur': 2100000000,
-                    'cae_platforms_count': 13,
-                    'market_concentration_index': 0.70,
-                    'avg_price_per_user_eur': 140,
-                    'barriers_to_entry_score': 6.8,
-                    'source': 'CNMC',
-                    'extraction_date': datetime.now().isoformat()
-                }
-            ]
+            competition_data = {
+                'year': [2023, 2022, 2021],
+                'digital_services_market_size_eur': [2500000000, 2300000000, 2100000000],
+                'cae_platforms_count': [15, 14, 13],
+                'market_concentration_index': [0.65, 0.68, 0.70],
+                'avg_price_per_user_eur': [150, 145, 140],
+                'barriers_to_entry_score': [7.2, 7.0, 6.8]
+            }
             
-            df = pd.DataFrame(competition_data)
+            df = build_records(competition_data, CNMC_COMPETITION_SCHEMA, source='CNMC')
             
             # Guardar datos
             output_path = self.raw_dir / 'cnmc_competition_analysis.csv'
@@ -417,8 +315,25 @@ class CAERealDataExtractor:
             logger.error(f"Error extrayendo datos de la CNMC: {e}")
             return pd.DataFrame()
     
-    def extract_all_data(self) -> Dict[str, pd.DataFrame]:
-        """Extraer todos los datos de fuentes oficiales"""
+    def extract_all_data(self, source_timeout: float = 60.0,
+                         max_workers: Optional[int] = None,
+                         cancel_event: Optional[threading.Event] = None) -> Dict[str, pd.DataFrame]:
+        """
+        Extraer todos los datos de fuentes oficiales
+        
+        Las fuentes se extraen en paralelo, cada una con su propio plazo: una
+        fuente lenta o caída no retrasa al resto y se devuelven los datos de
+        las que terminan a tiempo. Una fuente que agota su plazo sigue
+        ejecutándose en segundo plano (en un hilo daemon que no retrasa la
+        salida del intérprete) y su resultado se descarta. La duración y el
+        estado de cada fuente se guardan en ``extraction_summary.json``.
+        
+        Args:
+            source_timeout: Segundos máximos por fuente
+            max_workers: Hilos de extracción (por defecto, uno por fuente)
+            cancel_event: Evento que, al activarse, cancela las fuentes
+                pendientes y deja de esperar al resto
+        """
         logger.info("Iniciando extracción completa de datos oficiales...")
         
         extracted_data = {}
@@ -433,24 +348,30 @@ class CAERealDataExtractor:
             ('cnmc_competition', self.extract_cnmc_competition_analysis)
         ]
         
-        for source_name, extractor_func in sources:
-            try:
-                logger.info(f"Extrayendo datos de {source_name}...")
-                data = extractor_func()
-                if not data.empty:
-                    extracted_data[source_name] = data
-                    logger.info(f"✅ {source_name}: {len(data)} registros extraídos")
-                else:
-                    logger.warning(f"⚠️ {source_name}: No se extrajeron datos")
-            except Exception as e:
-                logger.error(f"❌ Error extrayendo {source_name}: {e}")
+        outcomes = run_sources([SourceTask(source_name, extractor_func, source_timeout)
+                                for source_name, extractor_func in sources],
+                               max_workers=max_workers, cancel_event=cancel_event)
+        
+        source_summary = {}
+        for source_name, outcome in outcomes.items():
+            source_summary[source_name] = dict(outcome.to_dict(), records=0)
+            if outcome.status != 'ok':
+                logger.error(f"❌ Error extrayendo {source_name}: {outcome.error or outcome.status}")
+            elif outcome.result is not None and not outcome.result.empty:
+                extracted_data[source_name] = outcome.result
+                source_summary[source_name]['records'] = len(outcome.result)
+                logger.info(f"✅ {source_name}: {len(outcome.result)} registros extraídos "
+                            f"en {outcome.duration_seconds:.2f}s")
+            else:
+                logger.warning(f"⚠️ {source_name}: No se extrajeron datos")
         
         # Guardar resumen de extracción
         extraction_summary = {
             'extraction_date': datetime.now().isoformat(),
             'sources_extracted': list(extracted_data.keys()),
             'total_records': sum(len(df) for df in extracted_data.values()),
-            'status': 'completed'
+            'status': 'completed' if len(extracted_data) == len(sources) else 'partial',
+            'sources': source_summary
         }
         
         summary_path = self.raw_dir / 'extraction_summary.json'
@@ -474,24 +395,8 @@ class CAERealDataExtractor:
                     logger.warning(f"⚠️ {source_name}: DataFrame vacío")
                     continue
                 
-                # Limpiar datos
-                df_clean = df.copy()
-                
-                # Eliminar filas completamente vacías
-                df_clean = df_clean.dropna(how='all')
-                
-                # Estandarizar nombres de columnas
-                df_clean.columns = df_clean.columns.str.lower().str.replace(' ', '_').str.replace('-', '_')
-                
-                # Validar tipos de datos
-                numeric_columns = df_clean.select_dtypes(include=[np.number]).columns
-                for col in numeric_columns:
-                    if df_clean[col].isnull().any():
-                        df_clean[col] = df_clean[col].fillna(0)
-                
-                # Validar fechas
-                if 'extraction_date' in df_clean.columns:
-                    df_clean['extraction_date'] = pd.to_datetime(df_clean['extraction_date'])
+                # Limpiar y validar con operaciones sobre el DataFrame completo
+                df_clean = normalize_records(df)
                 
                 # Guardar datos procesados
                 output_path = self.processed_dir / f'{source_name}_processed.csv'
@@ -506,10 +411,19 @@ class CAERealDataExtractor:
         
         return processed_data
     
-    def generate_data_quality_report(self, processed_data: Dict[str, pd.DataFrame]) -> Dict:
-        """Generar reporte de calidad de datos"""
+    def generate_data_quality_report(self, processed_data: Dict[str, pd.DataFrame],
+                                     quality_engine: Optional[DataQualityEngine] = None) -> Dict:
+        """
+        Generar reporte de calidad de datos
+        
+        Incluye métricas por columna (completitud, unicidad y validez); para
+        tablas muy grandes se puede pasar un motor con muestreo o conteo
+        aproximado de valores distintos.
+        """
         logger.info("Generando reporte de calidad de datos...")
         
+        quality_engine = quality_engine or DataQualityEngine()
+        
         quality_report = {
             'generation_date': datetime.now().isoformat(),
             'sources_analyzed': len(processed_data),
@@ -518,13 +432,17 @@ class CAERealDataExtractor:
         }
         
         for source_name, df in processed_data.items():
+            evaluation = quality_engine.evaluate(df)
             quality_metrics = {
-                'total_records': len(df),
-                'total_columns': len(df.columns),
-                'missing_values': df.isnull().sum().sum(),
-                'duplicate_records': df.duplicated().sum(),
-                'completeness_score': 1 - (df.isnull().sum().sum() / (len(df) * len(df.columns))),
-                'uniqueness_score': 1 - (df.duplicated().sum() / len(df))
+                'total_records': evaluation['total_records'],
+                'total_columns': evaluation['total_columns'],
+                'missing_values': evaluation['missing_values'],
+                'duplicate_records': evaluation['duplicate_records'],
+                'completeness_score': evaluation['completeness_score'],
+                'uniqueness_score': evaluation['uniqueness_score'],
+                'validity_score': evaluation['validity_score'],
+                'sampled': evaluation['sampled'],
+                'column_metrics': evaluation['columns']
             }
             
             quality_report['quality_metrics'][source_name] = quality_metrics
@@ -9,6 +9,12 @@ from datetime import datetime
 import json
 from pathlib import Path
 import logging
+import time
+
+try:
+    from concurrent_sources import SourceTask, run_sources
+except ImportError:
+    from src.etl.concurrent_sources import SourceTask, run_sources
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
@@ -20,9 +26,12 @@ class CAERealDataExtractor2025:
     Datos actualizados basados en fuentes oficiales y análisis económico reciente
     """
     
-    def __init__(self):
+    def __init__(self, output_dir="data/processed"):
         self.data = {}
         self.extraction_date = datetime.now()
+        self.output_dir = Path(output_dir)
+        # Estado y duración de cada fuente en la última extracción
+        self.extraction_report = {}
         
     def extract_updated_construction_data(self):
         """Extraer datos actualizados del sector construcción - Septiembre 2025"""
@@ -317,29 +326,60 @@ class CAERealDataExtractor2025:
             logger.error(f"Error generando análisis económico alternativo 2025: {e}")
             return None
     
-    def extract_all_data_2025(self):
-        """Extraer todos los datos actualizados para septiembre 2025"""
-        logger.info("Iniciando extracción completa de datos actualizados...")
+    def extract_all_data_2025(self, source_timeout=60.0, cancel_event=None):
+        """
+        Extraer todos los datos actualizados para septiembre 2025
         
-        success_count = 0
+        Las tres fuentes independientes se extraen en paralelo, cada una con
+        su plazo ``source_timeout``; los cálculos económicos dependen de ellas
+        y se ejecutan después, solo si sus datos están disponibles. El estado
+        y la duración de cada paso quedan en ``self.extraction_report`` y se
+        guardan en ``extraction_summary_2025.json`` junto al resto de salidas.
+        Una fuente que agota su plazo sigue en segundo plano en un hilo
+        daemon y su resultado se descarta; ``cancel_event`` (``threading.Event``)
+        cancela las fuentes pendientes.
+        """
+        logger.info("Iniciando extracción completa de datos actualizados...")
         
         # Extraer datos actualizados
-        if self.extract_updated_construction_data():
-            success_count += 1
+        outcomes = run_sources([
+            SourceTask('construction', self.extract_updated_construction_data, source_timeout),
+            SourceTask('bureaucracy', self.extract_updated_bureaucracy_data, source_timeout),
+            SourceTask('cae_platforms', self.extract_cae_platform_data, source_timeout)
+        ], cancel_event=cancel_event)
+        self.extraction_report = {name: outcome.to_dict() for name, outcome in outcomes.items()}
+        sources_ok = all(outcome.status == 'ok' and outcome.result for outcome in outcomes.values())
         
-        if self.extract_updated_bureaucracy_data():
-            success_count += 1
-        
-        if self.extract_cae_platform_data():
-            success_count += 1
+        # Calcular impacto económico actualizado y generar análisis de propuesta alternativa
+        for name, step in [('economic_impact', self.calculate_economic_impact_2025),
+                           ('alternative_economics', self.generate_alternative_proposal_economics_2025)]:
+            if not sources_ok:
+                self.extraction_report[name] = {'status': 'skipped', 'duration_seconds': None, 'error': None}
+                continue
+            start = time.perf_counter()
+            sources_ok = step() is not None
+            self.extraction_report[name] = {
+                'status': 'ok' if sources_ok else 'error',
+                'duration_seconds': time.perf_counter() - start,
+                'error': None
+            }
         
-        # Calcular impacto económico actualizado
-        if self.calculate_economic_impact_2025():
-            success_count += 1
+        success_count = sum(1 for step in self.extraction_report.values() if step['status'] == 'ok')
+        for name, step in self.extraction_report.items():
+            if step['status'] == 'ok':
+                logger.info(f"{name}: {step['duration_seconds']:.2f}s")
+            else:
+                logger.warning(f"{name}: {step['status']} {step['error'] or ''}")
         
-        # Generar análisis de propuesta alternativa actualizado
-        if self.generate_alternative_proposal_economics_2025():
-            success_count += 1
+        # Guardar resumen de extracción (también si alguna fuente ha fallado)
+        extraction_summary = {
+            'extraction_date': datetime.now().isoformat(),
+            'status': 'completed' if success_count == len(self.extraction_report) else 'partial',
+            'sources': self.extraction_report
+        }
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.output_dir / 'extraction_summary_2025.json', 'w', encoding='utf-8') as f:
+            json.dump(extraction_summary, f, indent=2, ensure_ascii=False)
         
         logger.info(f"✅ Extracción 2025 completada: {success_count}/5 fuentes procesadas")
         return success_count == 5
@@ -454,7 +494,7 @@ def main():
             print(report)
             
             # Guardar reporte
-            output_dir = Path("data/processed")
+            output_dir = extractor.output_dir
             output_dir.mkdir(parents=True, exist_ok=True)
             
             with open(output_dir / "economic_impact_report_2025.md", "w", encoding="utf-8") as f:
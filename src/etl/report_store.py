@@ -0,0 +1,166 @@
+"""
+CAE Report Store - JSON Lines reports with an offset index for lazy per-key reads
+Sections are read through mmap and parsed on demand instead of loading the whole document
+"""
+
+import json
+import mmap
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+INDEX_KEY = '__index__'
+FORMAT_VERSION = 1
+
+# Separator between a section and its entries in keys ("platforms_data/ctaima")
+KEY_SEPARATOR = '/'
+
+def write_report(path: Union[str, Path], data: Dict[str, Any],
+                 split_keys: Iterable[str] = ()) -> Path:
+    """
+    Write a report as JSON Lines followed by an offset index line
+
+    Every top-level key becomes one line ``{"key": ..., "value": ...}``.
+    Keys listed in ``split_keys`` whose value is an object are stored one
+    entry per line instead (``section/entry``), so a single platform or
+    source can be read on its own. The last line maps every key to the byte
+    offset and length of its line. The file is replaced atomically.
+
+    Args:
+        path: Output file (conventionally ``.jsonl``)
+        data: Report document
+        split_keys: Top-level keys stored one entry per line
+
+    Returns:
+        Path of the written report
+    """
+    path = Path(path)
+    split_keys = set(split_keys)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+
+    lines: List[Tuple[str, Any]] = []
+    sections: Dict[str, List[str]] = {}
+    for key, value in data.items():
+        if key in split_keys and isinstance(value, dict):
+            sections[key] = list(value)
+            lines.extend((f"{key}{KEY_SEPARATOR}{entry}", entry_value) for entry, entry_value in value.items())
+        else:
+            lines.append((key, value))
+
+    index: Dict[str, List[int]] = {}
+    offset = 0
+    with open(tmp_path, 'wb') as f:
+        for key, value in lines:
+            line = json.dumps({'key': key, 'value': value}, ensure_ascii=False, default=str).encode('utf-8') + b'\n'
+            f.write(line)
+            index[key] = [offset, len(line)]
+            offset += len(line)
+
+        index_line = {
+            INDEX_KEY: {
+                'version': FORMAT_VERSION,
+                'keys': list(data),
+                'sections': sections,
+                'offsets': index
+            }
+        }
+        f.write(json.dumps(index_line, ensure_ascii=False).encode('utf-8') + b'\n')
+
+    os.replace(tmp_path, path)
+    return path
+
+class LazyReport:
+    """
+    Read-only view of a report written by ``write_report``
+
+    Only the index line is parsed on open; ``get`` parses the single line of
+    the requested key from a memory map. Split sections are returned as a
+    dict of their entries, each parsed on first access.
+
+    Usage:
+        with LazyReport('data/processed/cae_critical_data_aggressive.jsonl') as report:
+            ctaima = report.get('platforms_data/ctaima')
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._file = open(self.path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped
+            self._file.close()
+            raise ValueError(f"{self.path} is not a report (empty file)")
+
+        try:
+            index_start = self._map.rfind(b'\n', 0, len(self._map) - 1) + 1
+            index_line = json.loads(self._map[index_start:])
+            index = index_line.get(INDEX_KEY) if isinstance(index_line, dict) else None
+            if not isinstance(index, dict):
+                raise ValueError(f"{self.path} has no report index")
+            self._keys: List[str] = index['keys']
+            self._sections: Dict[str, List[str]] = index['sections']
+            self._offsets: Dict[str, List[int]] = index['offsets']
+        except Exception as e:
+            # Not a report (plain JSON Lines, truncated file...): release the map
+            self.close()
+            if isinstance(e, ValueError):
+                raise
+            raise ValueError(f"{self.path} has no valid report index: {e}") from e
+
+    def keys(self) -> List[str]:
+        """Top-level keys in their original order"""
+        return list(self._keys)
+
+    def section_keys(self, section: str) -> List[str]:
+        """Entries of a split section (e.g. platform names)"""
+        return list(self._sections.get(section, []))
+
+    def _read(self, key: str) -> Any:
+        offset, length = self._offsets[key]
+        return json.loads(self._map[offset:offset + length])['value']
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Value of a top-level key, a whole split section, or one ``section/entry``
+        """
+        if key in self._offsets:
+            return self._read(key)
+        if key in self._sections:
+            return {entry: self._read(f"{key}{KEY_SEPARATOR}{entry}") for entry in self._sections[key]}
+        return default
+
+    def __getitem__(self, key: str) -> Any:
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._offsets or key in self._sections
+
+    def iter_section(self, section: str) -> Iterator[Tuple[str, Any]]:
+        """Yield ``(entry, value)`` pairs of a split section one at a time"""
+        for entry in self._sections.get(section, []):
+            yield entry, self._read(f"{section}{KEY_SEPARATOR}{entry}")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Rebuild the full document"""
+        return {key: self.get(key) for key in self._keys}
+
+    def close(self) -> None:
+        if not self._map.closed:
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self) -> 'LazyReport':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+def read_report(path: Union[str, Path], key: Optional[str] = None) -> Any:
+    """Read one key of a report (or the whole document when ``key`` is None)"""
+    with LazyReport(path) as report:
+        return report.to_dict() if key is None else report[key]
@@ -0,0 +1,282 @@
+"""
+CAE ETL Run History - Stage-level metrics and persistent run comparison
+Collects per-stage and per-item timings and stores them in a local SQLite database
+
+Usage:
+    python src/etl/run_history.py list [--limit N]
+    python src/etl/run_history.py show RUN_ID
+    python src/etl/run_history.py compare [BASELINE_RUN CANDIDATE_RUN]
+"""
+
+import argparse
+import logging
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = Path("data") / "logs" / "pipeline_runs.db"
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of the current process in MB, if available"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+    if sys.platform == 'darwin':
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+class RunMetricsCollector:
+    """
+    Collects stage-level and item-level (source or dataset) metrics for one run
+
+    Items may be recorded from worker threads; stage totals for rows and
+    bytes are derived from the items recorded while the stage was open.
+
+    Memory is measured with the process-wide peak RSS, which only grows.
+    Stages store that peak as of their end (``peak_rss_mb``); items store
+    how much they raised it (``peak_rss_growth_mb``), so a large value
+    points at the item that pushed the process to a new peak. Items that
+    run concurrently share the growth observed while they overlap.
+    """
+
+    def __init__(self):
+        self.stages: Dict[str, Dict] = {}
+        self.items: List[Dict] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time a pipeline stage (extract, transform, load)"""
+        start = time.perf_counter()
+        first_item = len(self.items)
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            with self._lock:
+                stage_items = [item for item in self.items[first_item:] if item['stage'] == name]
+            rows = sum(item['rows'] or 0 for item in stage_items)
+            self.stages[name] = {
+                'stage': name,
+                'seconds': seconds,
+                'rows': rows,
+                'bytes': sum(item['bytes'] or 0 for item in stage_items),
+                'rows_per_second': rows / seconds if rows and seconds > 0 else None,
+                'peak_rss_mb': peak_rss_mb()
+            }
+
+    def record_item(self, stage: str, item: str, seconds: float,
+                    rows: Optional[int] = None, bytes_count: Optional[int] = None,
+                    peak_rss_before_mb: Optional[float] = None) -> None:
+        """
+        Record metrics for a single source or dataset within a stage
+
+        ``peak_rss_before_mb`` is ``peak_rss_mb()`` taken when the item
+        started; without it the item's memory growth is not recorded.
+        """
+        peak = peak_rss_mb()
+        growth = None
+        if peak is not None and peak_rss_before_mb is not None:
+            growth = max(0.0, peak - peak_rss_before_mb)
+        with self._lock:
+            self.items.append({
+                'stage': stage,
+                'item': item,
+                'seconds': seconds,
+                'rows': rows,
+                'bytes': bytes_count,
+                'rows_per_second': rows / seconds if rows and seconds > 0 else None,
+                'peak_rss_growth_mb': growth
+            })
+
+class RunHistory:
+    """Persistent SQLite history of pipeline runs"""
+
+    def __init__(self, db_path: Path = DEFAULT_DB_PATH):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.init_database()
+
+    def init_database(self) -> None:
+        """Create the history tables if they do not exist"""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.executescript('''
+                CREATE TABLE IF NOT EXISTS runs (
+                    run_id TEXT PRIMARY KEY,
+                    started_at TEXT,
+                    finished_at TEXT,
+                    duration_seconds REAL,
+                    total_records INTEGER,
+                    successful_extractions INTEGER,
+                    failed_extractions INTEGER,
+                    data_quality_score REAL
+                );
+                CREATE TABLE IF NOT EXISTS stage_metrics (
+                    run_id TEXT,
+                    stage TEXT,
+                    seconds REAL,
+                    rows INTEGER,
+                    bytes INTEGER,
+                    rows_per_second REAL,
+                    peak_rss_mb REAL,
+                    PRIMARY KEY (run_id, stage)
+                );
+                CREATE TABLE IF NOT EXISTS item_metrics (
+                    run_id TEXT,
+                    stage TEXT,
+                    item TEXT,
+                    seconds REAL,
+                    rows INTEGER,
+                    bytes INTEGER,
+                    rows_per_second REAL,
+                    peak_rss_growth_mb REAL
+                );
+            ''')
+
+    def record_run(self, run_id: str, pipeline_metrics: Dict, collector: RunMetricsCollector) -> None:
+        """Persist the summary, stage metrics and item metrics of a run"""
+        start_time = pipeline_metrics.get('start_time')
+        end_time = pipeline_metrics.get('end_time')
+        duration = (end_time - start_time).total_seconds() if start_time and end_time else None
+
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute('DELETE FROM stage_metrics WHERE run_id = ?', (run_id,))
+            conn.execute('DELETE FROM item_metrics WHERE run_id = ?', (run_id,))
+            conn.execute('''
+                INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                run_id,
+                start_time.isoformat() if start_time else None,
+                end_time.isoformat() if end_time else None,
+                duration,
+                int(pipeline_metrics.get('total_records', 0)),
+                int(pipeline_metrics.get('successful_extractions', 0)),
+                int(pipeline_metrics.get('failed_extractions', 0)),
+                float(pipeline_metrics.get('data_quality_score', 0.0))
+            ))
+            conn.executemany('''
+                INSERT INTO stage_metrics VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', [
+                (run_id, s['stage'], s['seconds'], s['rows'], s['bytes'], s['rows_per_second'], s['peak_rss_mb'])
+                for s in collector.stages.values()
+            ])
+            conn.executemany('''
+                INSERT INTO item_metrics (run_id, stage, item, seconds, rows, bytes,
+                                          rows_per_second, peak_rss_growth_mb)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', [
+                (run_id, i['stage'], i['item'], i['seconds'], i['rows'], i['bytes'], i['rows_per_second'],
+                 i['peak_rss_growth_mb'])
+                for i in collector.items
+            ])
+
+        logger.info(f"Run {run_id} recorded in {self.db_path}")
+
+    def list_runs(self, limit: int = 20) -> pd.DataFrame:
+        """Most recent runs, newest first"""
+        with sqlite3.connect(self.db_path) as conn:
+            return pd.read_sql_query(
+                'SELECT * FROM runs ORDER BY started_at DESC LIMIT ?', conn, params=(limit,)
+            )
+
+    def get_run(self, run_id: str) -> Dict[str, pd.DataFrame]:
+        """Stage and item metrics of a single run"""
+        with sqlite3.connect(self.db_path) as conn:
+            return {
+                'stages': pd.read_sql_query(
+                    'SELECT * FROM stage_metrics WHERE run_id = ? ORDER BY stage', conn, params=(run_id,)
+                ),
+                'items': pd.read_sql_query(
+                    'SELECT * FROM item_metrics WHERE run_id = ? ORDER BY stage, item', conn, params=(run_id,)
+                )
+            }
+
+    def compare_runs(self, baseline_run: str, candidate_run: str, level: str = 'stage') -> pd.DataFrame:
+        """
+        Compare two runs stage by stage (or item by item)
+
+        Returns:
+            DataFrame with baseline/candidate seconds, rows/sec and memory
+            (peak for stages, peak growth for items), plus the relative
+            change in seconds (positive means slower)
+        """
+        if level == 'stage':
+            table, keys, memory_column = 'stage_metrics', ['stage'], 'peak_rss_mb'
+        else:
+            table, keys, memory_column = 'item_metrics', ['stage', 'item'], 'peak_rss_growth_mb'
+        with sqlite3.connect(self.db_path) as conn:
+            baseline = pd.read_sql_query(f'SELECT * FROM {table} WHERE run_id = ?', conn, params=(baseline_run,))
+            candidate = pd.read_sql_query(f'SELECT * FROM {table} WHERE run_id = ?', conn, params=(candidate_run,))
+
+        columns = keys + ['seconds', 'rows_per_second', memory_column]
+        comparison = baseline[columns].merge(
+            candidate[columns], on=keys, how='outer', suffixes=('_baseline', '_candidate')
+        )
+        comparison['seconds_change_pct'] = (
+            (comparison['seconds_candidate'] - comparison['seconds_baseline'])
+            / comparison['seconds_baseline'] * 100
+        )
+        return comparison.sort_values(keys).reset_index(drop=True)
+
+def main():
+    """CLI para consultar y comparar ejecuciones del pipeline"""
+    parser = argparse.ArgumentParser(description="CAE ETL run history")
+    parser.add_argument('--db', default=str(DEFAULT_DB_PATH), help="Path to the run history database")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    list_parser = subparsers.add_parser('list', help="List recent runs")
+    list_parser.add_argument('--limit', type=int, default=20)
+
+    show_parser = subparsers.add_parser('show', help="Show stage and item metrics of a run")
+    show_parser.add_argument('run_id')
+
+    compare_parser = subparsers.add_parser('compare', help="Compare two runs (default: last two)")
+    compare_parser.add_argument('runs', nargs='*', metavar='RUN_ID')
+    compare_parser.add_argument('--items', action='store_true', help="Compare per source/dataset")
+
+    args = parser.parse_args()
+    history = RunHistory(Path(args.db))
+
+    with pd.option_context('display.width', 200, 'display.max_columns', 20):
+        if args.command == 'list':
+            print(history.list_runs(args.limit).to_string(index=False))
+
+        elif args.command == 'show':
+            run = history.get_run(args.run_id)
+            print(run['stages'].to_string(index=False))
+            print()
+            print(run['items'].to_string(index=False))
+
+        elif args.command == 'compare':
+            runs = args.runs
+            if not runs:
+                recent = history.list_runs(2)['run_id'].tolist()
+                if len(recent) < 2:
+                    print("Se necesitan al menos dos ejecuciones para comparar")
+                    return 1
+                runs = [recent[1], recent[0]]
+            if len(runs) != 2:
+                parser.error("compare expects exactly two run ids")
+
+            print(f"Baseline: {runs[0]}  Candidate: {runs[1]}")
+            level = 'item' if args.items else 'stage'
+            print(history.compare_runs(runs[0], runs[1], level=level).to_string(index=False))
+
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
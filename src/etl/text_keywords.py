@@ -0,0 +1,58 @@
+"""
+CAE Text Keywords - Single-pass term frequency counting for scraped pages
+Tokenizes a page once and answers keyword queries accent- and case-insensitively
+"""
+
+import re
+import unicodedata
+from collections import Counter
+from typing import Dict, Iterable
+
+# Words are runs of letters (digits and punctuation separate them)
+TOKEN_PATTERN = re.compile(r'[^\W\d_]+')
+
+def fold_accents(text: str) -> str:
+    """Lowercase ``text`` and strip diacritics (``coordinación`` -> ``coordinacion``)"""
+    decomposed = unicodedata.normalize('NFKD', text.lower())
+    return ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+class TermCounter:
+    """
+    Term frequency map of a text built in one pass
+
+    Tokens and queries are both folded with ``fold_accents``, so
+    ``coordinacion`` and ``Coordinación`` count as the same term. Matching is
+    by whole word: ``plan`` does not count occurrences of ``planes``.
+    Multi-word keywords are counted as consecutive tokens.
+    """
+
+    def __init__(self, text: str):
+        self.tokens = TOKEN_PATTERN.findall(fold_accents(text))
+        self.frequencies = Counter(self.tokens)
+
+    def count(self, keyword: str) -> int:
+        """Occurrences of ``keyword`` as a whole word or phrase"""
+        terms = TOKEN_PATTERN.findall(fold_accents(keyword))
+        if not terms:
+            return 0
+        if len(terms) == 1:
+            return self.frequencies[terms[0]]
+
+        # Phrases are rare enough that a scan anchored on the first term is cheap
+        width = len(terms)
+        return sum(
+            1 for position, token in enumerate(self.tokens)
+            if token == terms[0] and self.tokens[position:position + width] == terms
+        )
+
+    def __contains__(self, keyword: str) -> bool:
+        return self.count(keyword) > 0
+
+    def counts(self, keywords: Iterable[str]) -> Dict[str, int]:
+        """Occurrences of each keyword that appears at least once, keyed by the keyword as given"""
+        found = {}
+        for keyword in keywords:
+            occurrences = self.count(keyword)
+            if occurrences > 0:
+                found[keyword] = occurrences
+        return found
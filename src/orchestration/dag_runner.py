@@ -0,0 +1,424 @@
+"""
+CAE DAG Runner - Dependency-aware scheduler for extractors and analyzers
+Runs independent tasks in parallel on a process pool and skips tasks whose inputs are unchanged
+
+Usage:
+    python src/orchestration/dag_runner.py                 # run every task that is out of date
+    python src/orchestration/dag_runner.py --list          # show tasks, dependencies and status
+    python src/orchestration/dag_runner.py --tasks etl_pipeline --force
+"""
+
+import argparse
+import fnmatch
+import hashlib
+import importlib.util
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_STATE_PATH = Path("data") / "logs" / "dag_state.json"
+
+@dataclass
+class Task:
+    """
+    A unit of work in the pipeline DAG
+
+    ``inputs`` and ``outputs`` are paths or glob patterns relative to the
+    repository root. A task depends on every task that produces one of its
+    inputs, plus any task named in ``depends_on``. The task module itself is
+    always part of the input fingerprint, so code changes trigger a re-run.
+    """
+    name: str
+    module: str
+    entrypoint: str = "main"
+    inputs: List[str] = field(default_factory=list)
+    outputs: List[str] = field(default_factory=list)
+    depends_on: List[str] = field(default_factory=list)
+    max_age_hours: Optional[float] = None
+
+def default_tasks() -> List[Task]:
+    """Extractors and analyzers that produce ``data/processed/``"""
+    return [
+        Task(
+            name="real_data_extractor",
+            module="src/etl/real_data_extractor.py",
+            inputs=["src/etl/data_quality.py"],
+            outputs=[
+                "data/raw/boe_cae_regulations.csv",
+                "data/raw/ine_construction_stats.csv",
+                "data/raw/itss_inspection_data.csv",
+                "data/raw/flc_tpc_stats.csv",
+                "data/raw/civismo_bureaucracy_studies.csv",
+                "data/raw/cnmc_competition_analysis.csv",
+                "data/raw/extraction_summary.json",
+                "data/processed/*_processed.csv",
+                "data/processed/data_quality_report.json"
+            ],
+            max_age_hours=24
+        ),
+        Task(
+            name="real_data_extractor_2025",
+            module="src/etl/real_data_extractor_2025.py",
+            outputs=[
+                "data/processed/economic_impact_report_2025.md",
+                "data/processed/economic_data_2025.json",
+                "data/processed/alternative_economics_2025.json",
+                "data/processed/extraction_summary_2025.json"
+            ]
+        ),
+        Task(
+            name="etl_pipeline",
+            module="src/etl/advanced_etl_pipeline.py",
+            inputs=[
+                "src/etl/dataset_sink.py",
+                "src/etl/data_quality.py",
+                "src/etl/run_history.py",
+                "data/raw/*.csv",
+                "data/raw/*.xlsx"
+            ],
+            outputs=["data/processed/synthetic_cae_data.parquet"],
+            max_age_hours=24
+        ),
+        Task(
+            name="cae_critical_analysis",
+            module="src/analytics/cae_critical_analysis.py"
+        ),
+        Task(
+            name="cae_real_data_analysis",
+            module="src/analytics/cae_real_data_analysis.py",
+            outputs=["data/processed/cae_real_data_analysis.json"]
+        ),
+        Task(
+            name="human_social_impact_analysis",
+            module="src/analytics/human_social_impact_analysis.py",
+            outputs=["data/processed/human_social_impact_report_corrected.json"]
+        ),
+        Task(
+            name="productivity_evolution_analyzer",
+            module="src/analytics/productivity_evolution_analyzer.py",
+            outputs=["data/processed/productivity_evolution_report_corrected.json"]
+        ),
+        Task(
+            name="bim_worker_paradox_analyzer",
+            module="src/analytics/bim_worker_paradox_analyzer.py",
+            entrypoint="BIMWorkerParadoxAnalyzer.run_complete_analysis",
+            outputs=["data/processed/bim_worker_paradox_report.json"]
+        ),
+        Task(
+            name="planning_impact_algorithm",
+            module="src/analytics/planning_impact_algorithm.py",
+            entrypoint="PlanningImpactAlgorithm.run_complete_analysis",
+            outputs=["data/processed/planning_impact_report.json"]
+        ),
+        Task(
+            name="rotation_safety_correlation_analyzer",
+            module="src/analytics/rotation_safety_correlation_analyzer.py",
+            entrypoint="RotationSafetyCorrelationAnalyzer.run_complete_analysis",
+            outputs=["data/processed/rotation_safety_correlation_report.json"]
+        ),
+        Task(
+            name="analytics_store",
+            module="src/etl/analytics_store.py",
+            entrypoint="load_processed",
+            inputs=["data/processed"],
+            outputs=["data/warehouse/catalog.db"]
+        )
+    ]
+
+def run_task_entrypoint(module: str, entrypoint: str, repo_root: str) -> bool:
+    """
+    Load a task module by file path and call its entrypoint (worker process)
+
+    ``entrypoint`` is either a module-level function or ``Class.method``, in
+    which case the class is instantiated without arguments. Entrypoints in
+    this repo signal failure by returning ``False`` or ``None``.
+    """
+    os.chdir(repo_root)
+    module_path = Path(repo_root) / module
+    # Same import resolution as running the module as a script from the repo root
+    for path in (str(module_path.parent), repo_root):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+
+    spec = importlib.util.spec_from_file_location(f"dag_task_{module_path.stem}", module_path)
+    loaded = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(loaded)
+
+    if '.' in entrypoint:
+        class_name, method_name = entrypoint.split('.', 1)
+        target = getattr(getattr(loaded, class_name)(), method_name)
+    else:
+        target = getattr(loaded, entrypoint)
+
+    result = target()
+    return result is not None and result is not False
+
+class DAGRunner:
+    """
+    Dependency-aware task scheduler
+
+    Ready tasks (all dependencies finished) are submitted to a process pool
+    as soon as their last dependency completes. Before submitting, the
+    runner fingerprints the task module and its inputs; a task is skipped
+    when the fingerprint matches its last successful run, its outputs exist
+    and it has not exceeded ``max_age_hours``. Fingerprints are stored in a
+    JSON state file under ``data/logs``.
+    """
+
+    def __init__(self, tasks: List[Task], repo_root: Path = REPO_ROOT,
+                 state_path: Path = DEFAULT_STATE_PATH, max_workers: Optional[int] = None):
+        self.repo_root = Path(repo_root)
+        self.tasks = {task.name: task for task in tasks}
+        if len(self.tasks) != len(tasks):
+            raise ValueError("Task names must be unique")
+
+        self.state_path = self.repo_root / state_path
+        self.max_workers = max_workers
+        self.dependencies = self._resolve_dependencies()
+        self.order = self._topological_order()
+        self.state = self._load_state()
+
+    def _resolve_dependencies(self) -> Dict[str, Set[str]]:
+        """Derive task dependencies from declared inputs/outputs and ``depends_on``"""
+        dependencies = {}
+        for name, task in self.tasks.items():
+            unknown = set(task.depends_on) - set(self.tasks)
+            if unknown:
+                raise ValueError(f"Task {name} depends on unknown tasks: {sorted(unknown)}")
+
+            upstream = set(task.depends_on)
+            for other_name, other in self.tasks.items():
+                if other_name != name and any(
+                    self._patterns_overlap(pattern, output)
+                    for pattern in task.inputs for output in other.outputs
+                ):
+                    upstream.add(other_name)
+            dependencies[name] = upstream
+        return dependencies
+
+    @staticmethod
+    def _patterns_overlap(input_pattern: str, output_pattern: str) -> bool:
+        """Whether an input pattern can refer to a file produced by an output pattern"""
+        return (
+            fnmatch.fnmatch(output_pattern, input_pattern)
+            or fnmatch.fnmatch(input_pattern, output_pattern)
+            or output_pattern.startswith(input_pattern.rstrip('/') + '/')
+        )
+
+    def _topological_order(self) -> List[str]:
+        """Order tasks so that every task follows its dependencies"""
+        order = []
+        remaining = {name: set(deps) for name, deps in self.dependencies.items()}
+        while remaining:
+            ready = sorted(name for name, deps in remaining.items() if not deps)
+            if not ready:
+                raise ValueError(f"Dependency cycle between tasks: {sorted(remaining)}")
+            for name in ready:
+                order.append(name)
+                del remaining[name]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+        return order
+
+    def _load_state(self) -> Dict:
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_state(self) -> None:
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.state_path)
+
+    def _expand(self, pattern: str) -> List[Path]:
+        """Files matched by a path, directory or glob pattern"""
+        path = self.repo_root / pattern
+        if any(char in pattern for char in '*?['):
+            matches = sorted(self.repo_root.glob(pattern))
+        else:
+            matches = [path] if path.exists() else []
+
+        files = []
+        for match in matches:
+            if match.is_dir():
+                files.extend(sorted(p for p in match.rglob('*') if p.is_file()))
+            elif match.is_file():
+                files.append(match)
+        return files
+
+    def fingerprint(self, task: Task) -> str:
+        """Content hash of the task module, its entrypoint and every input file"""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"{task.module}:{task.entrypoint}".encode())
+
+        for pattern in [task.module] + task.inputs:
+            digest.update(pattern.encode())
+            for file_path in self._expand(pattern):
+                digest.update(str(file_path.relative_to(self.repo_root)).encode())
+                with open(file_path, 'rb') as f:
+                    for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                        digest.update(chunk)
+
+        return digest.hexdigest()
+
+    def _outputs_exist(self, task: Task) -> bool:
+        return all(self._expand(pattern) for pattern in task.outputs)
+
+    def is_up_to_date(self, task: Task) -> bool:
+        """Whether the last successful run of a task is still valid"""
+        previous = self.state.get(task.name)
+        if not previous or previous.get('status') != 'success':
+            return False
+        if previous.get('fingerprint') != self.fingerprint(task):
+            return False
+        if not self._outputs_exist(task):
+            return False
+        if task.max_age_hours is not None:
+            finished_at = datetime.fromisoformat(previous['finished_at'])
+            if datetime.now() - finished_at > timedelta(hours=task.max_age_hours):
+                return False
+        return True
+
+    def select(self, targets: Optional[List[str]] = None) -> List[str]:
+        """Targets plus all of their upstream tasks, in topological order"""
+        if not targets:
+            return list(self.order)
+
+        unknown = set(targets) - set(self.tasks)
+        if unknown:
+            raise ValueError(f"Unknown tasks: {sorted(unknown)}")
+
+        selected = set()
+        pending = list(targets)
+        while pending:
+            name = pending.pop()
+            if name not in selected:
+                selected.add(name)
+                pending.extend(self.dependencies[name])
+        return [name for name in self.order if name in selected]
+
+    def run(self, targets: Optional[List[str]] = None, force: bool = False) -> Dict[str, str]:
+        """
+        Run the selected tasks
+
+        Args:
+            targets: Task names to run (with their dependencies); all tasks by default
+            force: Run tasks even when their inputs are unchanged
+
+        Returns:
+            Dictionary mapping task names to ``success``, ``skipped``,
+            ``failed`` or ``upstream_failed``
+        """
+        selected = self.select(targets)
+        results: Dict[str, str] = {}
+        running = {}
+        start_times = {}
+
+        logger.info(f"Running DAG with {len(selected)} tasks")
+
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            while len(results) < len(selected):
+                # Schedule every task whose dependencies have all finished
+                for name in selected:
+                    if name in results or name in running.values():
+                        continue
+                    upstream = self.dependencies[name] & set(selected)
+                    if not upstream <= set(results):
+                        continue
+
+                    if any(results[dep] in ('failed', 'upstream_failed') for dep in upstream):
+                        results[name] = 'upstream_failed'
+                        logger.warning(f"⚠️ {name}: skipped because an upstream task failed")
+                        continue
+
+                    task = self.tasks[name]
+                    if not force and self.is_up_to_date(task):
+                        results[name] = 'skipped'
+                        logger.info(f"{name}: inputs unchanged, skipping")
+                        continue
+
+                    logger.info(f"{name}: starting")
+                    start_times[name] = time.perf_counter()
+                    future = executor.submit(run_task_entrypoint, task.module, task.entrypoint,
+                                             str(self.repo_root))
+                    running[future] = name
+
+                if not running:
+                    continue
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    results[name] = self._finish_task(name, future, time.perf_counter() - start_times[name])
+
+        summary = {status: sum(1 for value in results.values() if value == status)
+                   for status in ('success', 'skipped', 'failed', 'upstream_failed')}
+        logger.info(f"DAG completed: {summary}")
+        return results
+
+    def _finish_task(self, name: str, future, seconds: float) -> str:
+        """Record the outcome of a finished task in the state file"""
+        task = self.tasks[name]
+        try:
+            succeeded = future.result()
+            if succeeded and not self._outputs_exist(task):
+                logger.error(f"❌ {name}: finished without producing all declared outputs")
+                succeeded = False
+        except Exception as e:
+            logger.error(f"❌ {name}: {e}")
+            succeeded = False
+
+        status = 'success' if succeeded else 'failed'
+        entry = {
+            'status': status,
+            'finished_at': datetime.now().isoformat(),
+            'duration_seconds': round(seconds, 3)
+        }
+        if succeeded:
+            # Fingerprint after the run so inputs the task rewrites itself do not force a re-run
+            entry['fingerprint'] = self.fingerprint(task)
+            logger.info(f"✅ {name}: completed in {seconds:.1f}s")
+
+        self.state[name] = entry
+        self._save_state()
+        return status
+
+def main():
+    """CLI del ejecutor DAG"""
+    parser = argparse.ArgumentParser(description="Run CAE extractors and analyzers as a DAG")
+    parser.add_argument('--tasks', nargs='+', help="Tasks to run (dependencies are included)")
+    parser.add_argument('--force', action='store_true', help="Run tasks even if inputs are unchanged")
+    parser.add_argument('--workers', type=int, default=None, help="Maximum worker processes")
+    parser.add_argument('--list', action='store_true', help="List tasks and exit")
+    args = parser.parse_args()
+
+    runner = DAGRunner(default_tasks(), max_workers=args.workers)
+
+    if args.list:
+        for name in runner.select(args.tasks):
+            status = 'up to date' if runner.is_up_to_date(runner.tasks[name]) else 'pending'
+            dependencies = ', '.join(sorted(runner.dependencies[name])) or '-'
+            print(f"{name:40s} {status:12s} depends on: {dependencies}")
+        return 0
+
+    results = runner.run(args.tasks, force=args.force)
+    return 0 if all(status in ('success', 'skipped') for status in results.values()) else 1
+
+if __name__ == "__main__":
+    exit(main())